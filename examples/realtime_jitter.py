@@ -0,0 +1,64 @@
+"""Compares the timing jitter of a 1 kHz loop under different RuntimeConfigs.
+
+Run it on the Raspberry Pi while the system is busy, for example during an
+apt upgrade, and again as root to see the effect of the privileged settings.
+
+Each config runs in a fresh process, because the garbage collector, memory
+lock and scheduling settings last for the whole process and would otherwise
+carry over into the configs measured after it.
+"""
+import multiprocessing
+import time
+
+from pyparts.logic import realtime
+
+PERIOD_S = 0.001
+DURATION_S = 5.0
+
+CONFIGS = [
+    ('default', realtime.RuntimeConfig()),
+    ('gc paused', realtime.RuntimeConfig(gc_freeze=True, pause_gc=True)),
+    ('pinned cpu 3', realtime.RuntimeConfig(cpus=[3])),
+    ('fifo 50 + mlockall', realtime.RuntimeConfig(
+        policy=realtime.SCHED_FIFO, priority=50, lock_memory=True,
+        pause_gc=True)),
+]
+
+
+def measure(index, results):
+    """Runs a periodic loop and records how late each wake up was."""
+    config = CONFIGS[index][1]
+    status = config.apply()
+    lateness = []
+    next_time = time.monotonic() + PERIOD_S
+    end_time = time.monotonic() + DURATION_S
+    while next_time < end_time:
+        with config.hot_loop():
+            # Some garbage, like a control loop building small objects.
+            [dict(value=i) for i in range(20)]
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        lateness.append(time.monotonic() - next_time)
+        next_time += PERIOD_S
+    results.put((status, sorted(lateness)))
+
+
+def main():
+    print('%-20s %10s %10s %10s  %s' % ('config', 'p50 us', 'p99 us',
+                                        'max us', 'applied'))
+    for index, (name, _) in enumerate(CONFIGS):
+        results = multiprocessing.Queue()
+        process = multiprocessing.Process(target=measure,
+                                          args=(index, results))
+        process.start()
+        status, lateness = results.get()
+        process.join()
+        print('%-20s %10.1f %10.1f %10.1f  %s' % (
+            name, lateness[len(lateness) // 2] * 1e6,
+            lateness[int(len(lateness) * 0.99)] * 1e6, lateness[-1] * 1e6,
+            status))
+
+
+if __name__ == '__main__':
+    main()
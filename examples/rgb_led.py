@@ -23,15 +23,15 @@ def main():
 
     # Set the PWM frequency for the LEDs.
     rgb.set_pwm_frequency_hz(PWM_FREQUENCY_HZ)
-    print 'PWM Frequency:', rgb.pwm_frequency_hz
+    print('PWM Frequency:', rgb.pwm_frequency_hz)
 
     # Set all 3 colors at once.
     rgb.set_rgb(25, 50, 75)
-    print '(Red, Green, Blue):', rgb.rgb
+    print('(Red, Green, Blue):', rgb.rgb)
 
     # Enable the LED.
     rgb.enable()
-    print 'Led enabled:', rgb.is_enabled
+    print('Led enabled:', rgb.is_enabled)
 
     time.sleep(5)
 
@@ -39,9 +39,9 @@ def main():
     rgb.set_red(40)
     rgb.set_green(20)
     rgb.set_blue(0)
-    print 'Red:', rgb.red
-    print 'Greed:', rgb.green
-    print 'Blue:', rgb.blue
+    print('Red:', rgb.red)
+    print('Greed:', rgb.green)
+    print('Blue:', rgb.blue)
 
     time.sleep(5)
 
@@ -52,7 +52,7 @@ def main():
 
     # Disable the LED.
     rgb.disable()
-    print 'Led enabled:', rgb.is_enabled
+    print('Led enabled:', rgb.is_enabled)
 
 
 if __name__ == '__main__':
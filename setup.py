@@ -23,7 +23,11 @@ setup(
         '': ['README.rst', 'LICENSE'],
     },
     test_suite='pytest',
+    python_requires='>=3.8',
     install_requires=['spidev', 'RPi.GPIO'],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     tests_require=['pytest', 'pytest-cov', 'pytest-flakes', 'pytest-pep8', 'mock'],
     license='MIT',
     classifiers=(
@@ -32,6 +36,8 @@ setup(
         'Natural Language :: English',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
         'Topic :: Software Development :: Libraries :: Python Modules',
     )
 )
@@ -0,0 +1,139 @@
+import mmap
+import os
+import struct
+
+from pyparts.logic import clock as clock_lib
+from pyparts.logic import shared_struct
+
+# File header: magic, version, state format.
+_HEADER = struct.Struct('<4sH26s')
+_MAGIC = b'PYCK'
+_VERSION = 1
+
+_MAX_FORMAT_LENGTH = 26
+
+
+class Checkpoint(object):
+    """Keeps a part's dynamic state in a small memory mapped file.
+
+    A part attaches to its checkpoint once with the struct format of its
+    state and gets back the state saved by a previous run, if there is one
+    that is recent enough. It then calls save on every iteration of its loop.
+    save writes at most once per period_s and only copies the values into the
+    mapping with seqlock versioning, so it never blocks on I/O. The kernel
+    writes the page back in the background, which survives the process
+    restarting but not the machine losing power. Call flush to force it out.
+
+    Attributes:
+      _path: String. Path of the checkpoint file.
+      _max_age_s: Float. Oldest saved state that is restored, or None.
+      _period_s: Float. Minimum time between saves.
+      _clock: Clock. Timestamps saved states.
+      _file: File. The memory mapped file, once attached.
+      _map: mmap. The mapping, once attached.
+      _state: SeqlockStruct. Timestamp and state values, once attached.
+      _last_save: Float. Time of the last save, or None.
+    """
+
+    def __init__(self, path, max_age_s=None, period_s=0.0, clock=None):
+        """Creates a Checkpoint.
+
+        Args:
+          path: String. Path of the checkpoint file. It is created if needed.
+          max_age_s: Float. Saved states older than this are not restored.
+            (default=None, any age)
+          period_s: Float. Minimum time between saves. (default=0.0)
+          clock: Clock. Timestamps saved states. It must keep counting across
+            restarts, like the system clock. (default=SYSTEM_CLOCK)
+        """
+        self._path = path
+        self._max_age_s = max_age_s
+        self._period_s = period_s
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        self._file = None
+        self._map = None
+        self._state = None
+        self._last_save = None
+
+    def attach(self, fmt):
+        """Maps the checkpoint file and restores the saved state.
+
+        A file holding a different format is reset.
+
+        Args:
+          fmt: String. struct format of the state, like '<dd'.
+
+        Returns:
+          Tuple of the saved state values, or None if nothing was saved, the
+          file held a different format, or the state is older than max_age_s.
+
+        Raises:
+          ValueError: Thrown if the format string is too long.
+        """
+        encoded = fmt.encode('ascii')
+        if len(encoded) > _MAX_FORMAT_LENGTH:
+            raise ValueError('Checkpoint formats must be at most %d characters. '
+                             'Got %s' % (_MAX_FORMAT_LENGTH, fmt))
+        state_format = '<d' + fmt.lstrip('@=<>!')
+        size = _HEADER.size + shared_struct.SeqlockStruct.calcsize(state_format)
+        self.close()
+        matches = False
+        if os.path.exists(self._path) and os.path.getsize(self._path) == size:
+            self._file = open(self._path, 'r+b')
+            header = _HEADER.unpack(self._file.read(_HEADER.size))
+            matches = header == (_MAGIC, _VERSION,
+                                 encoded.ljust(_MAX_FORMAT_LENGTH, b'\0'))
+        if not matches:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._path, 'w+b')
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._state = shared_struct.SeqlockStruct(self._map, _HEADER.size,
+                                                  state_format)
+        if not matches:
+            _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, encoded)
+            return None
+        sequence = self._state.sequence
+        if sequence & 1:
+            # The previous run stopped part way through a save.
+            self._map[_HEADER.size:] = b'\0' * (size - _HEADER.size)
+            return None
+        if not sequence:
+            return None
+        values = self._state.read()
+        age = self._clock.time() - values[0]
+        if self._max_age_s is not None and not 0 <= age <= self._max_age_s:
+            return None
+        return values[1:]
+
+    def save(self, *values):
+        """Saves the state if period_s has passed since the last save.
+
+        Args:
+          *values: The state values in format order.
+
+        Returns:
+          True if the state was saved.
+        """
+        now = self._clock.time()
+        if (self._last_save is not None and
+                now - self._last_save < self._period_s):
+            return False
+        self._state.write(now, *values)
+        self._last_save = now
+        return True
+
+    def flush(self):
+        """Writes the saved state to disk and waits for it to finish."""
+        self._map.flush()
+
+    def close(self):
+        """Unmaps and closes the file."""
+        self._state = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,94 @@
+import threading
+import time
+
+
+def monotonic_ns():
+    """Gets a monotonic timestamp in nanoseconds.
+
+    Returns:
+      Integer. Nanoseconds from an arbitrary, fixed reference point.
+    """
+    if hasattr(time, 'monotonic_ns'):
+        return time.monotonic_ns()
+    return int(time.time() * 1e9)
+
+
+class SystemClock(object):
+    """A clock backed by the system's wall clock.
+
+    SystemClock is the default clock used by controllers. It simply forwards to
+    the time module.
+    """
+
+    def time(self):
+        """Gets the current time.
+
+        Returns:
+          Float. The current time in seconds since the epoch.
+        """
+        return time.time()
+
+    def sleep(self, seconds):
+        """Blocks the calling thread.
+
+        Args:
+          seconds: Float. The number of seconds to sleep for.
+        """
+        time.sleep(seconds)
+
+
+class VirtualClock(object):
+    """A manually advanced clock for running controllers faster than real time.
+
+    VirtualClock never blocks. Calls to sleep advance the clock's time by the
+    requested amount and return immediately so simulated hours of controller
+    time can run in seconds.
+
+    Attributes:
+      _now: Float. The current virtual time in seconds.
+      _lock: Lock. Protects _now when several threads share the clock.
+    """
+
+    def __init__(self, start_time=0.0):
+        """Creates a VirtualClock.
+
+        Args:
+          start_time: Float. The initial virtual time in seconds. (default=0.0)
+        """
+        self._now = float(start_time)
+        self._lock = threading.Lock()
+
+    def time(self):
+        """Gets the current virtual time.
+
+        Returns:
+          Float. The current virtual time in seconds.
+        """
+        return self._now
+
+    def sleep(self, seconds):
+        """Advances the clock instead of blocking.
+
+        Args:
+          seconds: Float. The number of seconds to advance the clock by.
+        """
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """Advances the clock.
+
+        Args:
+          seconds: Float. The number of seconds to advance the clock by.
+
+        Raises:
+          ValueError: Thrown if seconds is negative.
+        """
+        if seconds < 0:
+            raise ValueError('Cannot move the clock backwards. Got %g'
+                             % seconds)
+        with self._lock:
+            self._now += seconds
+
+
+# Shared default clock used when no clock is injected.
+SYSTEM_CLOCK = SystemClock()
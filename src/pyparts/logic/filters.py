@@ -0,0 +1,238 @@
+import array
+import bisect
+import collections
+import math
+import threading
+
+
+def _primed(stage):
+    """Advances a stage generator to its first yield so it can be sent to."""
+    next(stage)
+    return stage
+
+
+def ema(alpha):
+    """Creates an exponential moving average stage.
+
+    NaN samples are skipped and the current average is returned for them.
+    The average starts at the first real sample and is NaN until then.
+
+    Args:
+      alpha: Float from 0.0 to 1.0. Weight of each new sample.
+
+    Returns:
+      Generator. Send it a sample to get the filtered value.
+
+    Raises:
+      ValueError: Thrown if alpha is out of range.
+    """
+    if alpha <= 0 or alpha > 1:
+        raise ValueError('Alpha must be greater than 0 and at most 1. Got %s'
+                         % str(alpha))
+
+    def stage():
+        value = yield
+        average = value
+        while True:
+            value = yield average
+            if math.isnan(value):
+                continue
+            if math.isnan(average):
+                average = value
+            else:
+                average += alpha * (value - average)
+    return _primed(stage())
+
+
+def moving_median(window):
+    """Creates a moving median stage.
+
+    The window is kept sorted as samples come and go, so each sample costs a
+    bisection instead of a sort. NaN samples, like the readings of a faulted
+    sensor, are left out of the window and the median of the samples already
+    in it is returned instead. Until a real sample arrives the output is NaN.
+
+    Args:
+      window: Integer. Number of samples in the median.
+
+    Returns:
+      Generator. Send it a sample to get the filtered value.
+
+    Raises:
+      ValueError: Thrown if the window is empty.
+    """
+    if window < 1:
+        raise ValueError('Window must be at least 1. Got %d' % window)
+
+    def stage():
+        samples = collections.deque()
+        ordered = []
+        value = yield
+        while True:
+            if math.isnan(value):
+                if not ordered:
+                    value = yield value
+                    continue
+            else:
+                samples.append(value)
+                bisect.insort(ordered, value)
+                if len(samples) > window:
+                    del ordered[bisect.bisect_left(ordered, samples.popleft())]
+            middle = len(ordered) // 2
+            if len(ordered) % 2:
+                median = ordered[middle]
+            else:
+                median = (ordered[middle - 1] + ordered[middle]) / 2.0
+            value = yield median
+    return _primed(stage())
+
+
+def rate_limit(max_delta):
+    """Creates a stage limiting how much the value changes per sample.
+
+    A NaN sample leaves the output where it is instead of moving it by
+    max_delta. The output follows the first real sample directly.
+
+    Args:
+      max_delta: Float. Largest change allowed between consecutive outputs.
+
+    Returns:
+      Generator. Send it a sample to get the filtered value.
+    """
+    def stage():
+        value = yield
+        output = value
+        while True:
+            value = yield output
+            if math.isnan(value):
+                continue
+            if math.isnan(output):
+                output = value
+            else:
+                output += max(-max_delta, min(max_delta, value - output))
+    return _primed(stage())
+
+
+def reject_outliers(max_deviation, max_rejections=3):
+    """Creates a stage that drops samples far from the last accepted one.
+
+    A rejected sample is replaced by the last accepted value. After
+    max_rejections consecutive rejections the next sample is accepted, so the
+    stage follows real step changes.
+
+    Args:
+      max_deviation: Float. Largest accepted difference from the last
+        accepted sample.
+      max_rejections: Integer. Consecutive samples rejected before one is
+        accepted anyway. (default=3)
+
+    Returns:
+      Generator. Send it a sample to get the filtered value.
+    """
+    def stage():
+        value = yield
+        accepted = value
+        rejections = 0
+        while True:
+            value = yield accepted
+            if (abs(value - accepted) <= max_deviation or
+                    rejections >= max_rejections or math.isnan(accepted)):
+                accepted = value
+                rejections = 0
+            else:
+                rejections += 1
+    return _primed(stage())
+
+
+def kalman(process_variance, measurement_variance, initial_variance=1.0):
+    """Creates a scalar Kalman filter stage for a slowly changing value.
+
+    NaN samples carry no measurement, so they are skipped and the estimate
+    is returned unchanged. The estimate starts at the first real sample.
+
+    Args:
+      process_variance: Float. How much the true value drifts per sample.
+      measurement_variance: Float. Noise variance of the samples.
+      initial_variance: Float. Uncertainty of the first sample.
+        (default=1.0)
+
+    Returns:
+      Generator. Send it a sample to get the filtered value.
+    """
+    def stage():
+        value = yield
+        estimate = value
+        variance = initial_variance
+        while True:
+            value = yield estimate
+            if math.isnan(value):
+                continue
+            if math.isnan(estimate):
+                estimate = value
+                continue
+            variance += process_variance
+            gain = variance / (variance + measurement_variance)
+            estimate += gain * (value - estimate)
+            variance *= 1.0 - gain
+    return _primed(stage())
+
+
+class Pipeline(object):
+    """Runs samples through a chain of filter stages.
+
+    Stages are primed generators like the ones created by ema or kalman. Each
+    keeps its own fixed size state, so samples are filtered one at a time
+    without building lists of history. A generator can only run in one thread
+    at a time, so the pipeline filters one sample at a time under a lock, and
+    a stage must not be shared between pipelines.
+
+    Attributes:
+      _stages: List of generators. The stages in the order they are applied.
+      _lock: Lock. Keeps two threads from running the stages at once.
+    """
+
+    def __init__(self, *stages):
+        """Creates a Pipeline.
+
+        Args:
+          *stages: Generators. The stages in the order they are applied.
+        """
+        self._stages = list(stages)
+        self._lock = threading.Lock()
+
+    def process(self, value):
+        """Filters one sample.
+
+        Args:
+          value: Float. The raw sample.
+
+        Returns:
+          Float. The filtered value.
+        """
+        with self._lock:
+            for stage in self._stages:
+                value = stage.send(value)
+        return value
+
+    def stream(self, values):
+        """Lazily filters an iterable of samples.
+
+        Args:
+          values: Iterable of floats. The raw samples.
+
+        Returns:
+          Generator of the filtered values.
+        """
+        for value in values:
+            yield self.process(value)
+
+    def process_batch(self, values):
+        """Filters a sequence of samples.
+
+        Args:
+          values: Iterable of floats, like a list or an array. The raw samples.
+
+        Returns:
+          Array of the filtered values as doubles.
+        """
+        return array.array('d', self.stream(values))
@@ -1,6 +1,11 @@
-import time
 import threading
 
+from pyparts.logic import clock as clock_lib
+from pyparts.logic import realtime
+
+# Checkpointed state: integrator accumulator and previous error.
+_CHECKPOINT_FORMAT = '<dd'
+
 
 class PIDController(object):
     """A PID controller for controlling output based on desired value.
@@ -14,15 +19,21 @@ class PIDController(object):
       _ci: Integer. Accumulator for integrator error value.
       _cd: Integer. Accumulator for differntial error value.
       _prev_time: Integer. The time of the previous calculation.
+      _clock: Clock. The clock used to measure time between calculations.
+      _checkpoint: Checkpoint. Saves the integrator and previous error, or
+        None.
     """
 
-    def __init__(self, kp, ki, kd):
+    def __init__(self, kp, ki, kd, clock=None, checkpoint=None):
         """Creates a PIDController.
 
         Args:
           kp: Integer. The constant term.
           ki: Integer. The integrator term.
           kd: Integer. The differential term.
+          clock: Clock. Clock used to measure time. (default=SYSTEM_CLOCK)
+          checkpoint: Checkpoint. Restores the integrator and previous error
+            saved by a previous run and keeps saving them. (default=None)
         """
         self._kp = kp
         self._ki = ki
@@ -33,7 +44,14 @@ class PIDController(object):
         self._ci = 0
         self._cd = 0
 
-        self._prev_time = time.time()
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        self._prev_time = self._clock.time()
+
+        self._checkpoint = checkpoint
+        if checkpoint is not None:
+            state = checkpoint.attach(_CHECKPOINT_FORMAT)
+            if state is not None:
+                self._ci, self._prev_error = state
 
     def get_output(self, error):
         """Does a PID calculation and returns the new output value.
@@ -44,7 +62,7 @@ class PIDController(object):
         Returns:
           Float. The output of the PID controller for the current error.
         """
-        self._current_time = time.time()
+        self._current_time = self._clock.time()
         dt = self._current_time - self._prev_time
         de = error - self._prev_error
 
@@ -56,6 +74,8 @@ class PIDController(object):
 
         self._prev_time = self._current_time
         self._prev_error = error
+        if self._checkpoint is not None:
+            self._checkpoint.save(self._ci, self._prev_error)
 
         return self._cp + (self._ki * self._ci) + (self._kd * self._cd)
 
@@ -73,10 +93,14 @@ class PIDController(object):
           _input_func: Function. Function called to determine error.
           _output_func: Function. Function called with the output of the PID.
           _set_point: Float. The desired value.
-          _stop: Boolean. Set to true to disable the controller.
+          _current_value: Float. The value read by the most recent iteration.
+          _runtime_config: RuntimeConfig. Real-time settings applied by the
+            worker thread, or None.
+          _stopping: Boolean. Set to true to disable the controller.
         """
 
-        def __init__(self, kp, kd, ki, input_func, output_func):
+        def __init__(self, kp, kd, ki, input_func, output_func, clock=None,
+                     runtime_config=None, checkpoint=None):
             """Creates a PIDController.Worker.
 
             Args:
@@ -85,13 +109,22 @@ class PIDController(object):
               kd: Integer. The differential term.
               input_func: Function. Function called to calculate error.
               output_func: Function. Function called with the output of the PID.
+              clock: Clock. Clock used by the PID controller.
+                (default=SYSTEM_CLOCK)
+              runtime_config: RuntimeConfig. Real-time settings applied when
+                the worker starts. (default=None)
+              checkpoint: Checkpoint. Saves the PID controller's state so a
+                restarted worker resumes where it left off. (default=None)
             """
             super(PIDController.Worker, self).__init__()
-            self._controller = PIDController(kp, ki, kd)
+            self._controller = PIDController(kp, ki, kd, clock=clock,
+                                             checkpoint=checkpoint)
             self._input_func = input_func
             self._output_func = output_func
             self._set_point = 0
-            self._stop = False
+            self._current_value = None
+            self._runtime_config = runtime_config
+            self._stopping = False
 
         @property
         def desired_value(self):
@@ -110,13 +143,37 @@ class PIDController(object):
             """
             self._set_point = value
 
+        @property
+        def current_value(self):
+            """Gets the value read by the most recent control iteration.
+
+            Returns:
+              Float. The last input value, or None before the first iteration.
+            """
+            return self._current_value
+
         def stop(self):
             """Stops the controller."""
-            self._stop = True
+            self._stopping = True
+
+        def step(self):
+            """Runs a single iteration of the control loop in the calling thread.
+
+            Returns:
+              Float. The output of the PID controller.
+            """
+            current_val = self._input_func()
+            self._current_value = current_val
+            error = self._set_point - current_val
+            output = self._controller.get_output(error)
+            self._output_func(output)
+            return output
 
         def run(self):
             """Loop for calculating error, running the PID, and handling output."""
-            while not self._stop:
-                current_val = self._input_func()
-                error = self._set_point - current_val
-                self._output_func(self._controller.get_output(error))
+            # A default RuntimeConfig changes nothing.
+            config = self._runtime_config or realtime.RuntimeConfig()
+            config.apply()
+            while not self._stopping:
+                with config.hot_loop():
+                    self.step()
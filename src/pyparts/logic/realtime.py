@@ -0,0 +1,161 @@
+import collections
+import contextlib
+import ctypes
+import ctypes.util
+import gc
+import os
+
+# Scheduling policies.
+SCHED_OTHER = 'other'
+SCHED_FIFO = 'fifo'
+SCHED_RR = 'rr'
+
+_POLICIES = {
+    SCHED_OTHER: 'SCHED_OTHER',
+    SCHED_FIFO: 'SCHED_FIFO',
+    SCHED_RR: 'SCHED_RR',
+}
+
+# mlockall flags from sys/mman.h.
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+# Which settings of a RuntimeConfig took effect. Each is True if applied,
+# False if it was requested but not permitted or not supported, and None if
+# it was not requested.
+RuntimeStatus = collections.namedtuple(
+    'RuntimeStatus', ['affinity', 'scheduling', 'memory_lock', 'gc'])
+
+
+def _mlockall():
+    """Locks the process's current and future pages into memory.
+
+    Returns:
+      True if the pages were locked.
+    """
+    path = ctypes.util.find_library('c')
+    if path is None:
+        return False
+    libc = ctypes.CDLL(path, use_errno=True)
+    if not hasattr(libc, 'mlockall'):
+        return False
+    return libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) == 0
+
+
+class RuntimeConfig(object):
+    """Real-time settings that pyparts worker threads can opt into.
+
+    Workers given a RuntimeConfig call apply from their own thread before
+    entering their loop. CPU affinity and scheduling apply to that thread.
+    Memory locking and garbage collector settings apply to the whole process.
+    Settings that need privileges or aren't supported on the platform are
+    skipped, and apply reports which ones took effect.
+
+    Attributes:
+      _cpus: Set of integers. CPUs the thread may run on, or None.
+      _policy: String. SCHED_OTHER, SCHED_FIFO or SCHED_RR, or None.
+      _priority: Integer. Static priority for SCHED_FIFO and SCHED_RR.
+      _lock_memory: Boolean. Whether to lock all pages into memory.
+      _gc_freeze: Boolean. Whether to move existing objects out of the
+        collector's reach.
+      _gc_thresholds: Tuple. Collector thresholds, or None to keep them.
+      _pause_gc: Boolean. Whether hot_loop disables the collector.
+    """
+
+    def __init__(self, cpus=None, policy=None, priority=None,
+                 lock_memory=False, gc_freeze=False, gc_thresholds=None,
+                 pause_gc=False):
+        """Creates a RuntimeConfig.
+
+        Args:
+          cpus: Iterable of integers. CPUs the thread may run on, like {3} for
+            a core isolated with isolcpus. (default=None, any CPU)
+          policy: SCHED_OTHER, SCHED_FIFO or SCHED_RR. Scheduling policy of
+            the thread. (default=None, unchanged)
+          priority: Integer. Static priority for SCHED_FIFO and SCHED_RR.
+            (default=None, the lowest real-time priority)
+          lock_memory: Boolean. Lock all current and future pages into memory
+            so the loop never waits on a page fault. (default=False)
+          gc_freeze: Boolean. Freeze the objects created so far, so
+            collections no longer walk them. (default=False)
+          gc_thresholds: Tuple. Thresholds passed to gc.set_threshold.
+            (default=None, unchanged)
+          pause_gc: Boolean. Disable the collector inside hot_loop.
+            (default=False)
+
+        Raises:
+          ValueError: Thrown if the policy is unknown.
+        """
+        if policy is not None and policy not in _POLICIES:
+            raise ValueError('Unknown scheduling policy %s' % str(policy))
+        self._cpus = set(cpus) if cpus is not None else None
+        self._policy = policy
+        self._priority = priority
+        self._lock_memory = lock_memory
+        self._gc_freeze = gc_freeze
+        self._gc_thresholds = gc_thresholds
+        self._pause_gc = pause_gc
+
+    def _apply_affinity(self):
+        if self._cpus is None:
+            return None
+        if not hasattr(os, 'sched_setaffinity'):
+            return False
+        try:
+            os.sched_setaffinity(0, self._cpus)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _apply_scheduling(self):
+        if self._policy is None:
+            return None
+        policy = getattr(os, _POLICIES[self._policy], None)
+        if policy is None or not hasattr(os, 'sched_setscheduler'):
+            return False
+        priority = self._priority
+        if priority is None:
+            priority = os.sched_get_priority_min(policy)
+        try:
+            os.sched_setscheduler(0, policy, os.sched_param(priority))
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _apply_gc(self):
+        if not self._gc_freeze and self._gc_thresholds is None:
+            return None
+        if self._gc_thresholds is not None:
+            gc.set_threshold(*self._gc_thresholds)
+        if self._gc_freeze:
+            if not hasattr(gc, 'freeze'):
+                return False
+            gc.collect()
+            gc.freeze()
+        return True
+
+    def apply(self):
+        """Applies the settings to the calling thread and process.
+
+        Returns:
+          RuntimeStatus. Which of the requested settings took effect.
+        """
+        memory_lock = _mlockall() if self._lock_memory else None
+        return RuntimeStatus(self._apply_affinity(), self._apply_scheduling(),
+                             memory_lock, self._apply_gc())
+
+    @contextlib.contextmanager
+    def hot_loop(self):
+        """Context for a latency sensitive block.
+
+        The garbage collector is disabled inside the block when pause_gc is
+        set, and restored to its previous state afterwards.
+        """
+        if not self._pause_gc or not gc.isenabled():
+            yield
+            return
+        gc.disable()
+        try:
+            yield
+        finally:
+            gc.enable()
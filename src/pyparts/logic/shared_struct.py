@@ -0,0 +1,150 @@
+import struct
+import time
+
+from pyparts.logic import clock as clock_lib
+
+# Sequence counter stored in front of every SeqlockStruct.
+_SEQUENCE = struct.Struct('<Q')
+
+# Reads retry this many times without sleeping before backing off.
+_SPIN_RETRIES = 100
+
+# Bounds of the exponential backoff between read retries.
+_MIN_BACKOFF_S = 0.00001
+_MAX_BACKOFF_S = 0.001
+
+
+class SeqlockError(Exception):
+    """Error type for reads that never saw a finished write."""
+    pass
+
+
+class SeqlockStruct(object):
+    """A fixed layout struct in a shared buffer protected by a seqlock.
+
+    A single writer increments a sequence counter before and after packing the
+    fields so readers in other threads or processes can detect a torn read and
+    retry without taking a lock. The buffer can be a memory map or
+    multiprocessing shared memory.
+
+    Python issues no memory barriers around the stores into the buffer. Between
+    threads the GIL orders them. Between processes the seqlock relies on the
+    CPU keeping stores in program order, which x86 does but weakly ordered CPUs
+    such as ARM don't, so a reader there can rarely accept a torn copy. Pass a
+    multiprocessing lock shared by the writer and readers where that matters;
+    reads and writes then take the lock instead.
+
+    Attributes:
+      _buffer: Writable buffer. The shared memory holding the struct.
+      _offset: Integer. Offset of the struct in the buffer.
+      _struct: Struct. Layout of the fields after the sequence counter.
+      _lock: Lock. Serializes reads and writes, or None to use the seqlock
+        alone.
+    """
+
+    def __init__(self, buffer, offset, fmt, lock=None):
+        """Creates a SeqlockStruct.
+
+        Args:
+          buffer: Writable buffer. The shared memory holding the struct.
+          offset: Integer. Offset of the struct in the buffer.
+          fmt: String. struct format of the fields, like '<dd'.
+          lock: Lock. A lock shared with every other reader and writer of the
+            struct, for weakly ordered CPUs. (default=None)
+        """
+        self._buffer = buffer
+        self._offset = offset
+        self._struct = struct.Struct(fmt)
+        self._lock = lock
+
+    @classmethod
+    def calcsize(cls, fmt):
+        """Gets the number of bytes used by a struct with the given format.
+
+        Args:
+          fmt: String. struct format of the fields.
+
+        Returns:
+          Integer. Size in bytes including the sequence counter.
+        """
+        return _SEQUENCE.size + struct.calcsize(fmt)
+
+    @property
+    def size(self):
+        """Gets the number of bytes used by the struct in the buffer."""
+        return _SEQUENCE.size + self._struct.size
+
+    @property
+    def sequence(self):
+        """Gets the current sequence number. Odd while a write is underway."""
+        return _SEQUENCE.unpack_from(self._buffer, self._offset)[0]
+
+    def write(self, *values):
+        """Writes the fields. Only one writer may write at a time.
+
+        Args:
+          *values: The field values in format order.
+        """
+        if self._lock is not None:
+            with self._lock:
+                self._write(values)
+            return
+        self._write(values)
+
+    def _write(self, values):
+        sequence = self.sequence + 1
+        _SEQUENCE.pack_into(self._buffer, self._offset, sequence)
+        self._struct.pack_into(self._buffer, self._offset + _SEQUENCE.size,
+                               *values)
+        _SEQUENCE.pack_into(self._buffer, self._offset, sequence + 1)
+
+    def read(self, timeout_s=1.0):
+        """Reads a consistent copy of the fields.
+
+        A read that overlaps a write is retried, spinning at first and then
+        backing off with growing sleeps so a stalled writer doesn't pin a CPU.
+        With a lock, the read waits for the lock instead.
+
+        Args:
+          timeout_s: Float. Time to keep retrying once spinning has failed, or
+            to wait for the lock. (default=1.0)
+
+        Returns:
+          Tuple of the field values in format order.
+
+        Raises:
+          SeqlockError: Thrown if no write finished before the timeout, for
+            example because the writer died in the middle of one.
+        """
+        if self._lock is not None:
+            if not self._lock.acquire(timeout=timeout_s):
+                raise SeqlockError('Lock of the struct at offset %d was not '
+                                   'released within %s seconds.'
+                                   % (self._offset, timeout_s))
+            try:
+                return self._struct.unpack_from(
+                    self._buffer, self._offset + _SEQUENCE.size)
+            finally:
+                self._lock.release()
+        attempts = 0
+        deadline_ns = None
+        backoff_s = _MIN_BACKOFF_S
+        while True:
+            before = self.sequence
+            if not before & 1:
+                values = self._struct.unpack_from(
+                    self._buffer, self._offset + _SEQUENCE.size)
+                if self.sequence == before:
+                    return values
+            attempts += 1
+            if attempts <= _SPIN_RETRIES:
+                continue
+            now_ns = clock_lib.monotonic_ns()
+            if deadline_ns is None:
+                deadline_ns = now_ns + int(timeout_s * 1e9)
+            elif now_ns >= deadline_ns:
+                raise SeqlockError('Write to the struct at offset %d did not '
+                                   'finish within %s seconds.'
+                                   % (self._offset, timeout_s))
+            time.sleep(backoff_s)
+            backoff_s = min(backoff_s * 2, _MAX_BACKOFF_S)
@@ -0,0 +1,175 @@
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+_NS_PER_S = 1000000000
+
+_default_wheel = None
+_default_wheel_lock = threading.Lock()
+
+
+class Timer(object):
+    """A handle for a callback scheduled on a TimerWheel.
+
+    Attributes:
+      _wheel: TimerWheel. The wheel the timer is scheduled on.
+      _callback: Function. Called when the timer expires.
+      _slot: Integer. Wheel slot holding the timer, or None when not armed.
+      _rounds: Integer. Full wheel revolutions left before the timer expires.
+    """
+
+    def __init__(self, wheel, callback):
+        self._wheel = wheel
+        self._callback = callback
+        self._slot = None
+        self._rounds = 0
+
+    @property
+    def is_armed(self):
+        """Checks if the timer is waiting to expire.
+
+        Returns:
+          True if the timer has not expired or been cancelled.
+        """
+        return self._slot is not None
+
+    def cancel(self):
+        """Cancels the timer if it has not expired yet."""
+        self._wheel.cancel(self)
+
+
+class TimerWheel(threading.Thread):
+    """A hashed timer wheel servicing many timeouts from a single thread.
+
+    Timers are placed into one of a fixed number of slots based on their
+    expiry tick. The wheel thread visits one slot per tick and fires the timers
+    in it whose rounds have run out. Arming and cancelling a timer are O(1) and
+    no threads are created per timer. Callbacks run on the wheel thread and
+    should return quickly.
+
+    Attributes:
+      _tick_ns: Integer. Length of one tick in nanoseconds.
+      _slots: List of sets. The timers waiting in each slot.
+      _cursor: Integer. The slot the wheel most recently visited.
+      _count: Integer. Number of armed timers.
+      _condition: Condition. Protects the wheel and wakes the thread.
+      _stopping: Boolean. Set to true to stop the wheel thread.
+    """
+
+    def __init__(self, tick_s=0.005, num_slots=512):
+        """Creates a TimerWheel.
+
+        Args:
+          tick_s: Float. Timer resolution in seconds. (default=0.005)
+          num_slots: Integer. Number of wheel slots. (default=512)
+
+        Raises:
+          ValueError: Thrown if tick_s or num_slots is not positive.
+        """
+        super(TimerWheel, self).__init__()
+        if tick_s <= 0 or num_slots <= 0:
+            raise ValueError('Tick and number of slots must be greater than 0.')
+        self.daemon = True
+        self._tick_ns = int(tick_s * _NS_PER_S)
+        self._slots = [set() for _ in range(num_slots)]
+        self._cursor = 0
+        self._count = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+
+    def schedule(self, delay_s, callback):
+        """Schedules a callback to be called after a delay.
+
+        Args:
+          delay_s: Float. Seconds to wait before calling the callback.
+          callback: Function. Called with no arguments when the timer expires.
+
+        Returns:
+          Timer. A handle that can be used to cancel the timer.
+        """
+        timer = Timer(self, callback)
+        self.arm(timer, delay_s)
+        return timer
+
+    def arm(self, timer, delay_s):
+        """Arms or re-arms a timer.
+
+        Args:
+          timer: Timer. The timer to arm. It is cancelled first if armed.
+          delay_s: Float. Seconds to wait before calling the timer's callback.
+        """
+        ticks = max(1, int(-(-delay_s * _NS_PER_S // self._tick_ns)))
+        num_slots = len(self._slots)
+        with self._condition:
+            self._remove(timer)
+            timer._slot = (self._cursor + ticks) % num_slots
+            timer._rounds = (ticks - 1) // num_slots
+            self._slots[timer._slot].add(timer)
+            self._count += 1
+            if self._count == 1:
+                self._condition.notify()
+
+    def cancel(self, timer):
+        """Cancels a timer.
+
+        Args:
+          timer: Timer. The timer to cancel.
+        """
+        with self._condition:
+            self._remove(timer)
+
+    def _remove(self, timer):
+        """Removes a timer from its slot. Caller must hold _condition."""
+        if timer._slot is not None:
+            self._slots[timer._slot].discard(timer)
+            timer._slot = None
+            self._count -= 1
+
+    def stop(self):
+        """Stops the wheel thread."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+
+    def run(self):
+        """Loop for advancing the wheel and firing expired timers."""
+        next_tick = clock_lib.monotonic_ns() + self._tick_ns
+        while True:
+            expired = []
+            with self._condition:
+                if self._stopping:
+                    return
+                if not self._count:
+                    # Sleep until a timer is armed instead of ticking idle.
+                    self._condition.wait()
+                    next_tick = clock_lib.monotonic_ns() + self._tick_ns
+                    continue
+                delay_ns = next_tick - clock_lib.monotonic_ns()
+                if delay_ns > 0:
+                    self._condition.wait(float(delay_ns) / _NS_PER_S)
+                    continue
+                next_tick += self._tick_ns
+                self._cursor = (self._cursor + 1) % len(self._slots)
+                slot = self._slots[self._cursor]
+                for timer in list(slot):
+                    if timer._rounds:
+                        timer._rounds -= 1
+                    else:
+                        self._remove(timer)
+                        expired.append(timer)
+            for timer in expired:
+                timer._callback()
+
+
+def get_default_wheel():
+    """Gets the TimerWheel shared by all parts, starting it if needed.
+
+    Returns:
+      TimerWheel. The shared, running timer wheel.
+    """
+    global _default_wheel
+    with _default_wheel_lock:
+        if _default_wheel is None:
+            _default_wheel = TimerWheel()
+            _default_wheel.start()
+        return _default_wheel
@@ -1,3 +1,4 @@
+import contextlib
 import time
 
 from pyparts.parts import base_part
@@ -5,7 +6,8 @@ from pyparts.parts import base_part
 _LCD_WIDTH = 84
 _LCD_HEIGHT = 48
 _NUMBER_OF_LINES = 6
-_PIXELS_PER_LINE = _LCD_HEIGHT / _NUMBER_OF_LINES
+_PIXELS_PER_LINE = _LCD_HEIGHT // _NUMBER_OF_LINES
+_FRAME_SIZE = _LCD_WIDTH * _LCD_HEIGHT // 8
 _POWER_DOWN = 0x04
 _ENTRY_MODE = 0x02
 
@@ -24,6 +26,11 @@ _SET_VOP = 0x80
 _SET_BIAS = 0x10
 _SET_TEMP = 0x04
 
+_BLANK_FRAME = b'\0' * _FRAME_SIZE
+
+# Most commands sent in one SPI write. Longer batches are split.
+_MAX_BATCH = 16
+
 
 class Nokia5110(base_part.BasePart):
 
@@ -39,7 +46,22 @@ class Nokia5110(base_part.BasePart):
         self._spi = spi
         self._spi.open()
         self._spi.set_mode(0)
-        self._spi.set_clock_frequency(4000000)
+        self._spi.set_clock_frequency_hz(4000000)
+
+        # Reused for every transfer so commands and frames don't allocate.
+        self._commands = bytearray(_MAX_BATCH)
+        self._command_views = [memoryview(self._commands)[:count]
+                               for count in range(_MAX_BATCH + 1)]
+        self._frame = bytearray(_FRAME_SIZE)
+
+        # Commands waiting to be written, and how deep commands() is nested.
+        self._pending = 0
+        self._batch_depth = 0
+        # Whether the display is in extended instruction mode once the
+        # pending commands are written.
+        self._extended = False
+        # Last level written to the DC pin, or None if unknown.
+        self._dc_high = None
 
         self._dc = dc
         self._rst = rst
@@ -50,26 +72,77 @@ class Nokia5110(base_part.BasePart):
         self._spi.close()
         super(Nokia5110, self).__del__()
 
+    @contextlib.contextmanager
+    def commands(self):
+        """Batches the commands sent inside the block.
+
+        Commands are collected and sent with a single DC transition and a
+        single SPI write when the outermost block exits, or before any data
+        is sent. Consecutive extended commands share one switch into and out
+        of extended instruction mode.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            self._flush_commands()
+
+    def _queue(self, command):
+        if self._pending == _MAX_BATCH:
+            self._write_commands()
+        self._commands[self._pending] = command
+        self._pending += 1
+
+    def _leave_extended(self):
+        """Queues a switch back to normal instructions if needed."""
+        if self._extended:
+            self._queue(_FUNCTION_SET)
+            self._queue(_DISPLAY_CONTROL | _DISPLAY_NORMAL)
+            self._extended = False
+
+    def _write_commands(self):
+        """Writes the pending commands."""
+        if not self._pending:
+            return
+        if self._dc_high is not False:
+            self._dc.set_low()
+            self._dc_high = False
+        self._spi.write(self._command_views[self._pending])
+        self._pending = 0
+
+    def _flush_commands(self):
+        """Writes the pending commands unless they are being batched."""
+        if self._batch_depth:
+            return
+        self._leave_extended()
+        self._write_commands()
+
     def send_command(self, command):
-        self._dc.set_low()
-        self._spi.write([command])
+        self._leave_extended()
+        self._queue(command)
+        self._flush_commands()
 
     def send_extended_command(self, command):
-        # Set extended command mode
-        self.send_command(_FUNCTION_SET | _EXTENDED_INSTRUCTION)
-        self.send_command(command)
-        # Set normal display mode.
-        self.send_command(_FUNCTION_SET)
-        self.send_command(_DISPLAY_CONTROL | _DISPLAY_NORMAL)
+        if not self._extended:
+            self._queue(_FUNCTION_SET | _EXTENDED_INSTRUCTION)
+            self._extended = True
+        self._queue(command)
+        self._flush_commands()
 
     def send_data(self, data):
-        self._dc.set_high()
+        self._leave_extended()
+        self._write_commands()
+        if not self._dc_high:
+            self._dc.set_high()
+            self._dc_high = True
         self._spi.write(data)
 
     def enable(self, contrast=50, bias=4):
         self.reset()
-        self.set_bias(bias)
-        self.set_contrast(contrast)
+        with self.commands():
+            self.set_bias(bias)
+            self.set_contrast(contrast)
         self._enabled = True
 
     @property
@@ -82,8 +155,10 @@ class Nokia5110(base_part.BasePart):
         self._rst.set_high()
 
     def set_cursor(self, x, y):
-        self.send_command(_SET_X_ADDR | x)
-        self.send_command(_SET_Y_ADDR | y)
+        self._leave_extended()
+        self._queue(_SET_X_ADDR | x)
+        self._queue(_SET_Y_ADDR | y)
+        self._flush_commands()
 
     def reset_cursor(self):
         self.set_cursor(0, 0)
@@ -91,8 +166,9 @@ class Nokia5110(base_part.BasePart):
     def display_image(self, image):
         if image.mode != '1':
             raise ValueError('Image must be in 1bit mode.')
-        buffer = []
+        frame = self._frame
         pix = image.load()
+        index = 0
         for row in range(_NUMBER_OF_LINES):
             for x in range(_LCD_WIDTH):
                 bits = 0
@@ -100,13 +176,14 @@ class Nokia5110(base_part.BasePart):
                     bits = bits << 1
                     bits |= 1 if pix[(
                         x, row * _PIXELS_PER_LINE + 7 - bit)] == 0 else 0
-                buffer.append(bits)
+                frame[index] = bits
+                index += 1
         self.clear()
-        self.send_data(buffer)
+        self.send_data(frame)
 
     def clear(self):
         self.reset_cursor()
-        self.send_data([0] * (_LCD_WIDTH * _LCD_HEIGHT / 8))
+        self.send_data(_BLANK_FRAME)
 
     def set_contrast(self, contrast):
         contrast = max(0, min(contrast, 0x7f))
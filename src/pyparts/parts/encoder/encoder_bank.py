@@ -0,0 +1,180 @@
+import array
+import threading
+import time
+
+from pyparts.parts import base_part
+
+# Marks a transition that skipped a state. The direction is assumed to be the
+# same as the previous step, like RotaryEncoder.get_delta.
+_SKIP = 2
+
+
+def _build_transition_table():
+    """Builds the delta for every (previous state, state) pair.
+
+    States use the same numbering as RotaryEncoder.get_state so consecutive
+    quadrature states differ by one.
+
+    Returns:
+      Array of deltas indexed by previous_state << 2 | state.
+    """
+    table = array.array('b', [0] * 16)
+    for previous in range(4):
+        for state in range(4):
+            delta = (state - previous) % 4
+            if delta == 3:
+                delta = -1
+            elif delta == 2:
+                delta = _SKIP
+            table[previous << 2 | state] = delta
+    return table
+
+
+_TRANSITIONS = _build_transition_table()
+
+# State for each (a << 1 | b) pin reading.
+_STATES = array.array('B', [(a ^ b) | b << 1 for a in (0, 1) for b in (0, 1)])
+
+
+class EncoderBank(threading.Thread, base_part.BasePart):
+    """Scans many rotary encoders from a single thread.
+
+    Every scan reads all of the encoder pins with one call to the platform's
+    read_digital_inputs, which platforms with port reads can service in a
+    single operation. Each encoder is then decoded with a transition lookup
+    table. Positions, pending deltas and velocities are kept in compact arrays
+    indexed by encoder.
+
+    Attributes:
+      _pins: List of DigitalInput. The a and b pins of every encoder in order.
+      _platform: BasePlatform. Platform used for bulk pin reads.
+      _poll_interval_s: Float. Time between scans.
+      _velocity_interval_s: Float. Time between velocity updates.
+      _states: Array. Last decoded state of each encoder.
+      _directions: Array. Direction of the last step of each encoder.
+      _positions: Array. Accumulated position of each encoder.
+      _deltas: Array. Steps since get_delta was last called for each encoder.
+      _velocities: Array. Steps per second of each encoder.
+      _lock: Lock. Protects the positions, deltas and velocities.
+      _stopping: Boolean. Set to true to stop scanning.
+    """
+
+    def __init__(self, pin_pairs, platform=None, poll_interval_s=0.001,
+                 velocity_interval_s=0.1):
+        """Creates an EncoderBank.
+
+        Args:
+          pin_pairs: List of (a_pin, b_pin) DigitalInput pairs, one per encoder.
+          platform: BasePlatform. Platform used to read all of the pins at
+            once. (default=None, read each pin separately)
+          poll_interval_s: Float. Time between scans. (default=0.001)
+          velocity_interval_s: Float. Time between velocity updates.
+            (default=0.1)
+        """
+        super(EncoderBank, self).__init__()
+        self.daemon = True
+        self._pins = [pin for pair in pin_pairs for pin in pair]
+        self._platform = platform
+        self._poll_interval_s = poll_interval_s
+        self._velocity_interval_s = velocity_interval_s
+        count = len(pin_pairs)
+        self._states = array.array('B', [0] * count)
+        self._directions = array.array('b', [0] * count)
+        self._positions = array.array('l', [0] * count)
+        self._deltas = array.array('l', [0] * count)
+        self._velocities = array.array('d', [0.0] * count)
+        self._lock = threading.Lock()
+        self._stopping = False
+        values = self._read_pins()
+        for i in range(count):
+            self._states[i] = _STATES[values[2 * i] << 1 | values[2 * i + 1]]
+
+    def __len__(self):
+        return len(self._states)
+
+    def _read_pins(self):
+        if self._platform is not None:
+            values = self._platform.read_digital_inputs(self._pins)
+        else:
+            values = [pin.is_high for pin in self._pins]
+        return [1 if value else 0 for value in values]
+
+    def scan(self):
+        """Reads and decodes every encoder once."""
+        values = self._read_pins()
+        states = self._states
+        directions = self._directions
+        positions = self._positions
+        deltas = self._deltas
+        with self._lock:
+            for i in range(len(states)):
+                state = _STATES[values[2 * i] << 1 | values[2 * i + 1]]
+                delta = _TRANSITIONS[states[i] << 2 | state]
+                if not delta:
+                    continue
+                if delta == _SKIP:
+                    delta = 2 if directions[i] >= 0 else -2
+                states[i] = state
+                directions[i] = 1 if delta > 0 else -1
+                positions[i] += delta
+                deltas[i] += delta
+
+    def run(self):
+        """Loop for scanning the encoders and updating velocities."""
+        last_positions = array.array('l', self._positions)
+        last_update = time.time()
+        while not self._stopping:
+            self.scan()
+            now = time.time()
+            elapsed = now - last_update
+            if elapsed >= self._velocity_interval_s:
+                with self._lock:
+                    for i in range(len(self._positions)):
+                        position = self._positions[i]
+                        self._velocities[i] = (
+                            (position - last_positions[i]) / elapsed)
+                        last_positions[i] = position
+                last_update = now
+            time.sleep(self._poll_interval_s)
+
+    def stop(self):
+        """Stops scanning."""
+        self._stopping = True
+
+    def get_delta(self, index):
+        """Gets the steps an encoder moved since the last call.
+
+        Args:
+          index: Integer. The encoder's index in pin_pairs.
+
+        Returns:
+          Integer. The number of steps moved, negative when turning backwards.
+        """
+        with self._lock:
+            delta = self._deltas[index]
+            self._deltas[index] = 0
+        return delta
+
+    def position(self, index):
+        """Gets the accumulated position of an encoder.
+
+        Args:
+          index: Integer. The encoder's index in pin_pairs.
+
+        Returns:
+          Integer. Steps moved since the bank was created.
+        """
+        with self._lock:
+            return self._positions[index]
+
+    def velocity(self, index):
+        """Gets the speed of an encoder.
+
+        Args:
+          index: Integer. The encoder's index in pin_pairs.
+
+        Returns:
+          Float. Steps per second over the last velocity interval.
+        """
+        with self._lock:
+            return self._velocities[index]
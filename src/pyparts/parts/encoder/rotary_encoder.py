@@ -2,8 +2,12 @@ import math
 import time
 import threading
 
+from pyparts.logic import realtime
 from pyparts.parts import base_part
 
+# Checkpointed state: accumulated position.
+_CHECKPOINT_FORMAT = '<q'
+
 
 class RotaryEncoder(base_part.BasePart):
 
@@ -35,22 +39,42 @@ class RotaryEncoder(base_part.BasePart):
 
     class Worker(threading.Thread):
 
-        def __init__(self, a_pin, b_pin):
+        def __init__(self, a_pin, b_pin, runtime_config=None,
+                     checkpoint=None):
             super(RotaryEncoder.Worker, self).__init__()
             self._lock = threading.Lock()
             self._encoder = RotaryEncoder(a_pin, b_pin)
             self._delta = 0
-            self._stop = False
+            self._position = 0
+            self._runtime_config = runtime_config
+            self._checkpoint = checkpoint
+            if checkpoint is not None:
+                state = checkpoint.attach(_CHECKPOINT_FORMAT)
+                if state is not None:
+                    self._position = state[0]
+            self._stopping = False
 
         def run(self):
-            while not self._stop:
-                delta = self._encoder.get_delta()
-                with self._lock:
-                    self._delta += delta
+            # A default RuntimeConfig changes nothing.
+            config = self._runtime_config or realtime.RuntimeConfig()
+            config.apply()
+            while not self._stopping:
+                with config.hot_loop():
+                    delta = self._encoder.get_delta()
+                    with self._lock:
+                        self._delta += delta
+                        self._position += delta
+                    if self._checkpoint is not None:
+                        self._checkpoint.save(self._position)
                 time.sleep(0.001)
 
         def stop(self):
-            self._stop = True
+            self._stopping = True
+
+        @property
+        def position(self):
+            with self._lock:
+                return self._position
 
         def get_delta(self):
             with self._lock:
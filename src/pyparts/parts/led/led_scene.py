@@ -0,0 +1,205 @@
+import array
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+# Number of brightness levels per channel.
+_LEVELS = 256
+_MAX_LEVEL = _LEVELS - 1
+
+# Number of hues in the hue table.
+_HUES = 360
+
+# Duty cycle resolution kept in the gamma table, in percent.
+_DUTY_CYCLE_DIGITS = 3
+
+
+def _gamma_table(gamma):
+    """Builds the duty cycle for every brightness level.
+
+    Args:
+      gamma: Float. Gamma applied to the brightness levels.
+
+    Returns:
+      Tuple of duty cycles from 0.0 to 100.0, indexed by level.
+    """
+    return tuple(round(100.0 * (float(level) / _MAX_LEVEL) ** gamma,
+                       _DUTY_CYCLE_DIGITS) for level in range(_LEVELS))
+
+
+def _hue_table():
+    """Builds the fully saturated, full brightness color of every hue.
+
+    Returns:
+      Array of red, green and blue levels, three entries per degree of hue.
+    """
+    table = array.array('B')
+    for hue in range(_HUES):
+        sector, remainder = divmod(hue * 6, _HUES)
+        rising = int(round(_MAX_LEVEL * float(remainder) / _HUES))
+        falling = _MAX_LEVEL - rising
+        table.extend([
+            (_MAX_LEVEL, rising, 0),
+            (falling, _MAX_LEVEL, 0),
+            (0, _MAX_LEVEL, rising),
+            (0, falling, _MAX_LEVEL),
+            (rising, 0, _MAX_LEVEL),
+            (_MAX_LEVEL, 0, falling),
+        ][sector])
+    return table
+
+
+_HUE_TABLE = _hue_table()
+
+
+class LedScene(threading.Thread):
+    """Renders colors for many RGBLeds at a fixed frame rate.
+
+    The target color of every LED is kept as 8 bit levels in one array.
+    Rendering maps the levels through a precomputed gamma table and only sends
+    the PWM channels whose duty cycle changed since the previous frame, so a
+    static scene costs no PWM updates at all.
+
+    Attributes:
+      _channels: List of PWMOutput. The red, green and blue outputs of every
+        LED in order.
+      _levels: Array. Target level of every channel.
+      _sent: Array. Level last sent to every channel, or -1 if never sent.
+      _gamma_table: Tuple. Duty cycle for every level.
+      _period_s: Float. Time between frames.
+      _frame_callback: Function. Called with the scene before each frame.
+      _clock: Clock. Provides the time and sleeps between frames.
+      _lock: Lock. Protects the target levels.
+      _frames: Integer. Number of frames rendered.
+      _stopping: Boolean. Set to true to stop rendering.
+    """
+
+    def __init__(self, leds, frame_rate_hz=50.0, gamma=2.2,
+                 frame_callback=None, clock=None):
+        """Creates a LedScene.
+
+        Args:
+          leds: List of RGBLed. The LEDs to render.
+          frame_rate_hz: Float. Frames rendered per second. (default=50.0)
+          gamma: Float. Gamma correction applied to every channel.
+            (default=2.2)
+          frame_callback: Function. Called with the scene before each frame,
+            for animations. (default=None)
+          clock: Clock. Provides the time and sleeps between frames.
+            (default=SYSTEM_CLOCK)
+        """
+        super(LedScene, self).__init__()
+        self.daemon = True
+        self._channels = [pwm for led in leds for pwm in led.channels]
+        self._levels = array.array('B', [0] * len(self._channels))
+        self._sent = array.array('h', [-1] * len(self._channels))
+        self._gamma_table = _gamma_table(gamma)
+        self._period_s = 1.0 / frame_rate_hz
+        self._frame_callback = frame_callback
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._stopping = False
+
+    def __len__(self):
+        return len(self._levels) // 3
+
+    @property
+    def frames(self):
+        """Gets the number of frames rendered."""
+        return self._frames
+
+    def rgb(self, index):
+        """Gets the target color of an LED.
+
+        Args:
+          index: Integer. The LED's index in leds.
+
+        Returns:
+          Tuple of red, green and blue levels from 0 to 255.
+        """
+        offset = 3 * index
+        with self._lock:
+            return tuple(self._levels[offset:offset + 3])
+
+    def set_rgb(self, index, red, green, blue):
+        """Sets the target color of an LED.
+
+        Args:
+          index: Integer. The LED's index in leds.
+          red: Integer from 0 to 255. Red level.
+          green: Integer from 0 to 255. Green level.
+          blue: Integer from 0 to 255. Blue level.
+        """
+        offset = 3 * index
+        with self._lock:
+            self._levels[offset] = red
+            self._levels[offset + 1] = green
+            self._levels[offset + 2] = blue
+
+    def set_hsv(self, index, hue, saturation, value):
+        """Sets the target color of an LED from hue, saturation and value.
+
+        Args:
+          index: Integer. The LED's index in leds.
+          hue: Float. Hue in degrees.
+          saturation: Float from 0.0 to 1.0. Saturation.
+          value: Float from 0.0 to 1.0. Brightness.
+        """
+        offset = 3 * (int(hue) % _HUES)
+        value = int(value * _MAX_LEVEL)
+        white = int((1.0 - saturation) * _MAX_LEVEL)
+        red, green, blue = [
+            value * (white + (_MAX_LEVEL - white) * level // _MAX_LEVEL)
+            // _MAX_LEVEL for level in _HUE_TABLE[offset:offset + 3]]
+        self.set_rgb(index, red, green, blue)
+
+    def fill(self, red, green, blue):
+        """Sets every LED to the same target color.
+
+        Args:
+          red: Integer from 0 to 255. Red level.
+          green: Integer from 0 to 255. Green level.
+          blue: Integer from 0 to 255. Blue level.
+        """
+        with self._lock:
+            self._levels = array.array('B', [red, green, blue] * len(self))
+
+    def render(self):
+        """Sends every channel whose level changed since the last frame.
+
+        Returns:
+          Integer. The number of channels updated.
+        """
+        with self._lock:
+            levels = self._levels[:]
+        sent = self._sent
+        table = self._gamma_table
+        updated = 0
+        for i in range(len(levels)):
+            level = levels[i]
+            if sent[i] != level:
+                self._channels[i].set_duty_cycle(table[level])
+                sent[i] = level
+                updated += 1
+        self._frames += 1
+        return updated
+
+    def stop(self):
+        """Stops rendering."""
+        self._stopping = True
+
+    def run(self):
+        """Loop for rendering frames at the frame rate."""
+        clock = self._clock
+        next_time = clock.time()
+        while not self._stopping:
+            if self._frame_callback is not None:
+                self._frame_callback(self)
+            self.render()
+            next_time += self._period_s
+            delay = next_time - clock.time()
+            if delay > 0:
+                clock.sleep(delay)
+            else:
+                next_time = clock.time()
@@ -33,6 +33,11 @@ class RGBLed(base_part.BasePart):
         self._green_pwm.set_frequency_hz(frequency_hz)
         self._blue_pwm.set_frequency_hz(frequency_hz)
 
+    @property
+    def channels(self):
+        """Gets the red, green and blue PWM outputs."""
+        return self._red_pwm, self._green_pwm, self._blue_pwm
+
     @property
     def rgb(self):
         return self.red, self.green, self.blue
@@ -1,16 +1,131 @@
+import math
 import time
 
 from pyparts.parts import base_part
 
+# Drive modes.
+WAVE = 0
+FULL_STEP = 1
+HALF_STEP = 2
+MICROSTEP = 3
+
+# Phase tables for the digital drive modes. Each phase is the output for
+# (coil_1_a, coil_1_b, coil_2_a, coil_2_b) as a percent of full current.
+_WAVE_TABLE = (
+    (100, 0, 0, 0),
+    (0, 0, 100, 0),
+    (0, 100, 0, 0),
+    (0, 0, 0, 100),
+)
+_FULL_STEP_TABLE = (
+    (100, 0, 100, 0),
+    (0, 100, 100, 0),
+    (0, 100, 0, 100),
+    (100, 0, 0, 100),
+)
+# Electrical angle of the first phase of each table, as a fraction of a
+# phase. The wave, half step and microstep tables start on coil 1 alone at 0
+# degrees, while the full step table starts with both coils on, half a phase
+# later at 45 degrees.
+_PHASE_OFFSETS = {FULL_STEP: 0.5}
+
+_HALF_STEP_TABLE = (
+    (100, 0, 0, 0),
+    (100, 0, 100, 0),
+    (0, 0, 100, 0),
+    (0, 100, 100, 0),
+    (0, 100, 0, 0),
+    (0, 100, 0, 100),
+    (0, 0, 0, 100),
+    (100, 0, 0, 100),
+)
+
+
+def _microstep_table(microsteps):
+    """Builds a sine/cosine current table for microstepping.
+
+    Coil 1 carries cos(angle) and coil 2 carries sin(angle) of full current,
+    with the sign selecting which side of the coil is driven.
+
+    Args:
+      microsteps: Integer. Number of microsteps per full step.
+
+    Returns:
+      Tuple of phases, 4 * microsteps long.
+    """
+    phases = []
+    count = 4 * microsteps
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        cos = round(math.cos(angle) * 100, 6)
+        sin = round(math.sin(angle) * 100, 6)
+        phases.append((max(cos, 0.0), max(-cos, 0.0),
+                       max(sin, 0.0), max(-sin, 0.0)))
+    return tuple(phases)
+
 
 class StepperMotor(base_part.BasePart):
+    """A two coil bipolar stepper motor.
+
+    Each drive mode is a precomputed table of coil outputs, so a step is one
+    table lookup followed by writing only the coil outputs that changed. The
+    coil outputs can be digital outputs, or PWM outputs for coil drivers with
+    PWM inputs. PWM coil outputs are required for MICROSTEP and for holding
+    at reduced current. When a platform is given, the digital coil outputs
+    that change in a step are written with one write_digital_outputs call.
 
-    def __init__(self, coil_1_a, coil_1_b, coil_2_a, coil_2_b, enable):
-        self._coil_1_a = coil_1_a
-        self._coil_1_b = coil_1_b
-        self._coil_2_a = coil_2_a
-        self._coil_2_b = coil_2_b
+    Attributes:
+      _coils: Tuple. The coil_1_a, coil_1_b, coil_2_a and coil_2_b outputs.
+      _enable: DigitalOutput. Enables the coil driver.
+      _platform: BasePlatform. Platform used to write the coils together, or
+        None to write them one at a time.
+      _is_pwm: Boolean. Whether the coil outputs are PWM outputs.
+      _drive_mode: Integer. One of WAVE, FULL_STEP, HALF_STEP or MICROSTEP.
+      _table: Tuple. Coil outputs for each phase of the drive mode.
+      _phase_offset: Float. Electrical angle of the table's first phase, as a
+        fraction of a phase.
+      _hold_table: Tuple. _table scaled to the hold duty cycle.
+      _hold_duty_cycle: Float. Percent of full current used while idle, or
+        None to hold at full current.
+      _phase: Integer. Index of the current phase in _table.
+      _position: Integer. Phases moved since creation, negative for backwards.
+      _outputs: List. Last value written to each coil output.
+    """
+
+    def __init__(self, coil_1_a, coil_1_b, coil_2_a, coil_2_b, enable,
+                 drive_mode=FULL_STEP, microsteps=8, hold_duty_cycle=None,
+                 platform=None):
+        """Creates a StepperMotor.
+
+        Args:
+          coil_1_a: DigitalOutput or PWMOutput. Drives coil 1 forwards.
+          coil_1_b: DigitalOutput or PWMOutput. Drives coil 1 backwards.
+          coil_2_a: DigitalOutput or PWMOutput. Drives coil 2 forwards.
+          coil_2_b: DigitalOutput or PWMOutput. Drives coil 2 backwards.
+          enable: DigitalOutput. Enables the coil driver.
+          drive_mode: Integer. One of WAVE, FULL_STEP, HALF_STEP or MICROSTEP.
+            (default=FULL_STEP)
+          microsteps: Integer. Microsteps per full step in MICROSTEP mode.
+            (default=8)
+          hold_duty_cycle: Float from 0.0 to 100.0. Current used while idle.
+            (default=None, hold at full current)
+          platform: BasePlatform. Platform used to write the digital coil
+            outputs of a step together. (default=None, write each coil
+            separately)
+        """
+        self._coils = (coil_1_a, coil_1_b, coil_2_a, coil_2_b)
         self._enable = enable
+        self._platform = platform
+        self._is_pwm = all(hasattr(coil, 'set_duty_cycle')
+                           for coil in self._coils)
+        self._outputs = [None] * len(self._coils)
+        self._phase = 0
+        self._position = 0
+        self._hold_duty_cycle = None
+        self._table = self._hold_table = None
+        self._phase_offset = 0.0
+        self.set_drive_mode(drive_mode, microsteps)
+        self.set_hold_duty_cycle(hold_duty_cycle)
 
     def enable(self):
         self._enable.set_high()
@@ -22,42 +137,154 @@ class StepperMotor(base_part.BasePart):
     def is_enabled(self):
         return self._enable.is_high
 
-    def forward(self, delay, steps):
-        for i in range(0, steps):
-            self._setStep(1, 0, 1, 0)
-            time.sleep(delay)
-            self._setStep(0, 1, 1, 0)
-            time.sleep(delay)
-            self._setStep(0, 1, 0, 1)
-            time.sleep(delay)
-            self._setStep(1, 0, 0, 1)
+    @property
+    def drive_mode(self):
+        """Gets the current drive mode."""
+        return self._drive_mode
+
+    def set_drive_mode(self, drive_mode, microsteps=8):
+        """Selects the phase table used for stepping.
+
+        The motor starts the new mode at the phase nearest to its current
+        electrical angle.
+
+        Args:
+          drive_mode: Integer. One of WAVE, FULL_STEP, HALF_STEP or MICROSTEP.
+          microsteps: Integer. Microsteps per full step in MICROSTEP mode.
+            (default=8)
+
+        Raises:
+          ValueError: Thrown if the drive mode is unknown, or MICROSTEP is used
+            without PWM coil outputs.
+        """
+        if drive_mode == WAVE:
+            table = _WAVE_TABLE
+        elif drive_mode == FULL_STEP:
+            table = _FULL_STEP_TABLE
+        elif drive_mode == HALF_STEP:
+            table = _HALF_STEP_TABLE
+        elif drive_mode == MICROSTEP:
+            if not self._is_pwm:
+                raise ValueError('MICROSTEP requires PWM coil outputs.')
+            if microsteps < 1:
+                raise ValueError('Microsteps must be at least 1. Got %d'
+                                 % microsteps)
+            table = _microstep_table(microsteps)
+        else:
+            raise ValueError('Unknown drive mode %s' % str(drive_mode))
+        offset = _PHASE_OFFSETS.get(drive_mode, 0.0)
+        if self._table is not None:
+            # Convert through the electrical angle, rounding to the nearest
+            # phase of the new table.
+            cycle = (self._phase + self._phase_offset) / len(self._table)
+            self._phase = int(
+                math.floor(cycle * len(table) - offset + 0.5)) % len(table)
+        self._drive_mode = drive_mode
+        self._table = table
+        self._phase_offset = offset
+        self._hold_table = self._scale_table(self._hold_duty_cycle)
+
+    @property
+    def hold_duty_cycle(self):
+        """Gets the percent of full current used while idle."""
+        return self._hold_duty_cycle
+
+    def set_hold_duty_cycle(self, duty_cycle):
+        """Sets the current used while the motor is idle.
+
+        Args:
+          duty_cycle: Float from 0.0 to 100.0. Percent of full current, or
+            None to hold at full current.
+
+        Raises:
+          ValueError: Thrown if the coil outputs are not PWM outputs or the
+            duty cycle is out of range.
+        """
+        if duty_cycle is not None:
+            if not self._is_pwm:
+                raise ValueError(
+                    'Holding at reduced current requires PWM coil outputs.')
+            if duty_cycle < 0 or duty_cycle > 100:
+                raise ValueError('Duty cycle must be between 0 and 100. Got %d'
+                                 % duty_cycle)
+        self._hold_duty_cycle = duty_cycle
+        self._hold_table = self._scale_table(duty_cycle)
+
+    def _scale_table(self, duty_cycle):
+        if duty_cycle is None:
+            return self._table
+        scale = duty_cycle / 100.0
+        return tuple(tuple(value * scale for value in phase)
+                     for phase in self._table)
+
+    @property
+    def position(self):
+        """Gets the number of phases moved since creation.
+
+        Returns:
+          Integer. Phases of the current drive mode, negative for backwards.
+        """
+        return self._position
+
+    def _apply(self, phase):
+        """Writes the coil outputs that differ from the last phase."""
+        outputs = self._outputs
+        changed = []
+        values = []
+        for i in range(4):
+            value = phase[i]
+            if outputs[i] != value:
+                coil = self._coils[i]
+                if self._is_pwm:
+                    coil.set_duty_cycle(value)
+                elif self._platform is not None:
+                    changed.append(coil)
+                    values.append(bool(value))
+                elif value:
+                    coil.set_high()
+                else:
+                    coil.set_low()
+                outputs[i] = value
+        if changed:
+            self._platform.write_digital_outputs(changed, values)
+
+    def step(self, direction=1):
+        """Moves a single phase of the current drive mode.
+
+        Args:
+          direction: Integer. 1 to move forwards, -1 to move backwards.
+            (default=1)
+        """
+        self._phase = (self._phase + direction) % len(self._table)
+        self._position += direction
+        self._apply(self._table[self._phase])
+
+    def hold(self):
+        """Holds the current phase at the hold duty cycle."""
+        self._apply(self._hold_table[self._phase])
+
+    def _move(self, delay, steps, direction):
+        for i in range(steps * len(self._table)):
+            self.step(direction)
             time.sleep(delay)
+        self.hold()
+
+    def forward(self, delay, steps):
+        """Moves forwards.
+
+        Args:
+          delay: Float. Seconds to wait after each phase.
+          steps: Integer. Number of full cycles through the drive mode's
+            phase table.
+        """
+        self._move(delay, steps, 1)
 
     def backward(self, delay, steps):
-        for i in range(0, steps):
-            self._setStep(1, 0, 0, 1)
-            time.sleep(delay)
-            self._setStep(0, 1, 0, 1)
-            time.sleep(delay)
-            self._setStep(0, 1, 1, 0)
-            time.sleep(delay)
-            self._setStep(1, 0, 1, 0)
-            time.sleep(delay)
+        """Moves backwards.
 
-    def _setStep(self, w1, w2, w3, w4):
-        if w1:
-            self._coil_1_a.set_high()
-        else:
-            self._coil_1_a.set_low()
-        if w2:
-            self._coil_1_b.set_high()
-        else:
-            self._coil_1_b.set_low()
-        if w3:
-            self._coil_2_a.set_high()
-        else:
-            self._coil_2_a.set_low()
-        if w4:
-            self._coil_2_b.set_high()
-        else:
-            self._coil_2_b.set_low()
+        Args:
+          delay: Float. Seconds to wait after each phase.
+          steps: Integer. Number of full cycles through the drive mode's
+            phase table.
+        """
+        self._move(delay, steps, -1)
@@ -0,0 +1,28 @@
+from pyparts.parts.sensor.temperature import base_temperature_sensor
+
+
+class FilteredTemperatureSensor(base_temperature_sensor.BaseTemperatureSensor):
+    """A temperature sensor whose readings go through a filter Pipeline.
+
+    FilteredTemperatureSensor can be used anywhere a temperature sensor is,
+    like as the sensor of a TemperatureController, or as a PIDController input
+    through lambda: sensor.temp_c.
+
+    Attributes:
+      _sensor: BaseTemperatureSensor. The sensor providing raw readings.
+      _pipeline: Pipeline. The filters applied to each reading.
+    """
+
+    def __init__(self, sensor, pipeline):
+        """Creates a FilteredTemperatureSensor.
+
+        Args:
+          sensor: BaseTemperatureSensor. The sensor providing raw readings.
+          pipeline: Pipeline. The filters applied to each reading.
+        """
+        super(FilteredTemperatureSensor, self).__init__()
+        self._sensor = sensor
+        self._pipeline = pipeline
+
+    def _get_temp_c(self):
+        return self._pipeline.process(self._sensor.temp_c)
@@ -1,3 +1,5 @@
+import struct
+
 from pyparts.parts.sensor.temperature import base_temperature_sensor
 
 _INTERNAL_TEMP_MASK = 0xfff0
@@ -12,12 +14,15 @@ _THERMOCOUPLE_DEGREES_C_PER_BIT = 0.25
 
 _FAULT_BIT_MASK = 0x8000
 
+_FRAME = struct.Struct('>I')
+
 
 class MAX31855(base_temperature_sensor.BaseTemperatureSensor):
 
     def __init__(self, spi_bus):
         super(MAX31855, self).__init__()
         self._spi_bus = spi_bus
+        self._buffer = bytearray(_FRAME.size)
         self._spi_bus.open()
         self._spi_bus.set_mode(0)
 
@@ -47,11 +52,9 @@ class MAX31855(base_temperature_sensor.BaseTemperatureSensor):
         return self._to_f(self.get_internal_temp_c())
 
     def _read(self):
-        values = self._spi_bus.read(4)
-        if not values or len(values) != 4:
+        if self._spi_bus.readinto(self._buffer) != _FRAME.size:
             raise RuntimeError('Unable to read MAX31855 data.')
-        packed_value = (values[0] << 24 | values[1] << 16 |
-                        values[2] << 8 | values[3])
+        packed_value = _FRAME.unpack_from(self._buffer)[0]
         if packed_value & _FAULT_BIT_MASK:
             raise RuntimeError('MAX31855 error. Fault bit set.')
         return packed_value
@@ -0,0 +1,175 @@
+import collections
+import warnings
+
+import numpy
+
+from pyparts.logic import clock as clock_lib
+
+# Fault bits in the low byte of a MAX31855 frame.
+FAULT_OPEN_CIRCUIT = 0x1
+FAULT_SHORT_TO_GND = 0x2
+FAULT_SHORT_TO_VCC = 0x4
+_FAULT_MASK = 0x7
+# Reported when the frame's fault flag is set without any of the bits above.
+FAULT_UNSPECIFIED = 0x8
+
+# Fault flag (D16), set whenever the chip detects any fault.
+_FAULT_FLAG = 0x10000
+
+_THERMOCOUPLE_SHIFT = 18
+_THERMOCOUPLE_DEGREES_C_PER_BIT = 0.25
+# The cold junction temperature is bits 4 to 15. Shifting it to the top of a
+# signed 32 bit integer and back sign extends it.
+_INTERNAL_LEFT_SHIFT = 16
+_INTERNAL_RIGHT_SHIFT = 20
+_INTERNAL_DEGREES_C_PER_BIT = 0.0625
+
+_FRAME_SIZE = 4
+
+# Oversampling filters.
+MEDIAN = 'median'
+TRIMMED_MEAN = 'trimmed_mean'
+
+# Decoded readings of every channel in a sweep.
+READING_DTYPE = numpy.dtype([
+    ('thermocouple_c', numpy.float64),
+    ('internal_c', numpy.float64),
+    ('fault', numpy.uint8),
+])
+
+# A timestamped sweep of every channel.
+#   timestamp: Time the sweep started, in seconds since the epoch.
+#   readings: Array of READING_DTYPE, one entry per channel.
+Sweep = collections.namedtuple('Sweep', ['timestamp', 'readings'])
+
+
+def decode_frames(frames):
+    """Decodes raw MAX31855 frames.
+
+    Args:
+      frames: Array of unsigned 32 bit frames in any shape.
+
+    Returns:
+      Tuple of (thermocouple_c, internal_c, fault) arrays in the same shape.
+      Thermocouple temperatures of faulted frames are NaN.
+    """
+    signed = numpy.asarray(frames, dtype=numpy.uint32).view(numpy.int32)
+    fault = (signed & _FAULT_MASK).astype(numpy.uint8)
+    fault[((signed & _FAULT_FLAG) != 0) & (fault == 0)] = FAULT_UNSPECIFIED
+    thermocouple_c = ((signed >> _THERMOCOUPLE_SHIFT) *
+                      _THERMOCOUPLE_DEGREES_C_PER_BIT)
+    thermocouple_c[fault != 0] = numpy.nan
+    internal_c = (((signed << _INTERNAL_LEFT_SHIFT) >> _INTERNAL_RIGHT_SHIFT) *
+                  _INTERNAL_DEGREES_C_PER_BIT)
+    return thermocouple_c, internal_c, fault
+
+
+class MAX31855Bank(object):
+    """Reads many MAX31855 thermocouple amplifiers in one sweep.
+
+    Each chip is on its own SPI bus or chip select. A sweep reads a raw frame
+    from every chip, optionally several times for oversampling, into one
+    buffer and decodes the whole buffer at once with NumPy. Oversampled
+    readings are combined per channel with a median or a trimmed mean that
+    ignores faulted samples.
+
+    Attributes:
+      _spi_buses: List of SPIBus. One bus per chip.
+      _oversample: Integer. Frames read from each chip per sweep.
+      _filter: String. MEDIAN or TRIMMED_MEAN.
+      _trim: Float. Fraction of samples dropped from each end for TRIMMED_MEAN.
+      _clock: Clock. Provides the sweep timestamps.
+      _buffer: Bytearray. Raw frames of the last sweep.
+      _frames: Array. Big endian view of _buffer, one row per sample.
+      _reads: List of (SPIBus, memoryview). The bus and buffer slice of every
+        frame in a sweep.
+    """
+
+    def __init__(self, spi_buses, oversample=1, filter=MEDIAN, trim=0.25,
+                 clock=None):
+        """Creates a MAX31855Bank.
+
+        Args:
+          spi_buses: List of SPIBus. One bus per MAX31855.
+          oversample: Integer. Frames read from each chip per sweep.
+            (default=1)
+          filter: String. MEDIAN or TRIMMED_MEAN. (default=MEDIAN)
+          trim: Float from 0.0 to 0.5. Fraction of samples dropped from each
+            end for TRIMMED_MEAN. (default=0.25)
+          clock: Clock. Provides the sweep timestamps. (default=SYSTEM_CLOCK)
+
+        Raises:
+          ValueError: Thrown if oversample, filter or trim is invalid.
+        """
+        if oversample < 1:
+            raise ValueError('Oversample must be at least 1. Got %d'
+                             % oversample)
+        if filter not in (MEDIAN, TRIMMED_MEAN):
+            raise ValueError('Unknown filter %s' % str(filter))
+        if trim < 0 or trim >= 0.5:
+            raise ValueError('Trim must be from 0.0 to 0.5. Got %s' % str(trim))
+        self._spi_buses = list(spi_buses)
+        self._oversample = oversample
+        self._filter = filter
+        self._trim = trim
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        self._buffer = bytearray(oversample * len(self._spi_buses) *
+                                 _FRAME_SIZE)
+        self._frames = numpy.frombuffer(self._buffer, dtype='>u4').reshape(
+            oversample, len(self._spi_buses))
+        view = memoryview(self._buffer)
+        self._reads = []
+        for _ in range(oversample):
+            for spi_bus in self._spi_buses:
+                offset = len(self._reads) * _FRAME_SIZE
+                self._reads.append(
+                    (spi_bus, view[offset:offset + _FRAME_SIZE]))
+        for spi_bus in self._spi_buses:
+            spi_bus.open()
+            spi_bus.set_mode(0)
+
+    def __len__(self):
+        return len(self._spi_buses)
+
+    def close(self):
+        """Closes every SPI bus."""
+        for spi_bus in self._spi_buses:
+            spi_bus.close()
+
+    def _read_raw(self):
+        """Reads every frame of a sweep into the buffer."""
+        for spi_bus, frame in self._reads:
+            if spi_bus.readinto(frame) != _FRAME_SIZE:
+                raise RuntimeError('Unable to read MAX31855 data.')
+
+    def _combine(self, samples):
+        """Combines oversampled readings, one column per channel."""
+        if self._oversample == 1:
+            return samples[0]
+        with warnings.catch_warnings():
+            # Channels where every sample faulted are NaN.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if self._filter == MEDIAN:
+                return numpy.nanmedian(samples, axis=0)
+            low, high = numpy.nanpercentile(
+                samples, [100.0 * self._trim, 100.0 * (1.0 - self._trim)],
+                axis=0)
+            kept = (samples >= low) & (samples <= high)
+            return (numpy.where(kept, samples, 0.0).sum(axis=0) /
+                    kept.sum(axis=0))
+
+    def sweep(self):
+        """Reads and decodes every channel.
+
+        Returns:
+          Sweep. The sweep's start time and one reading per channel. A channel's
+          fault holds the fault bits seen in any of its samples.
+        """
+        timestamp = self._clock.time()
+        self._read_raw()
+        thermocouple_c, internal_c, fault = decode_frames(self._frames)
+        readings = numpy.empty(len(self._spi_buses), dtype=READING_DTYPE)
+        readings['thermocouple_c'] = self._combine(thermocouple_c)
+        readings['internal_c'] = self._combine(internal_c)
+        readings['fault'] = numpy.bitwise_or.reduce(fault, axis=0)
+        return Sweep(timestamp, readings)
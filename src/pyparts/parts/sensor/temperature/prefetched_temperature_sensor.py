@@ -0,0 +1,66 @@
+from pyparts.parts.sensor.temperature import base_temperature_sensor
+
+
+class PrefetchedTemperatureSensor(
+        base_temperature_sensor.BaseTemperatureSensor):
+    """A temperature sensor read in the background by a Sampler.
+
+    Reading temp_c returns the Sampler's latest reading instead of going to
+    the sensor's bus, so a TemperatureController or any other reader never
+    waits on the hardware.
+
+    When the reading is stale, because the sensor has not been read yet or
+    its reads keep failing, temp_c returns fallback_c if one was given and
+    otherwise raises StaleReadingError, so a controller never acts on a
+    frozen reading. Give a fallback, like a value that turns a heater off,
+    when the sensor feeds a control loop that must keep running.
+
+    Attributes:
+      _sampler: Sampler. The sampler reading the sensor.
+      _name: String. The sensor's name in the sampler.
+      _fallback_c: Float. Reading returned while stale, or None.
+    """
+
+    def __init__(self, sampler, sensor, period_s, max_age_s=None, name=None,
+                 fallback_c=None):
+        """Creates a PrefetchedTemperatureSensor and registers it.
+
+        Args:
+          sampler: Sampler. The sampler to read the sensor with.
+          sensor: BaseTemperatureSensor. The sensor to read.
+          period_s: Float. Time between reads.
+          max_age_s: Float. Age after which readings are stale.
+            (default=None, three periods)
+          name: String. The sensor's name in the sampler.
+            (default=None, derived from the sensor)
+          fallback_c: Float. Reading returned while stale, like a value that
+            makes a controller turn its heater off. (default=None, raise
+            StaleReadingError)
+        """
+        super(PrefetchedTemperatureSensor, self).__init__()
+        self._sampler = sampler
+        self._name = name or 'temperature-%x' % id(sensor)
+        self._fallback_c = fallback_c
+        sampler.register(self._name, lambda: sensor.temp_c, period_s,
+                         max_age_s)
+
+    @property
+    def is_stale(self):
+        """Checks if the latest reading is missing or too old."""
+        return self._sampler.is_stale(self._name)
+
+    @property
+    def timestamp(self):
+        """Gets the time of the latest reading, or None if there is none."""
+        return self._sampler.latest(self._name).timestamp
+
+    def _get_temp_c(self):
+        """Gets the latest reading, or the fallback while it is stale.
+
+        Raises:
+          StaleReadingError: Thrown if the reading is stale and there is no
+            fallback.
+        """
+        if self._fallback_c is not None and self._sampler.is_stale(self._name):
+            return self._fallback_c
+        return self._sampler.value(self._name)
@@ -1,11 +1,73 @@
+import functools
+import threading
+
+from pyparts.logic import clock as clock_lib
+from pyparts.logic import timer_wheel
 from pyparts.parts import base_part
 
+_NS_PER_S = 1e9
+
 
 class Button(base_part.BasePart):
+    """A push button on a digital input.
+
+    Gestures (hold, press and double press) are detected from a single
+    interrupt on both edges. Their timeouts are serviced by a TimerWheel shared
+    by every button so no threads are created per button or per press.
+    Gesture callbacks are called with no arguments from either the interrupt
+    thread or the timer wheel thread and should return quickly.
+
+    Attributes:
+      _pin: DigitalInput. The pin the button is connected to.
+      _wheel: TimerWheel. Services the gesture timeouts.
+      _lock: Lock. Protects the gesture state.
+      _gesture_interrupt: Boolean. Whether the gesture interrupt is installed.
+      _is_down: Boolean. Whether the button was down at the last edge.
+      _down_time_ns: Integer. Time the button last went down.
+      _press_id: Integer. Incremented on every press so timeouts that expire
+        after being cancelled can be ignored.
+      _held: Boolean. Whether the hold callback fired for the current press.
+      _second_press: Boolean. Whether the current press may be a double press.
+      _pending_press: Boolean. Whether a press is waiting to see if it becomes
+        a double press.
+      _hold_timer: Timer. Fires the hold callback.
+      _up_timer: Timer. Fires a pending press once a double press is ruled out.
+    """
+
+    # Debounce used by the interrupt that detects gestures.
+    GESTURE_DEBOUNCE_TIME_MS = 20
 
-    def __init__(self, pin):
+    def __init__(self, pin, wheel=None):
+        """Creates a Button.
+
+        Args:
+          pin: DigitalInput. The pin the button is connected to.
+          wheel: TimerWheel. Services gesture timeouts.
+            (default=the shared timer wheel)
+        """
         self._pin = pin
         self._enabled = False
+        self._wheel = wheel
+        self._lock = threading.Lock()
+        self._gesture_interrupt = False
+        self._on_hold = None
+        self._min_hold_time = 0
+        self._on_press = None
+        self._press_max_down_time = 0
+        self._on_double_press = None
+        self._double_max_down_time = 0
+        self._double_max_up_time = 0
+        self._reset_gesture_state()
+
+    def _reset_gesture_state(self):
+        self._is_down = False
+        self._down_time_ns = 0
+        self._press_id = 0
+        self._held = False
+        self._second_press = False
+        self._pending_press = False
+        self._hold_timer = None
+        self._up_timer = None
 
     def set_on_down(self, callback, debounce_time_ms):
         if self._pin.pull_up_down == self._pin.PUD_UP:
@@ -26,13 +88,157 @@ class Button(base_part.BasePart):
                                 debounce_time_ms)
 
     def set_on_hold(self, callback, min_hold_time):
-        raise NotImplementedError
+        """Calls a function when the button is held down.
+
+        Args:
+          callback: Function. Called once the button has been down for
+            min_hold_time.
+          min_hold_time: Float. Seconds the button must be held down.
+        """
+        self._on_hold = callback
+        self._min_hold_time = min_hold_time
+        self._add_gesture_interrupt()
 
     def set_on_press(self, callback, max_down_time):
-        raise NotImplementedError
+        """Calls a function when the button is pressed and released.
+
+        If a double press callback is also set the press callback is delayed
+        until the double press window has passed.
+
+        Args:
+          callback: Function. Called when the button is released.
+          max_down_time: Float. Longest time in seconds the button can be down
+            for the release to count as a press.
+        """
+        self._on_press = callback
+        self._press_max_down_time = max_down_time
+        self._add_gesture_interrupt()
 
     def set_on_double_press(self, callback, max_down_time, max_up_time):
-        raise NotImplementedError
+        """Calls a function when the button is pressed twice in a row.
+
+        Args:
+          callback: Function. Called when the second press is released.
+          max_down_time: Float. Longest time in seconds the button can be down
+            for each press.
+          max_up_time: Float. Longest time in seconds between the two presses.
+        """
+        self._on_double_press = callback
+        self._double_max_down_time = max_down_time
+        self._double_max_up_time = max_up_time
+        self._add_gesture_interrupt()
 
     def remove_callbacks(self):
         self._pin.remove_interrupt()
+        with self._lock:
+            self._cancel_timers()
+            self._reset_gesture_state()
+        self._gesture_interrupt = False
+        self._on_hold = None
+        self._on_press = None
+        self._on_double_press = None
+
+    def _add_gesture_interrupt(self):
+        if self._wheel is None:
+            self._wheel = timer_wheel.get_default_wheel()
+        if not self._gesture_interrupt:
+            self._gesture_interrupt = True
+            self._is_down = self._read_is_down()
+            self._pin.add_interrupt(self._pin.INTERRUPT_BOTH, self._on_edge,
+                                    self.GESTURE_DEBOUNCE_TIME_MS)
+
+    def _read_is_down(self):
+        if self._pin.pull_up_down == self._pin.PUD_UP:
+            return self._pin.is_low
+        return self._pin.is_high
+
+    def _cancel_timers(self):
+        if self._hold_timer:
+            self._hold_timer.cancel()
+            self._hold_timer = None
+        if self._up_timer:
+            self._up_timer.cancel()
+            self._up_timer = None
+
+    def _on_edge(self, *args):
+        """Interrupt callback for both edges of the button pin."""
+        now = clock_lib.monotonic_ns()
+        is_down = self._read_is_down()
+        with self._lock:
+            if is_down == self._is_down:
+                return
+            self._is_down = is_down
+            if is_down:
+                callback = self._handle_down(now)
+            else:
+                callback = self._handle_up(now)
+        if callback:
+            callback()
+
+    def _handle_down(self, now):
+        self._down_time_ns = now
+        self._press_id += 1
+        self._held = False
+        if self._on_hold:
+            self._hold_timer = self._wheel.schedule(
+                self._min_hold_time,
+                functools.partial(self._on_hold_timeout, self._press_id))
+        if self._up_timer:
+            self._up_timer.cancel()
+            self._up_timer = None
+            self._second_press = True
+        return None
+
+    def _handle_up(self, now):
+        if self._hold_timer:
+            self._hold_timer.cancel()
+            self._hold_timer = None
+        second_press = self._second_press
+        pending_press = self._pending_press
+        self._second_press = False
+        self._pending_press = False
+        if self._held:
+            return None
+        down_time = (now - self._down_time_ns) / _NS_PER_S
+        if second_press:
+            if down_time <= self._double_max_down_time:
+                return self._on_double_press
+            # The second press was too long for a double press, so the first
+            # press stands on its own.
+            return self._on_press if pending_press else None
+        is_press = (self._on_press is not None and
+                    down_time <= self._press_max_down_time)
+        if self._on_double_press and down_time <= self._double_max_down_time:
+            self._pending_press = is_press
+            self._up_timer = self._wheel.schedule(
+                self._double_max_up_time,
+                functools.partial(self._on_up_timeout, self._press_id))
+            return None
+        return self._on_press if is_press else None
+
+    def _on_hold_timeout(self, press_id):
+        with self._lock:
+            if self._hold_timer is None or press_id != self._press_id:
+                return
+            self._hold_timer = None
+            self._held = True
+            # A held press can't be the second half of a double press, so a
+            # pending first press stands on its own.
+            press = self._on_press if self._pending_press else None
+            self._second_press = False
+            self._pending_press = False
+            callback = self._on_hold
+        if press:
+            press()
+        if callback:
+            callback()
+
+    def _on_up_timeout(self, press_id):
+        with self._lock:
+            if self._up_timer is None or press_id != self._press_id:
+                return
+            self._up_timer = None
+            callback = self._on_press if self._pending_press else None
+            self._pending_press = False
+        if callback:
+            callback()
@@ -31,5 +31,46 @@ class BasePlatform(object):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def get_i2c_bus(self):
+    def get_i2c_bus(self, bus):
         raise NotImplementedError
+
+    def release(self, peripheral):
+        """Releases a peripheral returned by one of the get methods.
+
+        Platforms that share peripherals between callers should override this
+        to free a peripheral once every caller has released it.
+
+        Args:
+          peripheral: The peripheral to release.
+        """
+        pass
+
+    def read_digital_inputs(self, inputs):
+        """Reads the values of several digital inputs.
+
+        Platforms that can read a whole port at once should override this to
+        read all of the inputs in a single operation.
+
+        Args:
+          inputs: List of DigitalInput. The inputs to read.
+
+        Returns:
+          List of booleans. True for each input that is HIGH.
+        """
+        return [pin.is_high for pin in inputs]
+
+    def write_digital_outputs(self, outputs, values):
+        """Writes the values of several digital outputs.
+
+        Platforms that can write a whole port at once should override this to
+        write all of the outputs in as few operations as possible.
+
+        Args:
+          outputs: List of DigitalOutput. The outputs to write.
+          values: List of booleans. True to set the matching output HIGH.
+        """
+        for pin, value in zip(outputs, values):
+            if value:
+                pin.set_high()
+            else:
+                pin.set_low()
@@ -1,5 +1,7 @@
 import abc
 
+from pyparts.platforms.gpio import pulse_meter
+
 # Pin values
 HIGH = True
 LOW = False
@@ -153,6 +155,10 @@ class BaseDigitalInput(BaseGPIO):
     def add_interrupt(self, type, callback=None, debounce_time_ms=0):
         """Adds an interrupt to the digital input pin.
 
+        A pin can have several interrupts with different edge types.
+        Platforms that debounce a pin as a whole raise GPIOError for a
+        debounce time that differs from the pin's other interrupts.
+
         Args:
           type: FALLING, RISING, or BOTH. Edge to trigger the interrupt on.
           callback: Function. The function to call when the interrupt fires.
@@ -174,3 +180,49 @@ class BaseDigitalInput(BaseGPIO):
     def remove_interrupt(self):
         """Removes all interrupts from the digital input pin."""
         raise NotImplementedError
+
+    def add_edge_listener(self, type, listener, debounce_time_ms=0):
+        """Adds a listener that is told the level and time of each edge.
+
+        Unlike interrupt callbacks, which are called as callback(pin),
+        listeners are called as listener(pin, level, timestamp_ns).
+
+        Args:
+          type: FALLING, RISING, or BOTH. Edge type to listen for.
+          listener: Function. The function to call for each edge.
+          debounce_time_ms: Integer. Debounce time to put on the interrupt.
+              (default=0)
+        """
+        raise NotImplementedError
+
+    def remove_edge_listener(self, listener):
+        """Removes a listener added with add_edge_listener.
+
+        Args:
+          listener: Function. The listener to remove.
+        """
+        raise NotImplementedError
+
+    def measure_pulses(self, window_s=1.0, buffer_size=4096,
+                       poll_interval_s=None):
+        """Starts measuring pulse timing on the digital input pin.
+
+        Edges are recorded with an edge listener, or with the pin's interrupt
+        on platforms without edge listeners, in which case the pin can't be
+        used for other interrupts while measuring. Platforms without edge
+        interrupts are polled instead.
+
+        Args:
+          window_s: Float. Default measurement window in seconds. (default=1.0)
+          buffer_size: Integer. Number of edges kept for measurement.
+              (default=4096)
+          poll_interval_s: Float. Poll the pin at this interval instead of
+              using interrupts. (default=None)
+
+        Returns:
+          A started PulseMeter for the pin.
+        """
+        meter = pulse_meter.PulseMeter(self, window_s, buffer_size,
+                                       poll_interval_s)
+        meter.start()
+        return meter
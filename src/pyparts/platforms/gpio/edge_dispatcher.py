@@ -0,0 +1,193 @@
+import array
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+
+class _EdgeQueue(object):
+    """A bounded ring buffer of edge events serviced by one worker thread.
+
+    Attributes:
+      _pins: Array. Pin number of each queued event.
+      _levels: Array. Pin level of each queued event.
+      _timestamps: Array. Monotonic timestamp in nanoseconds of each event.
+      _head: Integer. Index of the oldest queued event.
+      _count: Integer. Number of queued events.
+      _overflowing: Boolean. Whether the queue has been full since it last
+        drained.
+      _condition: Condition. Protects the queue and wakes the worker.
+    """
+
+    def __init__(self, size):
+        self._pins = array.array('l', [0] * size)
+        self._levels = array.array('b', [0] * size)
+        self._timestamps = array.array('q', [0] * size)
+        self._head = 0
+        self._count = 0
+        self._overflowing = False
+        self._condition = threading.Condition()
+
+
+class EdgeDispatcher(object):
+    """Decouples GPIO interrupt callbacks from the thread that detects edges.
+
+    The interrupt side only records (pin, level, timestamp) into a preallocated
+    ring buffer and returns. Callbacks run on a pool of worker threads. Each pin
+    is always serviced by the same worker so the callbacks for a pin run in the
+    order its edges happened, while a slow callback only delays the pins that
+    share its worker. When a worker's queue is full new edges are dropped and
+    counted.
+
+    Callbacks are called as callback(pin, level, timestamp_ns).
+
+    Attributes:
+      _queues: List of _EdgeQueue. One queue per worker.
+      _workers: List of Thread. The worker threads.
+      _callbacks: Dict. Pin number to list of callbacks.
+      _dropped_count: Integer. Edges dropped because a queue was full.
+      _overflow_count: Integer. Number of times a queue became full.
+      _error_count: Integer. Number of callbacks that raised an exception.
+      _max_depth: Integer. Largest number of events seen in a queue.
+      _stats_lock: Lock. Protects the counters, which every worker and queue
+        update.
+      _stop: Boolean. Set to true to stop the workers.
+    """
+
+    def __init__(self, num_workers=2, queue_size=1024):
+        """Creates an EdgeDispatcher.
+
+        Args:
+          num_workers: Integer. Number of callback threads. (default=2)
+          queue_size: Integer. Number of events each worker can queue.
+            (default=1024)
+
+        Raises:
+          ValueError: Thrown if num_workers or queue_size is not positive.
+        """
+        if num_workers <= 0 or queue_size <= 0:
+            raise ValueError(
+                'Number of workers and queue size must be greater than 0.')
+        self._queues = [_EdgeQueue(queue_size) for _ in range(num_workers)]
+        self._workers = []
+        self._callbacks = {}
+        self._dropped_count = 0
+        self._overflow_count = 0
+        self._error_count = 0
+        self._max_depth = 0
+        self._stats_lock = threading.Lock()
+        self._stop = False
+
+    def start(self):
+        """Starts the worker threads."""
+        if self._workers:
+            return
+        self._stop = False
+        for queue in self._queues:
+            worker = threading.Thread(target=self._run, args=(queue,))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self):
+        """Stops the worker threads once their queues are empty."""
+        self._stop = True
+        for queue in self._queues:
+            with queue._condition:
+                queue._condition.notify()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def register(self, pin, callback):
+        """Adds a callback for edges on a pin.
+
+        Args:
+          pin: Integer. The pin number.
+          callback: Function. Called as callback(pin, level, timestamp_ns).
+        """
+        callbacks = list(self._callbacks.get(pin, []))
+        callbacks.append(callback)
+        self._callbacks[pin] = callbacks
+
+    def unregister(self, pin):
+        """Removes all callbacks for a pin.
+
+        Args:
+          pin: Integer. The pin number.
+        """
+        self._callbacks.pop(pin, None)
+
+    def record(self, pin, level, timestamp_ns=None):
+        """Records an edge. Called from the interrupt thread.
+
+        Args:
+          pin: Integer. The pin the edge happened on.
+          level: HIGH or LOW. The level of the pin after the edge.
+          timestamp_ns: Integer. Monotonic time of the edge.
+            (default=current time)
+        """
+        if timestamp_ns is None:
+            timestamp_ns = clock_lib.monotonic_ns()
+        queue = self._queues[pin % len(self._queues)]
+        size = len(queue._pins)
+        with queue._condition:
+            if queue._count == size:
+                overflowed = not queue._overflowing
+                queue._overflowing = True
+                with self._stats_lock:
+                    self._dropped_count += 1
+                    if overflowed:
+                        self._overflow_count += 1
+                return
+            index = (queue._head + queue._count) % size
+            queue._pins[index] = pin
+            queue._levels[index] = 1 if level else 0
+            queue._timestamps[index] = timestamp_ns
+            queue._count += 1
+            if queue._count > self._max_depth:
+                with self._stats_lock:
+                    self._max_depth = max(self._max_depth, queue._count)
+            queue._condition.notify()
+
+    def _run(self, queue):
+        """Worker loop calling the callbacks for one queue."""
+        size = len(queue._pins)
+        while True:
+            with queue._condition:
+                while not queue._count and not self._stop:
+                    queue._condition.wait()
+                if not queue._count:
+                    return
+                pin = queue._pins[queue._head]
+                level = queue._levels[queue._head] == 1
+                timestamp = queue._timestamps[queue._head]
+                queue._head = (queue._head + 1) % size
+                queue._count -= 1
+                if not queue._count:
+                    queue._overflowing = False
+            for callback in self._callbacks.get(pin, ()):
+                try:
+                    callback(pin, level, timestamp)
+                except Exception:
+                    with self._stats_lock:
+                        self._error_count += 1
+
+    @property
+    def dropped_count(self):
+        """Gets the number of edges dropped because a queue was full."""
+        return self._dropped_count
+
+    @property
+    def overflow_count(self):
+        """Gets the number of times a queue became full."""
+        return self._overflow_count
+
+    @property
+    def error_count(self):
+        """Gets the number of callbacks that raised an exception."""
+        return self._error_count
+
+    @property
+    def max_depth(self):
+        """Gets the largest number of events seen queued for one worker."""
+        return self._max_depth
@@ -0,0 +1,256 @@
+import threading
+
+from pyparts.platforms.gpio import base_gpio
+
+# Register addresses with IOCON.BANK = 0, where the A and B registers of a
+# pair are adjacent and sequential access moves from A to B.
+_IODIR = 0x00
+_IOCON = 0x0a
+_GPPU = 0x0c
+_GPIO = 0x12
+_OLAT = 0x14
+
+# IOCON bit enabling the hardware address pins.
+_IOCON_HAEN = 0x08
+
+_OPCODE = 0x40
+_OPCODE_READ = 0x01
+
+NUM_PINS = 16
+_PINS_PER_PORT = 8
+
+
+class MCP23S17(object):
+    """An MCP23S17 16 bit SPI GPIO expander.
+
+    MCP23S17 keeps shadow copies of the IODIR, GPPU and OLAT registers, so
+    changing a pin is a single register write without reading the register
+    first, and nothing is sent when a value does not change. Registers for
+    both ports are written in one transfer when both change.
+
+    Attributes:
+      _spi_bus: BaseSPIBus. The bus the expander is on.
+      _opcode: Integer. Write opcode including the hardware address.
+      _iodir: Bytearray. Shadow IODIRA and IODIRB. Set bits are inputs.
+      _gppu: Bytearray. Shadow GPPUA and GPPUB. Set bits have pull ups.
+      _olat: Bytearray. Shadow OLATA and OLATB.
+      _single: Bytearray. Reused opcode, register and value transfer.
+      _pair: Bytearray. Reused opcode, register and two value transfer.
+      _lock: Lock. Serializes register updates.
+    """
+
+    def __init__(self, spi_bus, hardware_address=0):
+        """Creates an MCP23S17 and writes the shadow registers to it.
+
+        Args:
+          spi_bus: BaseSPIBus. The bus the expander is on.
+          hardware_address: Integer from 0 to 7. The A2 to A0 pin address.
+            (default=0)
+
+        Raises:
+          ValueError: Thrown if the hardware address is out of range.
+        """
+        if hardware_address < 0 or hardware_address > 7:
+            raise ValueError('Hardware address must be between 0 and 7. Got %d'
+                             % hardware_address)
+        self._spi_bus = spi_bus
+        self._opcode = _OPCODE | hardware_address << 1
+        self._iodir = bytearray([0xff, 0xff])
+        self._gppu = bytearray(2)
+        self._olat = bytearray(2)
+        self._single = bytearray(3)
+        self._pair = bytearray(4)
+        self._lock = threading.Lock()
+        self._spi_bus.open()
+        self._spi_bus.set_mode(0)
+        with self._lock:
+            self._write_register(_IOCON, _IOCON_HAEN)
+            self._write_pair(_IODIR, self._iodir)
+            self._write_pair(_GPPU, self._gppu)
+            self._write_pair(_OLAT, self._olat)
+
+    def _write_register(self, register, value):
+        """Writes one register. Caller must hold _lock."""
+        self._single[0] = self._opcode
+        self._single[1] = register
+        self._single[2] = value
+        self._spi_bus.write(self._single)
+
+    def _write_pair(self, register, values):
+        """Writes the A and B registers of a pair. Caller must hold _lock."""
+        self._pair[0] = self._opcode
+        self._pair[1] = register
+        self._pair[2] = values[0]
+        self._pair[3] = values[1]
+        self._spi_bus.write(self._pair)
+
+    def _update(self, register, shadow, masks, values):
+        """Applies bit changes to a shadow register pair and writes them.
+
+        Only the ports that changed are written, in one transfer.
+
+        Args:
+          register: Integer. The A register of the pair.
+          shadow: Bytearray. The pair's shadow registers.
+          masks: Tuple. Bits to change in each port.
+          values: Tuple. New values of those bits in each port.
+        """
+        with self._lock:
+            changed = []
+            for port in range(2):
+                value = (shadow[port] & ~masks[port]) | values[port]
+                if value != shadow[port]:
+                    shadow[port] = value
+                    changed.append(port)
+            if len(changed) == 2:
+                self._write_pair(register, shadow)
+            elif changed:
+                port = changed[0]
+                self._write_register(register + port, shadow[port])
+
+    @staticmethod
+    def _bits(pins_values):
+        """Splits (pin, value) pairs into per port masks and values."""
+        masks = [0, 0]
+        values = [0, 0]
+        for pin, value in pins_values:
+            port, bit = divmod(pin, _PINS_PER_PORT)
+            masks[port] |= 1 << bit
+            if value:
+                values[port] |= 1 << bit
+        return masks, values
+
+    def set_inputs(self, pins_values):
+        """Sets pin directions.
+
+        Args:
+          pins_values: List of (pin, is_input) pairs.
+        """
+        self._update(_IODIR, self._iodir, *self._bits(pins_values))
+
+    def set_pull_ups(self, pins_values):
+        """Enables or disables pull up resistors.
+
+        Args:
+          pins_values: List of (pin, enabled) pairs.
+        """
+        self._update(_GPPU, self._gppu, *self._bits(pins_values))
+
+    def write_pins(self, pins_values):
+        """Sets output latches.
+
+        Args:
+          pins_values: List of (pin, value) pairs.
+        """
+        self._update(_OLAT, self._olat, *self._bits(pins_values))
+
+    def latch(self, pin):
+        """Gets the last value written to an output pin from the shadow OLAT.
+
+        Args:
+          pin: Integer from 0 to 15. The pin.
+
+        Returns:
+          HIGH or LOW.
+        """
+        port, bit = divmod(pin, _PINS_PER_PORT)
+        return base_gpio.HIGH if self._olat[port] >> bit & 1 else base_gpio.LOW
+
+    def read_pins(self):
+        """Reads the level of all 16 pins in one transfer.
+
+        Returns:
+          Integer. Bit n is the level of pin n.
+        """
+        with self._lock:
+            self._pair[0] = self._opcode | _OPCODE_READ
+            self._pair[1] = _GPIO
+            self._pair[2] = 0
+            self._pair[3] = 0
+            values = self._spi_bus.transfer(self._pair)
+        return values[2] | values[3] << _PINS_PER_PORT
+
+
+class MCP23S17GPIO(base_gpio.BaseGPIO):
+    """MCP23S17 implementation of a GPIO peripheral.
+
+    Attributes:
+      _expander: MCP23S17. The expander the pin is on.
+    """
+
+    def __init__(self, expander, pin, mode, pull_up_down=None):
+        """Creates a GPIO pin on an MCP23S17.
+
+        Args:
+          expander: MCP23S17. The expander the pin is on.
+          pin: Integer from 0 to 15. GPA0 to GPA7 are 0 to 7 and GPB0 to GPB7
+            are 8 to 15.
+          mode: INPUT or OUTPUT. The pin mode to put the GPIO in.
+          pull_up_down: PUD_UP or None. The MCP23S17 only has pull ups.
+            (default=None)
+
+        Raises:
+          ValueError: Thrown if the pin is out of range or a pull down is
+            requested.
+        """
+        if pin < 0 or pin >= NUM_PINS:
+            raise ValueError('Pin must be between 0 and %d. Got %d'
+                             % (NUM_PINS - 1, pin))
+        if pull_up_down == self.PUD_DOWN:
+            raise ValueError('MCP23S17 pins do not have pull down resistors.')
+        super(MCP23S17GPIO, self).__init__(pin, mode, pull_up_down)
+        self._expander = expander
+        expander.set_pull_ups([(pin, pull_up_down == self.PUD_UP)])
+        expander.set_inputs([(pin, mode == self.INPUT)])
+
+    @property
+    def expander(self):
+        """Gets the expander the pin is on."""
+        return self._expander
+
+    def _write(self, value):
+        """Writes a value to the pin.
+
+        Args:
+          value: HIGH or LOW. The value to write to the pin.
+        """
+        self._expander.write_pins([(self._pin, value)])
+
+    def _read(self):
+        """Reads the current value from the pin.
+
+        Returns:
+          The GPIO pin's current value as HIGH or LOW.
+        """
+        if self._mode == self.OUTPUT:
+            return self._expander.latch(self._pin)
+        if self._expander.read_pins() >> self._pin & 1:
+            return base_gpio.HIGH
+        return base_gpio.LOW
+
+
+class MCP23S17DigitalInput(base_gpio.BaseDigitalInput, MCP23S17GPIO):
+    """MCP23S17 implementation of a DigitalInput.
+
+    Interrupts are not supported. Use measure_pulses with a poll interval to
+    time pulses.
+    """
+
+    def __init__(self, expander, pin, pull_up_down=None):
+        super(MCP23S17DigitalInput, self).__init__(expander, pin, self.INPUT,
+                                                   pull_up_down)
+
+    def add_interrupt(self, type, callback=None, debounce_time_ms=0):
+        """Not implemented."""
+        raise NotImplementedError
+
+    def wait_for_edge(self, type):
+        """Not implemented."""
+        raise NotImplementedError
+
+
+class MCP23S17DigitalOutput(MCP23S17GPIO):
+    """MCP23S17 implementation of a DigitalOutput."""
+
+    def __init__(self, expander, pin):
+        super(MCP23S17DigitalOutput, self).__init__(expander, pin, self.OUTPUT)
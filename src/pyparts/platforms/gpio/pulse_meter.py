@@ -0,0 +1,215 @@
+import array
+import bisect
+import collections
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+_NS_PER_S = 1e9
+
+# Pulse measurements over a window of edges.
+#   count: Number of rising edges in the window.
+#   frequency_hz: Rising edges per second, or 0.0 with fewer than two.
+#   period_s: Mean time between rising edges, or None with fewer than two.
+#   pulse_width_s: Mean time the pin was high, or None without a full pulse.
+#   duty_cycle: Percent of the period the pin was high, or None.
+PulseStats = collections.namedtuple(
+    'PulseStats', ['count', 'frequency_hz', 'period_s', 'pulse_width_s',
+                   'duty_cycle'])
+
+
+class PulseMeter(object):
+    """Measures frequency, period, pulse width and duty cycle on an input.
+
+    Recording an edge only stores its timestamp and level in a preallocated
+    ring buffer. Measurements are computed in a batch over the edges in a
+    sliding window when they are requested, so the cost per edge stays constant
+    at high pulse rates. Platforms without edge interrupts can be measured by
+    polling the pin from a background thread instead.
+
+    Edges are recorded with an edge listener when the pin supports them, so
+    the pin's other interrupts are left alone. Otherwise the meter falls back
+    to an interrupt, and stopping the meter removes every interrupt on the pin.
+
+    Attributes:
+      _pin: DigitalInput. The pin being measured.
+      _window_ns: Integer. Default measurement window in nanoseconds.
+      _timestamps: Array. Monotonic timestamp in nanoseconds of each edge.
+      _levels: Array. Level of the pin after each edge.
+      _edge_count: Integer. Total number of edges recorded.
+      _level: Boolean. Level of the pin after the most recent edge.
+      _poll_interval_s: Float. Polling interval, or None to use interrupts.
+      _listening: Boolean. Whether edges come from an edge listener rather
+        than an interrupt.
+      _poller: Thread. The polling thread when polling.
+      _lock: Lock. Keeps measurements from seeing a half written edge.
+      _stop: Boolean. Set to true to stop polling.
+    """
+
+    def __init__(self, pin, window_s=1.0, buffer_size=4096,
+                 poll_interval_s=None):
+        """Creates a PulseMeter.
+
+        Args:
+          pin: DigitalInput. The pin to measure.
+          window_s: Float. Default measurement window in seconds. (default=1.0)
+          buffer_size: Integer. Number of edges kept for measurement. Should
+            hold at least two windows of edges. (default=4096)
+          poll_interval_s: Float. Poll the pin at this interval instead of
+            using interrupts. (default=None, poll only if the platform has no
+            edge interrupts)
+        """
+        self._pin = pin
+        self._window_ns = int(window_s * _NS_PER_S)
+        self._timestamps = array.array('q', [0] * buffer_size)
+        self._levels = array.array('b', [0] * buffer_size)
+        self._edge_count = 0
+        self._level = False
+        if poll_interval_s is None and pin.INTERRUPT_BOTH is None:
+            poll_interval_s = 0.0001
+        self._poll_interval_s = poll_interval_s
+        self._poller = None
+        self._listening = False
+        self._lock = threading.Lock()
+        self._stop = False
+
+    def start(self):
+        """Starts recording edges."""
+        self._level = self._pin.is_high
+        if self._poll_interval_s is None:
+            try:
+                self._pin.add_edge_listener(self._pin.INTERRUPT_BOTH,
+                                            self.record_edge)
+                self._listening = True
+            except NotImplementedError:
+                self._pin.add_interrupt(self._pin.INTERRUPT_BOTH,
+                                        self.record_edge)
+                self._listening = False
+            return
+        self._stop = False
+        self._poller = threading.Thread(target=self._poll)
+        self._poller.daemon = True
+        self._poller.start()
+
+    def stop(self):
+        """Stops recording edges."""
+        if self._poller is None:
+            if self._listening:
+                self._pin.remove_edge_listener(self.record_edge)
+            else:
+                self._pin.remove_interrupt()
+            return
+        self._stop = True
+        self._poller.join()
+        self._poller = None
+
+    def _poll(self):
+        """Polling loop that records a level change as an edge."""
+        sleep = clock_lib.SYSTEM_CLOCK.sleep
+        level = self._level
+        while not self._stop:
+            current = self._pin.is_high
+            if current != level:
+                level = current
+                self.record_edge(self._pin.pin_number, level,
+                                 clock_lib.monotonic_ns())
+            sleep(self._poll_interval_s)
+
+    def record_edge(self, pin=None, level=None, timestamp_ns=None):
+        """Records an edge.
+
+        Usable directly as an interrupt callback or edge listener. When the
+        level is not given the pin is read, so a missed edge can't invert the
+        levels that follow it. When the timestamp is not given the edge is
+        timestamped on arrival.
+
+        Args:
+          pin: Integer. The pin the edge happened on. (default=None)
+          level: Boolean. The level after the edge. (default=None)
+          timestamp_ns: Integer. Monotonic time of the edge. (default=None)
+        """
+        if timestamp_ns is None:
+            timestamp_ns = clock_lib.monotonic_ns()
+        if level is None:
+            level = self._pin.is_high
+        with self._lock:
+            index = self._edge_count % len(self._timestamps)
+            self._timestamps[index] = timestamp_ns
+            self._levels[index] = 1 if level else 0
+            self._edge_count += 1
+            self._level = bool(level)
+
+    @property
+    def edge_count(self):
+        """Gets the total number of edges recorded since creation."""
+        return self._edge_count
+
+    def _window(self, start_ns):
+        """Copies the buffered edges newer than start_ns, oldest first."""
+        size = len(self._timestamps)
+        timestamps = self._timestamps
+        with self._lock:
+            end = self._edge_count
+            if end <= size:
+                begin = bisect.bisect_left(timestamps, start_ns, 0, end)
+            else:
+                # The ring holds two sorted runs: [oldest, size) then
+                # [0, oldest).
+                oldest = end % size
+                if not oldest or timestamps[size - 1] >= start_ns:
+                    index = bisect.bisect_left(timestamps, start_ns, oldest,
+                                               size)
+                    begin = end - size + index - oldest
+                else:
+                    index = bisect.bisect_left(timestamps, start_ns, 0, oldest)
+                    begin = end - oldest + index
+            if begin == end:
+                return self._timestamps[:0], self._levels[:0]
+            first = begin % size
+            last = end % size
+            if first < last:
+                return self._timestamps[first:last], self._levels[first:last]
+            return (self._timestamps[first:] + self._timestamps[:last],
+                    self._levels[first:] + self._levels[:last])
+
+    def stats(self, window_s=None, now_ns=None):
+        """Measures the pulses in a sliding window.
+
+        Args:
+          window_s: Float. Window to measure over, ending now.
+            (default=the meter's window)
+          now_ns: Integer. Monotonic time the window ends at.
+            (default=current time)
+
+        Returns:
+          PulseStats. Measurements for the window.
+        """
+        if now_ns is None:
+            now_ns = clock_lib.monotonic_ns()
+        window_ns = (self._window_ns if window_s is None
+                     else int(window_s * _NS_PER_S))
+        timestamps, levels = self._window(now_ns - window_ns)
+        first_rise = last_rise = rise = None
+        rises = 0
+        high_ns = 0
+        pulses = 0
+        for timestamp, level in zip(timestamps, levels):
+            if level:
+                rises += 1
+                if first_rise is None:
+                    first_rise = timestamp
+                last_rise = rise = timestamp
+            elif rise is not None:
+                high_ns += timestamp - rise
+                pulses += 1
+                rise = None
+        if rises < 2:
+            return PulseStats(rises, 0.0, None, None, None)
+        period_s = (last_rise - first_rise) / _NS_PER_S / (rises - 1)
+        pulse_width_s = None
+        duty_cycle = None
+        if pulses:
+            pulse_width_s = high_ns / _NS_PER_S / pulses
+            duty_cycle = min(100.0, pulse_width_s / period_s * 100)
+        return PulseStats(rises, 1.0 / period_s, period_s, pulse_width_s,
+                          duty_cycle)
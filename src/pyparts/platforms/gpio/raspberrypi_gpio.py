@@ -1,5 +1,8 @@
+import threading
+
 import RPi.GPIO as rpi_gpio
 
+from pyparts.logic import clock as clock_lib
 from pyparts.platforms.gpio import base_gpio
 
 
@@ -47,31 +50,175 @@ class RaspberryPiGPIO(base_gpio.BaseGPIO):
 
 
 class RaspberryPiDigitalInput(base_gpio.BaseDigitalInput, RaspberryPiGPIO):
-    """Raspberry Pi implementation of a DigitalInput."""
+    """Raspberry Pi implementation of a DigitalInput.
+
+    RPi.GPIO only allows one edge detection per pin, so every interrupt
+    callback and edge listener on the pin shares a single detection that fans
+    out to them. When they ask for different edge types the detection is
+    widened to BOTH, and each one only gets the edges of its own type, told
+    apart by the level sampled after the edge.
+
+    Attributes:
+      _dispatcher: EdgeDispatcher. Runs interrupt callbacks off the RPi.GPIO
+        thread, or None to call them directly.
+      _interrupt_type: FALLING, RISING, or BOTH. The edge being detected, or
+        None when edge detection is off.
+      _debounce_time_ms: Integer. Debounce time of the detection.
+      _callbacks: List of (type, callback) tuples. Interrupt callbacks,
+        called as callback(pin). The callback is None for interrupts added
+        without one.
+      _listeners: List of (type, listener) tuples. Edge listeners, called as
+        listener(pin, level, timestamp_ns).
+      _lock: Lock. Protects the edge detection state.
+    """
 
     INTERRUPT_FALLING = rpi_gpio.FALLING
     INTERRUPT_RISING = rpi_gpio.RISING
     INTERRUPT_BOTH = rpi_gpio.BOTH
 
-    def __init__(self, pin):
+    def __init__(self, pin, dispatcher=None):
         """Creates a DigitalInput pin for a Raspberry Pi.
 
         Args:
           pin: Integer. The pin to create the DigitalInput on.
+          dispatcher: EdgeDispatcher. Runs interrupt callbacks on a worker pool
+              instead of the RPi.GPIO event thread. (default=None)
         """
         super(RaspberryPiDigitalInput, self).__init__(pin, self.INPUT)
+        self._dispatcher = dispatcher
+        self._interrupt_type = None
+        self._debounce_time_ms = 0
+        self._callbacks = []
+        self._listeners = []
+        self._lock = threading.Lock()
 
     def add_interrupt(self, type, callback=None, debounce_time_ms=0):
         """Creates an interrupt on the digital input pin.
 
+        The callback is called as callback(pin), from the pin's EdgeDispatcher
+        when it has one and from the RPi.GPIO event thread otherwise.
+
+        A pin can have several interrupts and edge listeners, with any mix of
+        edge types. They share one debounce time, because RPi.GPIO debounces
+        the pin's single detection rather than each callback.
+
         Args:
           type: FALLING, RISING, or BOTH. Edge type to trigger the interrupt on.
           callback. Function. The function to call when the interrupt fires.
               (default=None)
           debounce_time_ms: Integer. Debounce time to add to the interrupt.
               (default=0)
+
+        Raises:
+          GPIOError: Thrown if the pin already detects edges with a different
+            debounce time.
+        """
+        with self._lock:
+            self._check_debounce(debounce_time_ms)
+            self._callbacks = self._callbacks + [(type, callback)]
+            self._update_detection()
+
+    def add_edge_listener(self, type, listener, debounce_time_ms=0):
+        """Adds a listener that is told the level and time of each edge.
+
+        The level is sampled when RPi.GPIO reports the edge.
+
+        Args:
+          type: FALLING, RISING, or BOTH. Edge type to listen for.
+          listener: Function. Called as listener(pin, level, timestamp_ns).
+          debounce_time_ms: Integer. Debounce time to add to the interrupt.
+              (default=0)
+
+        Raises:
+          GPIOError: Thrown if the pin already detects edges with a different
+            debounce time.
         """
-        rpi_gpio.add_event_detect(self._pin, type, callback, debounce_time_ms)
+        with self._lock:
+            self._check_debounce(debounce_time_ms)
+            self._listeners = self._listeners + [(type, listener)]
+            self._update_detection()
+
+    def remove_edge_listener(self, listener):
+        """Removes a listener added with add_edge_listener.
+
+        The detection narrows to the edge types still in use, and is turned
+        off once no callbacks or listeners are left.
+
+        Args:
+          listener: Function. The listener to remove.
+        """
+        with self._lock:
+            self._listeners = [(type, other) for type, other in self._listeners
+                               if other != listener]
+            self._update_detection()
+
+    def _check_debounce(self, debounce_time_ms):
+        """Checks the debounce time of a new callback or listener.
+
+        Caller must hold _lock.
+
+        Raises:
+          GPIOError: Thrown if the pin detects edges with another debounce
+            time.
+        """
+        if (self._interrupt_type is not None and
+                debounce_time_ms != self._debounce_time_ms):
+            raise base_gpio.GPIOError(
+                'Pin %d already detects edges with a %d ms debounce time. '
+                'Got %d ms' % (self._pin, self._debounce_time_ms,
+                               debounce_time_ms))
+        self._debounce_time_ms = debounce_time_ms
+
+    def _update_detection(self):
+        """Detects the edge types of the callbacks and listeners.
+
+        RPi.GPIO can't change a detection, so a change of edge type removes
+        and re-adds it. Caller must hold _lock.
+        """
+        types = set(type for type, _ in self._callbacks + self._listeners)
+        if not types:
+            wanted = None
+        elif len(types) == 1:
+            wanted = types.pop()
+        else:
+            wanted = self.INTERRUPT_BOTH
+        if wanted == self._interrupt_type:
+            return
+        if self._interrupt_type is not None:
+            rpi_gpio.remove_event_detect(self._pin)
+        elif self._dispatcher is not None:
+            self._dispatcher.register(self._pin, self._deliver)
+        if wanted is None:
+            if self._dispatcher is not None:
+                self._dispatcher.unregister(self._pin)
+        else:
+            rpi_gpio.add_event_detect(self._pin, wanted, self._on_edge,
+                                      self._debounce_time_ms)
+        self._interrupt_type = wanted
+
+    def _wants(self, type, level):
+        """Checks if a callback of an edge type is told about an edge."""
+        if type == self._interrupt_type or type == self.INTERRUPT_BOTH:
+            return True
+        return bool(level) == (type == self.INTERRUPT_RISING)
+
+    def _on_edge(self, channel):
+        """RPi.GPIO callback that hands the edge to the callbacks."""
+        timestamp = clock_lib.monotonic_ns()
+        level = rpi_gpio.input(channel)
+        if self._dispatcher is not None:
+            self._dispatcher.record(channel, level, timestamp)
+        else:
+            self._deliver(channel, level, timestamp)
+
+    def _deliver(self, pin, level, timestamp_ns):
+        """Calls the callbacks and listeners for an edge."""
+        for type, callback in self._callbacks:
+            if callback is not None and self._wants(type, level):
+                callback(pin)
+        for type, listener in self._listeners:
+            if self._wants(type, level):
+                listener(pin, level, timestamp_ns)
 
     def wait_for_edge(self, type):
         """Block until an edge is detected.
@@ -82,8 +229,11 @@ class RaspberryPiDigitalInput(base_gpio.BaseDigitalInput, RaspberryPiGPIO):
         rpi_gpio.wait_for_edge(self._pin, type)
 
     def remove_interrupt(self):
-        """Removes all interrupts from the pin."""
-        rpi_gpio.remove_event_detection(self._pin)
+        """Removes all interrupts and edge listeners from the pin."""
+        with self._lock:
+            self._callbacks = []
+            self._listeners = []
+            self._update_detection()
 
 
 class RaspberryPiDigitalOutput(RaspberryPiGPIO):
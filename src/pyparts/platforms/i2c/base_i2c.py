@@ -0,0 +1,232 @@
+import abc
+import threading
+
+
+class BaseI2CBus(object):
+    """A class for creating I2C bus peripherals.
+
+    BaseI2CBus implements block and register transfers on top of a single
+    combined transaction. Platforms are expected to subclass BaseI2CBus and
+    provide platform specific implementations of _open, _close and _transfer.
+
+    A register read writes the register address and reads the result in one
+    transaction joined by a repeated start, so no other bus master can access
+    the device in between.
+
+    Transfers hold a lock, so one bus can be shared by parts polled from
+    different threads. Platforms' _transfer implementations may therefore
+    reuse preallocated state between calls.
+
+    Attributes:
+      _bus: Integer. The I2C bus number.
+      _is_open: Boolean. Whether or not the I2C bus is open.
+      _register: Bytearray. Reused register address for register transfers.
+      _byte: Bytearray. Reused buffer for single byte register transfers.
+      _lock: Lock. Held for each transfer, including copying its result.
+    """
+    __metaclass__ = abc.ABCMeta
+
+    def __init__(self, bus):
+        """Creates an I2C bus.
+
+        Args:
+          bus: Integer. The I2C bus number.
+        """
+        self._bus = bus
+        self._is_open = False
+        self._register = bytearray(1)
+        self._byte = bytearray(1)
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _open(self):
+        """Opens the I2C bus.
+
+        This method should be implemented by the platform.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _close(self):
+        """Closes the I2C bus.
+
+        This method should be implemented by the platform.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _transfer(self, address, write_data, read_buf):
+        """Runs one combined I2C transaction.
+
+        The write, if any, is followed by the read, if any, with a repeated
+        start and no stop in between.
+
+        This method should be implemented by the platform.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          write_data: Bytes-like object or None. Data to write.
+          read_buf: Writable bytes-like object or None. Receives len(read_buf)
+            bytes.
+        """
+        raise NotImplementedError
+
+    @property
+    def bus(self):
+        """Gets the I2C bus number."""
+        return self._bus
+
+    def open(self):
+        """Opens the I2C bus."""
+        if not self._is_open:
+            self._open()
+        self._is_open = True
+
+    def close(self):
+        """Closes the I2C bus."""
+        if self._is_open:
+            self._close()
+        self._is_open = False
+
+    @property
+    def is_open(self):
+        """Checks if the I2C bus is open or not.
+
+        Returns:
+          True if the I2C bus is open, False otherwise.
+        """
+        return self._is_open
+
+    def _check_open(self):
+        if not self._is_open:
+            raise RuntimeError('I2C bus must be opened before transferring.')
+
+    def write(self, address, data):
+        """Writes a block of data to a device.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          data: Bytes-like object. Data to write.
+
+        Raises:
+          RuntimeError: Thrown if the bus isn't open.
+        """
+        self._check_open()
+        with self._lock:
+            self._transfer(address, data, None)
+
+    def readinto(self, address, buf):
+        """Reads a block of data from a device into an existing buffer.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          buf: Writable bytes-like object. Receives len(buf) bytes.
+
+        Raises:
+          RuntimeError: Thrown if the bus isn't open.
+        """
+        self._check_open()
+        with self._lock:
+            self._transfer(address, None, buf)
+
+    def read(self, address, length):
+        """Reads a block of data from a device.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          length: Integer. Number of bytes to read.
+
+        Returns:
+          A bytearray of the bytes read.
+        """
+        buf = bytearray(length)
+        self.readinto(address, buf)
+        return buf
+
+    def write_then_readinto(self, address, data, buf):
+        """Writes then reads in one transaction joined by a repeated start.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          data: Bytes-like object. Data to write.
+          buf: Writable bytes-like object. Receives len(buf) bytes.
+
+        Raises:
+          RuntimeError: Thrown if the bus isn't open.
+        """
+        self._check_open()
+        with self._lock:
+            self._transfer(address, data, buf)
+
+    def read_register(self, address, register):
+        """Reads a single byte register.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          register: Integer. The register address.
+
+        Returns:
+          Integer. The register value.
+
+        Raises:
+          RuntimeError: Thrown if the bus isn't open.
+        """
+        self._check_open()
+        with self._lock:
+            self._register[0] = register
+            self._transfer(address, self._register, self._byte)
+            return self._byte[0]
+
+    def readinto_registers(self, address, register, buf):
+        """Reads consecutive registers into an existing buffer.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          register: Integer. The first register address.
+          buf: Writable bytes-like object. Receives len(buf) register values.
+
+        Raises:
+          RuntimeError: Thrown if the bus isn't open.
+        """
+        self._check_open()
+        with self._lock:
+            self._register[0] = register
+            self._transfer(address, self._register, buf)
+
+    def read_registers(self, address, register, length):
+        """Reads consecutive registers.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          register: Integer. The first register address.
+          length: Integer. Number of registers to read.
+
+        Returns:
+          A bytearray of the register values.
+        """
+        buf = bytearray(length)
+        self.readinto_registers(address, register, buf)
+        return buf
+
+    def write_register(self, address, register, value):
+        """Writes a single byte register.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          register: Integer. The register address.
+          value: Integer from 0 to 255. The value to write.
+        """
+        self.write_registers(address, register, (value,))
+
+    def write_registers(self, address, register, values):
+        """Writes consecutive registers in one transaction.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          register: Integer. The first register address.
+          values: Bytes-like object or list of integers. The values to write.
+        """
+        data = bytearray(1 + len(values))
+        data[0] = register
+        data[1:] = bytearray(values)
+        self.write(address, data)
@@ -0,0 +1,131 @@
+import ctypes
+import fcntl
+import os
+
+from pyparts.platforms.i2c import base_i2c
+
+# ioctl request for combined transactions, from linux/i2c-dev.h.
+I2C_RDWR = 0x0707
+# Message flag for reads, from linux/i2c.h.
+I2C_M_RD = 0x0001
+
+_DEVICE_PATH = '/dev/i2c-%d'
+
+
+class I2CMessage(ctypes.Structure):
+    """struct i2c_msg from linux/i2c.h."""
+    _fields_ = [
+        ('addr', ctypes.c_uint16),
+        ('flags', ctypes.c_uint16),
+        ('len', ctypes.c_uint16),
+        ('buf', ctypes.POINTER(ctypes.c_uint8)),
+    ]
+
+
+class I2CRdwrData(ctypes.Structure):
+    """struct i2c_rdwr_ioctl_data from linux/i2c-dev.h."""
+    _fields_ = [
+        ('msgs', ctypes.POINTER(I2CMessage)),
+        ('nmsgs', ctypes.c_uint32),
+    ]
+
+
+class LinuxI2CBus(base_i2c.BaseI2CBus):
+    """I2C bus using the Linux /dev/i2c-N character devices.
+
+    Every transaction is a single I2C_RDWR ioctl. The message structures and
+    the write and read buffers are allocated once, so transfers only copy
+    into and out of them.
+
+    Attributes:
+      _path: String. Path of the bus's character device.
+      _fd: Integer. File descriptor of the open device, or None.
+      _ioctl: Function. Called as ioctl(fd, request, arg). Replaceable with an
+        in-process stand-in for testing.
+      _max_transfer_size: Integer. Largest write or read in bytes.
+      _write_buffer: ctypes array. Holds the data being written.
+      _read_buffer: ctypes array. Receives the data being read.
+      _write_view: Memoryview of _write_buffer.
+      _read_view: Memoryview of _read_buffer.
+      _messages: ctypes array of I2CMessage. The write and read messages.
+      _write_first: Pointer to the write message, for write and combined
+        transactions.
+      _read_only: Pointer to the read message, for plain reads.
+      _rdwr: I2CRdwrData. The ioctl argument.
+    """
+
+    def __init__(self, bus, max_transfer_size=256, path=None, ioctl=None):
+        """Creates a LinuxI2CBus.
+
+        Args:
+          bus: Integer. The I2C bus number.
+          max_transfer_size: Integer. Largest write or read in bytes.
+            (default=256)
+          path: String. Path of the character device.
+            (default=None, /dev/i2c-<bus>)
+          ioctl: Function. Replaces fcntl.ioctl. (default=None)
+        """
+        super(LinuxI2CBus, self).__init__(bus)
+        self._path = path or _DEVICE_PATH % bus
+        self._fd = None
+        self._ioctl = ioctl or fcntl.ioctl
+        self._max_transfer_size = max_transfer_size
+        self._write_buffer = (ctypes.c_uint8 * max_transfer_size)()
+        self._read_buffer = (ctypes.c_uint8 * max_transfer_size)()
+        self._write_view = memoryview(self._write_buffer).cast('B')
+        self._read_view = memoryview(self._read_buffer).cast('B')
+        self._messages = (I2CMessage * 2)()
+        self._messages[0].buf = self._write_buffer
+        self._messages[1].flags = I2C_M_RD
+        self._messages[1].buf = self._read_buffer
+        self._write_first = ctypes.pointer(self._messages[0])
+        self._read_only = ctypes.pointer(self._messages[1])
+        self._rdwr = I2CRdwrData()
+
+    def _open(self):
+        """Opens the I2C device."""
+        self._fd = os.open(self._path, os.O_RDWR)
+
+    def _close(self):
+        """Closes the I2C device."""
+        os.close(self._fd)
+        self._fd = None
+
+    def _transfer(self, address, write_data, read_buf):
+        """Runs one combined I2C transaction with a single I2C_RDWR ioctl.
+
+        Args:
+          address: Integer. 7 bit address of the device.
+          write_data: Bytes-like object or None. Data to write.
+          read_buf: Writable bytes-like object or None. Receives len(read_buf)
+            bytes.
+
+        Raises:
+          ValueError: Thrown if the write or read is larger than
+            max_transfer_size.
+        """
+        write_length = len(write_data) if write_data is not None else 0
+        read_length = len(read_buf) if read_buf is not None else 0
+        if max(write_length, read_length) > self._max_transfer_size:
+            raise ValueError('Transfers must be at most %d bytes.'
+                             % self._max_transfer_size)
+        messages = self._messages
+        first = self._read_only
+        count = 0
+        if write_length:
+            self._write_view[:write_length] = write_data
+            messages[0].addr = address
+            messages[0].len = write_length
+            first = self._write_first
+            count += 1
+        if read_length:
+            messages[1].addr = address
+            messages[1].len = read_length
+            count += 1
+        if not count:
+            return
+        self._rdwr.msgs = first
+        self._rdwr.nmsgs = count
+        self._ioctl(self._fd, I2C_RDWR, self._rdwr)
+        if read_length:
+            read_buf[:read_length] = self._read_view[:read_length]
@@ -0,0 +1,128 @@
+from pyparts.platforms import base_platform
+from pyparts.platforms.gpio import base_gpio
+from pyparts.platforms.gpio import mcp23s17_gpio
+
+
+class MCP23S17Platform(base_platform.BasePlatform):
+    """Platform providing the pins of an MCP23S17 GPIO expander.
+
+    MCP23S17Platform lets parts use expander pins the same way as native pins.
+    Available peripherals:
+      * DigitalInput
+      * DigitalOutput
+
+    Pins are numbered 0 to 15, with GPA0 to GPA7 as 0 to 7 and GPB0 to GPB7 as
+    8 to 15. Asking for the same pin again returns the existing object.
+
+    Attributes:
+      _expander: MCP23S17. The expander providing the pins.
+      _pins: Dict. Pin number to peripheral.
+    """
+
+    def __init__(self, spi_bus, hardware_address=0):
+        """Creates an MCP23S17Platform.
+
+        Args:
+          spi_bus: BaseSPIBus. The bus the expander is on. It must support
+            transfer.
+          hardware_address: Integer from 0 to 7. The A2 to A0 pin address.
+            (default=0)
+        """
+        super(MCP23S17Platform, self).__init__()
+        self._expander = mcp23s17_gpio.MCP23S17(spi_bus, hardware_address)
+        self._pins = {}
+
+    @property
+    def expander(self):
+        """Gets the expander providing the pins."""
+        return self._expander
+
+    def _get_pin(self, pin, cls, mode):
+        peripheral = self._pins.get(pin)
+        if peripheral is None:
+            peripheral = cls(self._expander, pin)
+            self._pins[pin] = peripheral
+        elif peripheral.mode != mode:
+            raise ValueError('Pin %d is already in use as an %s.'
+                             % (pin, 'input' if peripheral.mode ==
+                                base_gpio.BaseGPIO.INPUT else 'output'))
+        return peripheral
+
+    def get_digital_input(self, pin):
+        """Gets a digital input pin on the expander.
+
+        Args:
+          pin: Integer from 0 to 15. Pin number to create the pin on.
+
+        Returns:
+          An MCP23S17DigitalInput object for the pin.
+        """
+        return self._get_pin(pin, mcp23s17_gpio.MCP23S17DigitalInput,
+                             base_gpio.BaseGPIO.INPUT)
+
+    def get_digital_output(self, pin):
+        """Gets a digital output pin on the expander.
+
+        Args:
+          pin: Integer from 0 to 15. Pin number to create the pin on.
+
+        Returns:
+          An MCP23S17DigitalOutput object for the pin.
+        """
+        return self._get_pin(pin, mcp23s17_gpio.MCP23S17DigitalOutput,
+                             base_gpio.BaseGPIO.OUTPUT)
+
+    def get_pwm_output(self, pin):
+        """Not implemented."""
+        raise NotImplementedError
+
+    def get_hardware_spi_bus(self, port, device):
+        """Not implemented."""
+        raise NotImplementedError
+
+    def get_software_spi_bus(self, sclk_pin, mosi_pin, miso_pin, ss_pin):
+        """Not implemented."""
+        raise NotImplementedError
+
+    def get_i2c_bus(self, bus):
+        """Not implemented."""
+        raise NotImplementedError
+
+    def _is_local(self, pin):
+        return (isinstance(pin, mcp23s17_gpio.MCP23S17GPIO) and
+                pin.expander is self._expander)
+
+    def read_digital_inputs(self, inputs):
+        """Reads several digital inputs with one read of both ports.
+
+        Args:
+          inputs: List of DigitalInput. The inputs to read.
+
+        Returns:
+          List of booleans. True for each input that is HIGH.
+        """
+        if not all(self._is_local(pin) for pin in inputs):
+            return super(MCP23S17Platform, self).read_digital_inputs(inputs)
+        levels = self._expander.read_pins()
+        return [bool(levels >> pin.pin_number & 1) for pin in inputs]
+
+    def write_digital_outputs(self, outputs, values):
+        """Writes several digital outputs with at most one transfer.
+
+        Args:
+          outputs: List of DigitalOutput. The outputs to write.
+          values: List of booleans. True to set the matching output HIGH.
+
+        Raises:
+          GPIOError: Thrown if one of the pins is an input.
+        """
+        if not all(self._is_local(pin) for pin in outputs):
+            super(MCP23S17Platform, self).write_digital_outputs(outputs, values)
+            return
+        for pin in outputs:
+            if pin.mode == base_gpio.BaseGPIO.INPUT:
+                raise base_gpio.GPIOError('Failed to write pin %d. Pin %d is '
+                                          'an input.' % (pin.pin_number,
+                                                         pin.pin_number))
+        self._expander.write_pins([(pin.pin_number, value)
+                                   for pin, value in zip(outputs, values)])
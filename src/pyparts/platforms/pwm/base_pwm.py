@@ -134,6 +134,15 @@ class BasePWM(object):
         self._set_frequency_hz(frequency_hz)
         self._frequency_hz = frequency_hz
 
+    @property
+    def output_pin(self):
+        """Gets the DigitalOutput used for PWM output.
+
+        Returns:
+          The DigitalOutput the PWM is generated on.
+        """
+        return self._output_pin
+
     @property
     def pin_number(self):
         """Gets the pin number of the PWM output.
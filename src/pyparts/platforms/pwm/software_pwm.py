@@ -0,0 +1,314 @@
+import collections
+import threading
+import time
+
+from pyparts.logic import clock as clock_lib
+from pyparts.platforms.pwm import base_pwm
+
+# Timing and cost of a SoftwarePWMEngine.
+#   periods: Number of PWM periods run.
+#   writes: Number of bulk GPIO writes.
+#   mean_jitter_s: Mean lateness of an edge in seconds.
+#   max_jitter_s: Largest lateness of an edge in seconds.
+#   cpu_load: Fraction of the elapsed time the engine thread spent on the CPU,
+#     or None if the platform can't measure thread CPU time.
+EngineStats = collections.namedtuple(
+    'EngineStats',
+    ['periods', 'writes', 'mean_jitter_s', 'max_jitter_s', 'cpu_load'])
+
+
+def _thread_time():
+    """Gets the CPU time of the calling thread, or None if unsupported."""
+    if hasattr(time, 'thread_time'):
+        return time.thread_time()
+    return None
+
+
+class SoftwarePWMOutput(base_pwm.BasePWM):
+    """A PWM output generated by a SoftwarePWMEngine.
+
+    Changes are picked up by the engine at the start of its next period, so a
+    period is never cut short or stretched by an update.
+
+    Attributes:
+      _engine: SoftwarePWMEngine. The engine generating the output.
+      _target: Float. Duty cycle the engine should generate.
+      _running: Boolean. Whether the engine should generate the output.
+    """
+
+    def __init__(self, engine, output_pin):
+        """Creates a SoftwarePWMOutput. Use SoftwarePWMEngine.add_output.
+
+        Args:
+          engine: SoftwarePWMEngine. The engine generating the output.
+          output_pin: DigitalOutput. The pin to generate the output on.
+        """
+        super(SoftwarePWMOutput, self).__init__(output_pin)
+        self._engine = engine
+        self._frequency_hz = engine.frequency_hz
+        self._target = 0.0
+        self._running = False
+
+    def _enable(self):
+        """Enables the PWM output."""
+        self._running = True
+        self._engine.reschedule()
+
+    def _disable(self):
+        """Disables the PWM output, leaving the pin LOW."""
+        self._running = False
+        self._engine.reschedule()
+
+    def _set_duty_cycle(self, duty_cycle):
+        """Sets the duty cycle for the PWM output.
+
+        Args:
+          duty_cycle: Float from 0.0 to 100.0. Duty cycle to set the PWM output to.
+        """
+        self._target = float(duty_cycle)
+        self._engine.reschedule()
+
+    def _set_frequency_hz(self, frequency_hz):
+        """Checks the frequency against the engine's.
+
+        Every output of an engine shares the engine's frequency.
+
+        Args:
+          frequency_hz: Float. The frequency to set the PWM output to in Hertz.
+
+        Raises:
+          ValueError: Thrown if the frequency isn't the engine's frequency.
+        """
+        if frequency_hz != self._engine.frequency_hz:
+            raise ValueError('Software PWM outputs run at the engine frequency '
+                             'of %g Hz. Got %g'
+                             % (self._engine.frequency_hz, frequency_hz))
+
+
+class SoftwarePWMEngine(threading.Thread):
+    """Generates many software PWM outputs from a single thread.
+
+    Every period starts with one bulk write setting all of the outputs HIGH,
+    followed by the falling edges in time order. Falling edges closer
+    together than merge_window_s are combined into one bulk write through
+    the platform's write_digital_outputs. Outputs at 0% or 100% are written
+    once when they change and are left alone afterwards.
+
+    The edge schedule is only rebuilt at a period boundary, and only when an
+    output changed, so duty cycle changes never produce runt pulses.
+
+    Attributes:
+      _platform: BasePlatform. Writes the outputs.
+      _frequency_hz: Float. The PWM frequency of every output.
+      _period_s: Float. The PWM period in seconds.
+      _merge_window_s: Float. Falling edges this close are written together.
+      _clock: Clock. Provides the time and sleeps between edges.
+      _channels: List of SoftwarePWMOutput. The outputs being generated.
+      _removed: List of SoftwarePWMOutput. Removed outputs to drive LOW.
+      _condition: Condition. Protects the channels and wakes the thread.
+      _dirty: Boolean. Whether the schedule needs to be rebuilt.
+      _generation: Integer. Number of times the schedule was rebuilt.
+      _rise: Tuple. Outputs and values written at the start of each period.
+      _falls: List. (offset_s, outputs, values) written during each period.
+      _stats: List. Periods, writes, total and max jitter, CPU and elapsed
+        seconds.
+      _stopping: Boolean. Set to true to stop the thread.
+    """
+
+    def __init__(self, platform, frequency_hz=100, merge_window_s=50e-6,
+                 clock=None):
+        """Creates a SoftwarePWMEngine.
+
+        Args:
+          platform: BasePlatform. The platform the output pins are on.
+          frequency_hz: Float. The PWM frequency of every output. (default=100)
+          merge_window_s: Float. Falling edges closer than this are written
+            together. (default=50e-6)
+          clock: Clock. Provides the time and sleeps between edges.
+            (default=SYSTEM_CLOCK)
+
+        Raises:
+          ValueError: Thrown if the frequency is not positive.
+        """
+        super(SoftwarePWMEngine, self).__init__()
+        if frequency_hz <= 0:
+            raise ValueError('Frequency must be greater than 0. Got: %s'
+                             % str(frequency_hz))
+        self.daemon = True
+        self._platform = platform
+        self._frequency_hz = float(frequency_hz)
+        self._period_s = 1.0 / frequency_hz
+        self._merge_window_s = merge_window_s
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        self._channels = []
+        self._removed = []
+        self._condition = threading.Condition()
+        self._dirty = False
+        self._generation = 0
+        self._rise = ([], [])
+        self._falls = []
+        self._stats = [0, 0, 0.0, 0.0, 0.0, 0.0]
+        self._stopping = False
+
+    @property
+    def frequency_hz(self):
+        """Gets the PWM frequency of every output."""
+        return self._frequency_hz
+
+    def add_output(self, output_pin):
+        """Starts generating PWM on a pin.
+
+        The output starts disabled at a 0% duty cycle.
+
+        Args:
+          output_pin: DigitalOutput. The pin to generate PWM on.
+
+        Returns:
+          A SoftwarePWMOutput for the pin.
+        """
+        channel = SoftwarePWMOutput(self, output_pin)
+        with self._condition:
+            self._channels.append(channel)
+        return channel
+
+    def remove_output(self, channel):
+        """Stops generating PWM on a pin and leaves it LOW.
+
+        If the engine is running, this waits until the engine no longer
+        writes the pin, so the pin can be released afterwards.
+
+        Args:
+          channel: SoftwarePWMOutput. An output returned by add_output.
+        """
+        with self._condition:
+            self._channels.remove(channel)
+            if not self.is_alive():
+                self._platform.write_digital_outputs([channel.output_pin],
+                                                     [False])
+                return
+            self._removed.append(channel)
+            self._dirty = True
+            self._condition.notify_all()
+            if threading.current_thread() is not self:
+                generation = self._generation
+                self._condition.wait_for(
+                    lambda: (self._generation != generation or
+                             self._stopping),
+                    1.0 + 2 * self._period_s)
+
+    def reschedule(self):
+        """Rebuilds the edge schedule at the start of the next period."""
+        with self._condition:
+            self._dirty = True
+            self._condition.notify_all()
+
+    def stats(self):
+        """Gets the timing and CPU cost of the engine.
+
+        Returns:
+          EngineStats. Statistics since the engine started.
+        """
+        periods, writes, jitter_s, max_jitter_s, cpu_s, elapsed_s = self._stats
+        edges = writes or 1
+        cpu_load = None
+        if _thread_time() is not None and elapsed_s > 0:
+            cpu_load = cpu_s / elapsed_s
+        return EngineStats(periods, writes, jitter_s / edges, max_jitter_s,
+                           cpu_load)
+
+    def stop(self):
+        """Stops the thread at the end of the current period."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+    def _write(self, outputs, values):
+        self._platform.write_digital_outputs(outputs, values)
+        self._stats[1] += 1
+
+    def _wait_until(self, deadline):
+        """Sleeps until a deadline and records how late the thread woke."""
+        clock = self._clock
+        delay = deadline - clock.time()
+        if delay > 0:
+            clock.sleep(delay)
+        late = clock.time() - deadline
+        if late > 0:
+            stats = self._stats
+            stats[2] += late
+            if late > stats[3]:
+                stats[3] = late
+
+    def _reschedule(self):
+        """Rebuilds the edge schedule if an output changed.
+
+        Returns:
+          True if any output is generating a waveform.
+        """
+        with self._condition:
+            if not self._dirty:
+                return bool(self._rise[0] or self._falls)
+            self._dirty = False
+            settle = [(channel.output_pin, False) for channel in self._removed]
+            self._removed = []
+            pulsing = []
+            for channel in self._channels:
+                duty = channel._target if channel._running else 0.0
+                if duty <= 0 or duty >= 100:
+                    settle.append((channel.output_pin, duty >= 100))
+                else:
+                    pulsing.append((duty * self._period_s / 100.0,
+                                    channel.output_pin))
+            if settle:
+                self._write([pin for pin, _ in settle],
+                            [value for _, value in settle])
+            pulsing.sort(key=lambda edge: edge[0])
+            falls = []
+            for offset, pin in pulsing:
+                if falls and offset - falls[-1][0] <= self._merge_window_s:
+                    falls[-1][1].append(pin)
+                    falls[-1][2].append(False)
+                else:
+                    falls.append((offset, [pin], [False]))
+            self._rise = ([pin for _, pin in pulsing], [True] * len(pulsing))
+            self._falls = falls
+            self._generation += 1
+            self._condition.notify_all()
+            return bool(pulsing)
+
+    def run(self):
+        """Loop for writing the edges of every output."""
+        clock = self._clock
+        period = self._period_s
+        stats = self._stats
+        start = None
+        while True:
+            if not self._reschedule():
+                with self._condition:
+                    while not self._dirty and not self._stopping:
+                        self._condition.wait()
+                start = None
+            if self._stopping:
+                return
+            if start is None:
+                start = clock.time()
+                cpu_start = _thread_time()
+                elapsed_start = start
+                continue
+            self._wait_until(start)
+            outputs, values = self._rise
+            self._write(outputs, values)
+            for offset, outputs, values in self._falls:
+                self._wait_until(start + offset)
+                self._write(outputs, values)
+            start += period
+            stats[0] += 1
+            now = clock.time()
+            if now - start > period:
+                # Too late to catch up without a burst of short periods.
+                start = now
+            if cpu_start is not None:
+                stats[4] += _thread_time() - cpu_start
+                cpu_start = _thread_time()
+            stats[5] += now - elapsed_start
+            elapsed_start = now
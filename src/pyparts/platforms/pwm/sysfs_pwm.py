@@ -0,0 +1,161 @@
+import os
+import time
+
+from pyparts.platforms.pwm import base_pwm
+
+SYSFS_PWM_ROOT = '/sys/class/pwm'
+
+_NS_PER_S = 1000000000
+
+# Time to wait for udev to create a newly exported channel.
+_EXPORT_TIMEOUT_S = 1.0
+_EXPORT_POLL_S = 0.01
+
+
+def chip_path(chip, root=SYSFS_PWM_ROOT):
+    """Gets the sysfs directory of a PWM chip."""
+    return os.path.join(root, 'pwmchip%d' % chip)
+
+
+def num_channels(chip, root=SYSFS_PWM_ROOT):
+    """Gets the number of channels on a PWM chip.
+
+    Args:
+      chip: Integer. The PWM chip number.
+      root: String. The sysfs PWM class directory. (default=/sys/class/pwm)
+
+    Returns:
+      Integer. The number of channels, or 0 if the chip doesn't exist.
+    """
+    try:
+        with open(os.path.join(chip_path(chip, root), 'npwm')) as f:
+            return int(f.read())
+    except (IOError, OSError, ValueError):
+        return 0
+
+
+class SysfsPWMOutput(base_pwm.BasePWM):
+    """Hardware PWM output using the Linux sysfs PWM interface.
+
+    The channel is exported once and its period, duty_cycle and enable files
+    are kept open. Each update is a single pwrite of a value that changed,
+    without reopening the file. A channel left exported by an earlier user
+    keeps its old values, so they are read back when the files are opened.
+
+    Attributes:
+      _pin: Integer. The pin the channel is routed to, or None.
+      _path: String. The sysfs directory of the channel.
+      _fds: Dict. Attribute name to open file descriptor.
+      _written: Dict. Attribute name to the last value written.
+    """
+
+    def __init__(self, chip, channel, pin=None, frequency_hz=2000,
+                 root=SYSFS_PWM_ROOT):
+        """Creates a SysfsPWMOutput, exporting the channel if needed.
+
+        Args:
+          chip: Integer. The PWM chip number.
+          channel: Integer. The channel on the chip.
+          pin: Integer. The pin the channel is routed to. (default=None)
+          frequency_hz: Float. PWM frequency to use. (default=2000)
+          root: String. The sysfs PWM class directory. (default=/sys/class/pwm)
+
+        Raises:
+          IOError: Thrown if the channel can't be exported or opened.
+        """
+        super(SysfsPWMOutput, self).__init__(None)
+        self._pin = pin
+        self._path = os.path.join(chip_path(chip, root), 'pwm%d' % channel)
+        if not os.path.isdir(self._path):
+            with open(os.path.join(chip_path(chip, root), 'export'), 'w') as f:
+                f.write('%d' % channel)
+        self._fds = {}
+        self._written = {}
+        deadline = time.time() + _EXPORT_TIMEOUT_S
+        for name in ('period', 'duty_cycle', 'enable'):
+            while True:
+                try:
+                    self._fds[name] = os.open(os.path.join(self._path, name),
+                                              os.O_RDWR)
+                    break
+                except OSError:
+                    if time.time() >= deadline:
+                        self.close()
+                        raise
+                    time.sleep(_EXPORT_POLL_S)
+            self._read_current(name)
+        if 'duty_cycle' not in self._written:
+            # An unknown duty cycle might be longer than the new period.
+            self._write('duty_cycle', 0)
+        self.set_frequency_hz(frequency_hz)
+
+    def _read_current(self, name):
+        """Records an attribute's current value, if it can be read."""
+        try:
+            self._written[name] = int(os.pread(self._fds[name], 32, 0))
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        """Closes the channel's files. The channel stays exported."""
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds = {}
+
+    def _write(self, name, value):
+        """Writes a value to a channel attribute if it changed."""
+        if self._written.get(name) == value:
+            return
+        os.pwrite(self._fds[name], b'%d\n' % value, 0)
+        self._written[name] = value
+
+    def _duty_ns(self, duty_cycle, period_ns):
+        return int(round(period_ns * duty_cycle / 100.0))
+
+    def _enable(self):
+        """Enables the PWM output."""
+        self._write('enable', 1)
+
+    def _disable(self):
+        """Disables the PWM output."""
+        self._write('enable', 0)
+
+    def _set_duty_cycle(self, duty_cycle):
+        """Sets the duty cycle for the PWM output.
+
+        Args:
+          duty_cycle: Float from 0.0 to 100.0. Duty cycle to set the PWM output to.
+        """
+        period_ns = self._written.get('period', 0)
+        self._write('duty_cycle', self._duty_ns(duty_cycle, period_ns))
+
+    def _set_frequency_hz(self, frequency_hz):
+        """Sets the frequency for the PWM output.
+
+        The duty cycle is rescaled to keep the same percentage.
+
+        Args:
+          frequency_hz: Float. The frequency to set the PWM output to in Hertz.
+        """
+        if frequency_hz <= 0:
+            raise ValueError('Frequency must be greater than 0. Got: %d'
+                             % frequency_hz)
+        period_ns = int(round(_NS_PER_S / float(frequency_hz)))
+        duty_ns = self._duty_ns(self._duty_cycle, period_ns)
+        # The kernel rejects a duty cycle longer than the period, so shrink the
+        # duty cycle first when the period gets shorter.
+        if period_ns < self._written.get('duty_cycle', 0):
+            self._write('duty_cycle', duty_ns)
+            self._write('period', period_ns)
+        else:
+            self._write('period', period_ns)
+            self._write('duty_cycle', duty_ns)
+
+    @property
+    def pin_number(self):
+        """Gets the pin number of the PWM output.
+
+        Returns:
+          The pin number as an integer, or None if it wasn't given.
+        """
+        return self._pin
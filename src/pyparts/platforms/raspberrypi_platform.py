@@ -1,14 +1,28 @@
+import threading
+
 import RPi.GPIO as gpio
 
 from pyparts.platforms import base_platform
+from pyparts.platforms.gpio import base_gpio
 from pyparts.platforms.gpio import raspberrypi_gpio as rpi_gpio
+from pyparts.platforms.i2c import linux_i2c
 from pyparts.platforms.pwm import raspberrypi_pwm as rpi_pwm
+from pyparts.platforms.pwm import software_pwm
+from pyparts.platforms.pwm import sysfs_pwm
 from pyparts.platforms.spi import raspberrypi_spi as rpi_spi
 
 # Create local copies of the numbering schemes for conveinence.
 BCM = gpio.BCM
 BOARD = gpio.BOARD
 
+# Pins that can be routed to the channels of the hardware PWM chip, per
+# numbering scheme.
+_HARDWARE_PWM_CHANNELS = {
+    BCM: {12: 0, 18: 0, 13: 1, 19: 1},
+    BOARD: {32: 0, 12: 0, 33: 1, 35: 1},
+}
+_HARDWARE_PWM_CHIP = 0
+
 
 class RaspberryPiPlatform(base_platform.BasePlatform):
     """Raspberry Pi implementation of a platform.
@@ -19,17 +33,51 @@ class RaspberryPiPlatform(base_platform.BasePlatform):
       * DigitalOutput
       * PWMOutput
       * HardwareSPIBus
+      * I2CBus
+
+    Peripherals are pooled by pin, by (port, device) and by I2C bus number.
+    Asking for the same peripheral again returns the existing object, and it
+    is only cleaned up once release has been called as many times as it was
+    requested. A pin can't be in use as an input and an output at the same
+    time.
+
+    PWM outputs on pins with a hardware PWM channel use the sysfs PWM
+    interface when the channel is available, for example after loading the
+    pwm-2chan overlay. Other pins use RPi.GPIO's software PWM, which runs a
+    thread per pin, or share a single SoftwarePWMEngine thread when
+    software_pwm_frequency_hz is given.
 
     Attributes:
       _pin_numbering: BCM or BOARD. The current pin numbering scheme.
+      _edge_dispatcher: EdgeDispatcher. Dispatcher given to digital inputs.
+      _pwm_root: String. The sysfs PWM class directory.
+      _software_pwm_frequency_hz: Float. Frequency of the shared software PWM
+        engine, or None to use RPi.GPIO's software PWM.
+      _pwm_engine: SoftwarePWMEngine. The shared engine, once started.
+      _num_pwm_channels: Integer. Number of hardware PWM channels, read from
+        sysfs on the first PWM request.
+      _handles: Dict. Pool key to peripheral.
+      _refcounts: Dict. Pool key to number of unreleased requests.
+      _keys: Dict. id() of each pooled peripheral to its pool key.
+      _lock: Lock. Protects the pool.
     """
 
-    def __init__(self, pin_numbering=gpio.BOARD):
+    def __init__(self, pin_numbering=gpio.BOARD, edge_dispatcher=None,
+                 pwm_root=sysfs_pwm.SYSFS_PWM_ROOT,
+                 software_pwm_frequency_hz=None):
         """Creates a Raspberry Pi platform.
 
         Args:
           pin_numbering: BCM or BOARD. Specifies the pin numbering scheme to use.
             (default=BOARD)
+          edge_dispatcher: EdgeDispatcher. Runs the interrupt callbacks of
+            digital inputs on a worker pool. It is started if it isn't
+            running already. (default=None)
+          pwm_root: String. The sysfs PWM class directory.
+            (default=/sys/class/pwm)
+          software_pwm_frequency_hz: Float. Generate software PWM outputs
+            from one shared SoftwarePWMEngine thread at this frequency.
+            (default=None, a RPi.GPIO PWM thread per pin)
 
         Raises:
           ValueError: The pin numbering scheme was not one of (BCM, BOARD).
@@ -41,6 +89,17 @@ class RaspberryPiPlatform(base_platform.BasePlatform):
                              % str(pin_numbering))
         gpio.setmode(pin_numbering)
         self._pin_numbering = pin_numbering
+        self._edge_dispatcher = edge_dispatcher
+        if edge_dispatcher is not None:
+            edge_dispatcher.start()
+        self._pwm_root = pwm_root
+        self._software_pwm_frequency_hz = software_pwm_frequency_hz
+        self._pwm_engine = None
+        self._num_pwm_channels = None
+        self._handles = {}
+        self._refcounts = {}
+        self._keys = {}
+        self._lock = threading.RLock()
 
     def __del__(self):
         """Destructor. Cleans up GPIO pins."""
@@ -55,42 +114,214 @@ class RaspberryPiPlatform(base_platform.BasePlatform):
         """
         return self._pin_numbering
 
+    def _acquire(self, key, factory, conflicts=()):
+        """Gets a pooled peripheral, creating it if needed.
+
+        Args:
+          key: Tuple. The pool key of the peripheral.
+          factory: Function. Creates the peripheral if it isn't pooled.
+          conflicts: List of pool keys that can't be in use at the same time,
+            like the output on the same pin as an input. (default=())
+
+        Returns:
+          The pooled peripheral.
+
+        Raises:
+          ValueError: Thrown if one of the conflicting peripherals is in use.
+        """
+        with self._lock:
+            for conflict in conflicts:
+                if conflict in self._handles:
+                    raise ValueError('Pin %s is already in use (%s).'
+                                     % (conflict[1], conflict[0]))
+            if key in self._handles:
+                self._refcounts[key] += 1
+                return self._handles[key]
+            peripheral = factory()
+            self._handles[key] = peripheral
+            self._refcounts[key] = 1
+            self._keys[id(peripheral)] = key
+            return peripheral
+
+    def release(self, peripheral):
+        """Releases a peripheral returned by one of the get methods.
+
+        The peripheral is cleaned up once it has been released as many times as
+        it was requested.
+
+        Args:
+          peripheral: The peripheral to release.
+
+        Raises:
+          ValueError: Thrown if the peripheral did not come from this platform
+            or has already been fully released.
+        """
+        with self._lock:
+            key = self._keys.get(id(peripheral))
+            if key is None:
+                raise ValueError('Peripheral is not in use on this platform.')
+            self._refcounts[key] -= 1
+            if self._refcounts[key]:
+                return
+            del self._handles[key]
+            del self._refcounts[key]
+            del self._keys[id(peripheral)]
+            kind = key[0]
+            if kind in ('spi', 'i2c'):
+                peripheral.close()
+            elif kind == 'hardware_pwm':
+                peripheral.disable()
+                peripheral.close()
+            elif kind == 'pwm':
+                peripheral.disable()
+                if isinstance(peripheral, software_pwm.SoftwarePWMOutput):
+                    self._pwm_engine.remove_output(peripheral)
+                self.release(peripheral.output_pin)
+            else:
+                if kind == 'input':
+                    peripheral.remove_interrupt()
+                gpio.cleanup(peripheral.pin_number)
+
     def get_digital_input(self, pin):
-        """Creates a digital input pin on a Raspberry Pi.
+        """Gets a digital input pin on a Raspberry Pi.
 
         Args:
           pin: Integer. Pin number to create the pin on.
 
         Returns:
           A RaspberryPiDigitalInput object for the pin.
+
+        Raises:
+          ValueError: Thrown if the pin is in use as an output.
         """
-        return rpi_gpio.RaspberryPiDigitalInput(pin)
+        return self._acquire(
+            ('input', pin),
+            lambda: rpi_gpio.RaspberryPiDigitalInput(pin,
+                                                     self._edge_dispatcher),
+            conflicts=[('output', pin), ('hardware_pwm', pin)])
 
     def get_digital_output(self, pin):
-        """Creates a digital output pin on a Raspberry Pi.
+        """Gets a digital output pin on a Raspberry Pi.
 
         Args:
           pin: Integer. Pin number to create the pin on.
 
         Returns:
           A RaspberryPiDigitalOutput object for the pin.
+
+        Raises:
+          ValueError: Thrown if the pin is in use as an input.
         """
-        return rpi_gpio.RaspberryPiDigitalOutput(pin)
+        return self._acquire(('output', pin),
+                             lambda: rpi_gpio.RaspberryPiDigitalOutput(pin),
+                             conflicts=[('input', pin), ('hardware_pwm', pin)])
 
     def get_pwm_output(self, pin):
-        """Creates a PWM outut pin on a Raspberry Pi.
+        """Gets a PWM outut pin on a Raspberry Pi.
+
+        Each hardware PWM channel can be routed to two pins, and the overlay
+        decides which one it drives. Only one of them can be requested at a
+        time, and it must be the pin the overlay routed the channel to.
 
         Args:
           pin: Integer. Pin number to create the pin on.
 
         Returns:
-          A RaspberryPiPWMOutput object for the pin.
+          A SysfsPWMOutput object if the pin has an available hardware PWM
+          channel, a SoftwarePWMOutput object if the platform has a software
+          PWM frequency, otherwise a RaspberryPiPWMOutput object for the pin.
+
+        Raises:
+          ValueError: Thrown if the pin's hardware PWM channel is in use on
+            its other pin, or the pin is in use as an input or output.
         """
-        output = rpi_gpio.RaspberryPiDigitalOutput(pin)
-        return rpi_pwm.RaspberryPiPWMOutput(output)
+        channels = _HARDWARE_PWM_CHANNELS[self._pin_numbering]
+        channel = channels.get(pin)
+        if channel is not None and channel < self._hardware_pwm_channels():
+            peers = [('hardware_pwm', other)
+                     for other, other_channel in channels.items()
+                     if other_channel == channel and other != pin]
+            return self._acquire(
+                ('hardware_pwm', pin),
+                lambda: sysfs_pwm.SysfsPWMOutput(_HARDWARE_PWM_CHIP, channel,
+                                                 pin, root=self._pwm_root),
+                conflicts=peers + [('input', pin), ('output', pin)])
+        if self._software_pwm_frequency_hz is not None:
+            return self._acquire(
+                ('pwm', pin),
+                lambda: self.pwm_engine.add_output(
+                    self.get_digital_output(pin)))
+        return self._acquire(
+            ('pwm', pin),
+            lambda: rpi_pwm.RaspberryPiPWMOutput(self.get_digital_output(pin)))
+
+    def _hardware_pwm_channels(self):
+        """Gets the number of hardware PWM channels, reading sysfs once."""
+        with self._lock:
+            if self._num_pwm_channels is None:
+                self._num_pwm_channels = sysfs_pwm.num_channels(
+                    _HARDWARE_PWM_CHIP, self._pwm_root)
+            return self._num_pwm_channels
+
+    @property
+    def pwm_engine(self):
+        """Gets the shared software PWM engine, starting it if needed.
+
+        Returns:
+          The SoftwarePWMEngine, or None if the platform has no software PWM
+          frequency.
+        """
+        if self._software_pwm_frequency_hz is None:
+            return None
+        with self._lock:
+            if self._pwm_engine is None:
+                self._pwm_engine = software_pwm.SoftwarePWMEngine(
+                    self, self._software_pwm_frequency_hz)
+                self._pwm_engine.start()
+            return self._pwm_engine
+
+    def read_digital_inputs(self, inputs):
+        """Reads several digital inputs straight from RPi.GPIO.
+
+        RPi.GPIO has no call that reads a whole port, so each pin is still read
+        with its own gpio.input call, but without going through the pins'
+        is_high properties.
+
+        Args:
+          inputs: List of DigitalInput. The inputs to read.
+
+        Returns:
+          List of booleans. True for each input that is HIGH.
+        """
+        if not all(isinstance(pin, rpi_gpio.RaspberryPiGPIO) for pin in inputs):
+            return super(RaspberryPiPlatform, self).read_digital_inputs(inputs)
+        read = gpio.input
+        return [bool(read(pin.pin_number)) for pin in inputs]
+
+    def write_digital_outputs(self, outputs, values):
+        """Writes several digital outputs with a single RPi.GPIO call.
+
+        Args:
+          outputs: List of DigitalOutput. The outputs to write.
+          values: List of booleans. True to set the matching output HIGH.
+
+        Raises:
+          GPIOError: Thrown if one of the pins is an input.
+        """
+        if not all(isinstance(pin, rpi_gpio.RaspberryPiGPIO) for pin in outputs):
+            super(RaspberryPiPlatform, self).write_digital_outputs(outputs,
+                                                                   values)
+            return
+        for pin in outputs:
+            if pin.mode == base_gpio.BaseGPIO.INPUT:
+                raise base_gpio.GPIOError('Failed to write pin %d. Pin %d is '
+                                          'an input.' % (pin.pin_number,
+                                                         pin.pin_number))
+        gpio.output([pin.pin_number for pin in outputs],
+                    [bool(value) for value in values])
 
     def get_hardware_spi_bus(self, port, device):
-        """Creates a hardware based SPI bus on a Raspberry Pi.
+        """Gets a hardware based SPI bus on a Raspberry Pi.
 
         The Raspberry Pi has an available hardware SPI interface at /dev/spidevX.Y
         where X and Y are the port and device number respectively.
@@ -102,12 +333,24 @@ class RaspberryPiPlatform(base_platform.BasePlatform):
         Returns:
           A RaspberryPiHardwareSPIBus object for the port/device.
         """
-        return rpi_spi.RaspberryPiHardwareSPIBus(port, device)
+        return self._acquire(
+            ('spi', port, device),
+            lambda: rpi_spi.RaspberryPiHardwareSPIBus(port, device))
 
     def get_software_spi_bus(self, sclk_pin, mosi_pin, miso_pin, ss_pin):
         """Not implemented."""
         raise NotImplementedError
 
-    def get_i2c_bus(self):
-        """Not implemented."""
-        raise NotImplementedError
+    def get_i2c_bus(self, bus):
+        """Gets an I2C bus on a Raspberry Pi.
+
+        The Raspberry Pi's I2C buses are available at /dev/i2c-X where X is the
+        bus number. The header pins are bus 1.
+
+        Args:
+          bus: Integer. The I2C bus number to use.
+
+        Returns:
+          A LinuxI2CBus object for the bus.
+        """
+        return self._acquire(('i2c', bus), lambda: linux_i2c.LinuxI2CBus(bus))
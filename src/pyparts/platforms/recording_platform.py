@@ -0,0 +1,348 @@
+from pyparts.platforms import base_platform
+from pyparts.platforms import traffic_log
+from pyparts.platforms.gpio import base_gpio
+from pyparts.platforms.pwm import base_pwm
+from pyparts.platforms.spi import base_spi
+
+_HIGH_PAYLOAD = b'\x01'
+_LOW_PAYLOAD = b'\x00'
+
+
+class RecordingSPIBus(base_spi.BaseSPIBus):
+    """An SPI bus that records all traffic on another SPI bus.
+
+    Attributes:
+      _bus: BaseSPIBus. The SPI bus being recorded.
+      _log: TrafficLogWriter. The log to record to.
+      _channel: Integer. The log channel for the bus.
+    """
+
+    def __init__(self, bus, log, key):
+        """Creates a RecordingSPIBus.
+
+        Args:
+          bus: BaseSPIBus. The SPI bus to record.
+          log: TrafficLogWriter. The log to record to.
+          key: String. Channel key for the bus.
+        """
+        super(RecordingSPIBus, self).__init__()
+        self._bus = bus
+        self._log = log
+        self._channel = log.open_channel(key)
+
+    def _open(self):
+        """Opens the SPI bus."""
+        self._bus.open()
+        self._log.append(self._channel, traffic_log.OP_OPEN)
+
+    def _close(self):
+        """Closes the SPI bus."""
+        self._bus.close()
+        self._log.append(self._channel, traffic_log.OP_CLOSE)
+
+    def _set_clock_frequency_hz(self, frequency_hz):
+        """Sets the clock frequency of the SPI bus."""
+        self._bus.set_clock_frequency_hz(frequency_hz)
+        self._log.append_config(self._channel,
+                                traffic_log.CONFIG_CLOCK_FREQUENCY_HZ,
+                                frequency_hz)
+
+    def _set_mode(self, mode):
+        """Sets the mode of the SPI bus."""
+        self._bus.set_mode(mode)
+        self._log.append_config(self._channel, traffic_log.CONFIG_MODE, mode)
+
+    def _set_bit_order(self, order):
+        """Sets the bit order of the SPI bus."""
+        self._bus.set_bit_order(order)
+        self._log.append_config(self._channel, traffic_log.CONFIG_BIT_ORDER,
+                                order)
+
+    def write(self, data):
+        """Writes data to the SPI bus and records it.
+
+        Args:
+          data: Bytes-like object. Data to write over the SPI bus.
+        """
+        self._bus.write(data)
+        self._log.append(self._channel, traffic_log.OP_WRITE, data)
+
+    def read(self, length):
+        """Reads from the SPI bus and records the result.
+
+        Args:
+          length: Integer. The maximum number of bytes to read from the SPI bus.
+
+        Returns:
+          A bytearray of the bytes read from the bus.
+        """
+        values = self._bus.read(length)
+        self._log.append(self._channel, traffic_log.OP_READ, values)
+        return values
+
+    def readinto(self, buf):
+        """Reads from the SPI bus into a buffer and records the result.
+
+        Args:
+          buf: Writable bytes-like object. Receives at most len(buf) bytes.
+
+        Returns:
+          Integer. The number of bytes read.
+        """
+        count = self._bus.readinto(buf)
+        with memoryview(buf) as view:
+            self._log.append(self._channel, traffic_log.OP_READ, view[:count])
+        return count
+
+    def transfer(self, data):
+        """Runs a full duplex transfer and records both directions.
+
+        Args:
+          data: Bytes-like object. Data to write over the SPI bus.
+
+        Returns:
+          A bytearray of the bytes clocked in while writing.
+        """
+        values = self._bus.transfer(data)
+        self._log.append(self._channel, traffic_log.OP_WRITE, data)
+        self._log.append(self._channel, traffic_log.OP_READ, values)
+        return values
+
+
+class RecordingGPIO(base_gpio.BaseGPIO):
+    """A GPIO pin that records all reads and writes of another GPIO pin.
+
+    Attributes:
+      _gpio: BaseGPIO. The GPIO pin being recorded.
+      _log: TrafficLogWriter. The log to record to.
+      _channel: Integer. The log channel for the pin.
+    """
+
+    def __init__(self, gpio, log):
+        """Creates a RecordingGPIO.
+
+        Args:
+          gpio: BaseGPIO. The GPIO pin to record.
+          log: TrafficLogWriter. The log to record to.
+        """
+        super(RecordingGPIO, self).__init__(gpio.pin_number, gpio.mode,
+                                            gpio.pull_up_down)
+        self._gpio = gpio
+        self._log = log
+        self._channel = log.open_channel(traffic_log.gpio_key(gpio.pin_number))
+
+    def _write(self, value):
+        """Writes a value to the pin and records it."""
+        if value:
+            self._gpio.set_high()
+        else:
+            self._gpio.set_low()
+        self._log.append(self._channel, traffic_log.OP_WRITE,
+                         _HIGH_PAYLOAD if value else _LOW_PAYLOAD)
+
+    def _read(self):
+        """Reads the pin and records the value."""
+        value = self._gpio.is_high
+        self._log.append(self._channel, traffic_log.OP_READ,
+                         _HIGH_PAYLOAD if value else _LOW_PAYLOAD)
+        return base_gpio.HIGH if value else base_gpio.LOW
+
+
+class RecordingDigitalInput(base_gpio.BaseDigitalInput, RecordingGPIO):
+    """A digital input that records another digital input.
+
+    Interrupts are forwarded to the recorded pin and each time one fires an
+    OP_EDGE record is written before the callback is called.
+    """
+
+    def __init__(self, gpio, log):
+        """Creates a RecordingDigitalInput.
+
+        Args:
+          gpio: BaseDigitalInput. The digital input to record.
+          log: TrafficLogWriter. The log to record to.
+        """
+        super(RecordingDigitalInput, self).__init__(gpio, log)
+        self.INTERRUPT_FALLING = gpio.INTERRUPT_FALLING
+        self.INTERRUPT_RISING = gpio.INTERRUPT_RISING
+        self.INTERRUPT_BOTH = gpio.INTERRUPT_BOTH
+
+    def add_interrupt(self, type, callback=None, debounce_time_ms=0):
+        """Adds an interrupt to the recorded pin.
+
+        Args:
+          type: FALLING, RISING, or BOTH. Edge to trigger the interrupt on.
+          callback: Function. The function to call when the interrupt fires.
+              (default=None)
+          debounce_time_ms: Integer. Debounce time to put on the interrupt.
+              (default=0)
+        """
+        def record_edge(*args):
+            self._log.append(self._channel, traffic_log.OP_EDGE)
+            if callback:
+                callback(*args)
+        self._gpio.add_interrupt(type, record_edge, debounce_time_ms)
+
+    def wait_for_edge(self, type):
+        """Blocks until the edge is detected and records it.
+
+        Args:
+          type: RISING, FALLING, or BOTH. Edge to detect before unblocking.
+        """
+        self._gpio.wait_for_edge(type)
+        self._log.append(self._channel, traffic_log.OP_EDGE)
+
+    def remove_interrupt(self):
+        """Removes all interrupts from the recorded pin."""
+        self._gpio.remove_interrupt()
+
+
+class RecordingPWM(base_pwm.BasePWM):
+    """A PWM output that records all changes to another PWM output.
+
+    Attributes:
+      _pwm: BasePWM. The PWM output being recorded.
+      _log: TrafficLogWriter. The log to record to.
+      _channel: Integer. The log channel for the output.
+    """
+
+    def __init__(self, pwm, log):
+        """Creates a RecordingPWM.
+
+        Args:
+          pwm: BasePWM. The PWM output to record.
+          log: TrafficLogWriter. The log to record to.
+        """
+        super(RecordingPWM, self).__init__(None)
+        self._pwm = pwm
+        self._log = log
+        self._channel = log.open_channel(traffic_log.pwm_key(pwm.pin_number))
+
+    def _enable(self):
+        """Enables the PWM output."""
+        self._pwm.enable()
+        self._log.append(self._channel, traffic_log.OP_ENABLE)
+
+    def _disable(self):
+        """Disables the PWM output."""
+        self._pwm.disable()
+        self._log.append(self._channel, traffic_log.OP_DISABLE)
+
+    def _set_duty_cycle(self, duty_cycle):
+        """Sets the duty cycle of the PWM output."""
+        self._pwm.set_duty_cycle(duty_cycle)
+        self._log.append_config(self._channel, traffic_log.CONFIG_DUTY_CYCLE,
+                                duty_cycle)
+
+    def _set_frequency_hz(self, frequency_hz):
+        """Sets the frequency of the PWM output."""
+        self._pwm.set_frequency_hz(frequency_hz)
+        self._log.append_config(self._channel,
+                                traffic_log.CONFIG_PWM_FREQUENCY_HZ,
+                                frequency_hz)
+
+    @property
+    def pin_number(self):
+        """Gets the pin number of the recorded PWM output."""
+        return self._pwm.pin_number
+
+
+class RecordingPlatform(base_platform.BasePlatform):
+    """A platform that records the traffic of every peripheral it creates.
+
+    RecordingPlatform wraps another platform. Peripherals are created by the
+    wrapped platform and every operation on them is appended to a traffic log
+    that can be played back with ReplayPlatform.
+
+    Attributes:
+      _platform: BasePlatform. The platform creating the real peripherals.
+      _log: TrafficLogWriter. The log to record to.
+    """
+
+    def __init__(self, platform, path, buffer_size=65536, flush_interval_s=1.0):
+        """Creates a RecordingPlatform.
+
+        Args:
+          platform: BasePlatform. The platform to record.
+          path: String. Path of the traffic log to write.
+          buffer_size: Integer. Size of the record buffer in bytes.
+            (default=65536)
+          flush_interval_s: Float. Maximum time between flushes. (default=1.0)
+        """
+        super(RecordingPlatform, self).__init__()
+        self._platform = platform
+        self._log = traffic_log.TrafficLogWriter(path, buffer_size,
+                                                 flush_interval_s)
+
+    @property
+    def log(self):
+        """Gets the TrafficLogWriter being recorded to."""
+        return self._log
+
+    def close(self):
+        """Flushes and closes the traffic log."""
+        self._log.close()
+
+    def get_digital_input(self, pin):
+        """Creates a recorded digital input pin.
+
+        Args:
+          pin: Integer. Pin number to create the pin on.
+
+        Returns:
+          A RecordingDigitalInput object for the pin.
+        """
+        return RecordingDigitalInput(self._platform.get_digital_input(pin),
+                                     self._log)
+
+    def get_digital_output(self, pin):
+        """Creates a recorded digital output pin.
+
+        Args:
+          pin: Integer. Pin number to create the pin on.
+
+        Returns:
+          A RecordingGPIO object for the pin.
+        """
+        return RecordingGPIO(self._platform.get_digital_output(pin), self._log)
+
+    def get_pwm_output(self, pin):
+        """Creates a recorded PWM output pin.
+
+        Args:
+          pin: Integer. Pin number to create the pin on.
+
+        Returns:
+          A RecordingPWM object for the pin.
+        """
+        return RecordingPWM(self._platform.get_pwm_output(pin), self._log)
+
+    def get_hardware_spi_bus(self, port, device):
+        """Creates a recorded hardware SPI bus.
+
+        Args:
+          port: Integer. The SPI port number to use.
+          device: Integer. The SPI device number to use.
+
+        Returns:
+          A RecordingSPIBus object for the port/device.
+        """
+        return RecordingSPIBus(
+            self._platform.get_hardware_spi_bus(port, device), self._log,
+            traffic_log.spi_key(port, device))
+
+    def get_software_spi_bus(self, sclk_pin, mosi_pin, miso_pin, ss_pin):
+        """Creates a recorded software SPI bus.
+
+        Returns:
+          A RecordingSPIBus object for the pins.
+        """
+        return RecordingSPIBus(
+            self._platform.get_software_spi_bus(sclk_pin, mosi_pin, miso_pin,
+                                                ss_pin),
+            self._log, traffic_log.software_spi_key(sclk_pin, mosi_pin,
+                                                    miso_pin, ss_pin))
+
+    def get_i2c_bus(self, bus):
+        """Not recorded. Returns the wrapped platform's I2C bus."""
+        return self._platform.get_i2c_bus(bus)
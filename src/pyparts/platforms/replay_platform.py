@@ -0,0 +1,369 @@
+import heapq
+import threading
+
+from pyparts.logic import clock as clock_lib
+from pyparts.platforms import base_platform
+from pyparts.platforms import traffic_log
+from pyparts.platforms.gpio import base_gpio
+from pyparts.platforms.pwm import base_pwm
+from pyparts.platforms.spi import base_spi
+
+
+class _ReplayChannel(object):
+    """Serves the recorded reads and edges of one peripheral in order.
+
+    Attributes:
+      _platform: ReplayPlatform. The platform that owns the log.
+      _reads: List. Offsets of the channel's OP_READ records.
+      _edges: List. Offsets of the channel's OP_EDGE records.
+      _next_read: Integer. Index of the next read to serve.
+      _next_edge: Integer. Index of the next edge to serve.
+      _lock: Lock. Protects the read and edge indexes.
+    """
+
+    def __init__(self, platform, key):
+        self._platform = platform
+        reader = platform.reader
+        channel = reader.channel(key)
+        if channel is None:
+            raise traffic_log.TrafficLogError(
+                'Peripheral %s was not recorded.' % key)
+        self._reads = []
+        self._edges = []
+        for offset in reader.offsets(channel):
+            op = reader.header(offset)[2]
+            if op == traffic_log.OP_READ:
+                self._reads.append(offset)
+            elif op == traffic_log.OP_EDGE:
+                self._edges.append(offset)
+        self._next_read = 0
+        self._next_edge = 0
+        self._lock = threading.Lock()
+
+    def next_read(self):
+        """Gets the payload of the next recorded read.
+
+        Returns:
+          Memoryview of the recorded bytes.
+
+        Raises:
+          TrafficLogError: Thrown if all recorded reads have been served.
+        """
+        with self._lock:
+            if self._next_read >= len(self._reads):
+                raise traffic_log.TrafficLogError('Recorded reads exhausted.')
+            offset = self._reads[self._next_read]
+            self._next_read += 1
+        self._platform.wait_until(offset)
+        return self._platform.reader.payload(offset)
+
+    def next_edge(self):
+        """Waits for the next recorded edge.
+
+        Raises:
+          TrafficLogError: Thrown if all recorded edges have been served.
+        """
+        with self._lock:
+            if self._next_edge >= len(self._edges):
+                raise traffic_log.TrafficLogError('Recorded edges exhausted.')
+            offset = self._edges[self._next_edge]
+            self._next_edge += 1
+        self._platform.wait_until(offset)
+
+    @property
+    def edges(self):
+        """Gets the offsets of the channel's OP_EDGE records."""
+        return self._edges
+
+
+class ReplaySPIBus(base_spi.BaseSPIBus):
+    """An SPI bus that serves reads from a traffic log.
+
+    Writes and configuration changes are accepted and discarded.
+
+    Attributes:
+      _channel: _ReplayChannel. The recorded traffic of the bus.
+    """
+
+    def __init__(self, channel):
+        super(ReplaySPIBus, self).__init__()
+        self._channel = channel
+
+    def _open(self):
+        pass
+
+    def _close(self):
+        pass
+
+    def _set_clock_frequency_hz(self, frequency_hz):
+        pass
+
+    def _set_mode(self, mode):
+        pass
+
+    def _set_bit_order(self, order):
+        pass
+
+    def write(self, data):
+        """Discards written data."""
+        pass
+
+    def read(self, length):
+        """Gets the next recorded read.
+
+        Args:
+          length: Integer. The maximum number of bytes to read.
+
+        Returns:
+          A bytearray of the recorded bytes.
+        """
+        return bytearray(self._channel.next_read()[:length])
+
+    def readinto(self, buf):
+        """Copies the next recorded read into a buffer.
+
+        Args:
+          buf: Writable bytes-like object. Receives at most len(buf) bytes.
+
+        Returns:
+          Integer. The number of bytes copied.
+        """
+        payload = self._channel.next_read()
+        count = min(len(payload), len(buf))
+        with memoryview(buf) as view:
+            view[:count] = payload[:count]
+        return count
+
+    def transfer(self, data):
+        """Discards written data and gets the next recorded read.
+
+        Args:
+          data: Bytes-like object. Data that would be written.
+
+        Returns:
+          A bytearray of the recorded bytes.
+        """
+        return self.read(len(data))
+
+
+class ReplayDigitalInput(base_gpio.BaseDigitalInput):
+    """A digital input that serves values and edges from a traffic log.
+
+    Attributes:
+      _channel: _ReplayChannel. The recorded traffic of the pin.
+      _callbacks: List. Interrupt callbacks called when edges are played.
+    """
+
+    INTERRUPT_FALLING = 0
+    INTERRUPT_RISING = 1
+    INTERRUPT_BOTH = 2
+
+    def __init__(self, pin, channel):
+        super(ReplayDigitalInput, self).__init__(pin, self.INPUT, self.PUD_UP)
+        self._channel = channel
+        self._callbacks = []
+
+    def _write(self, value):
+        raise NotImplementedError
+
+    def _read(self):
+        """Gets the next recorded pin value."""
+        value = self._channel.next_read()[0]
+        return base_gpio.HIGH if value else base_gpio.LOW
+
+    def add_interrupt(self, type, callback=None, debounce_time_ms=0):
+        """Calls callback for each recorded edge during play_edges.
+
+        Args:
+          type: FALLING, RISING, or BOTH. Ignored, recorded edges already match
+            the recorded interrupt.
+          callback: Function. The function to call when an edge is played.
+              (default=None)
+          debounce_time_ms: Integer. Ignored. (default=0)
+        """
+        if callback:
+            self._callbacks.append(callback)
+
+    def wait_for_edge(self, type):
+        """Blocks until the next recorded edge.
+
+        Args:
+          type: RISING, FALLING, or BOTH. Ignored.
+        """
+        self._channel.next_edge()
+
+    def remove_interrupt(self):
+        """Removes all interrupt callbacks."""
+        self._callbacks = []
+
+    @property
+    def edge_offsets(self):
+        """Gets the log offsets of the pin's recorded edges."""
+        return self._channel.edges
+
+    def _fire(self):
+        for callback in self._callbacks:
+            callback(self._pin)
+
+
+class ReplayDigitalOutput(base_gpio.BaseGPIO):
+    """A digital output that accepts and discards writes during replay."""
+
+    def __init__(self, pin):
+        super(ReplayDigitalOutput, self).__init__(pin, self.OUTPUT,
+                                                  self.PUD_UP)
+        self._value = base_gpio.LOW
+
+    def _write(self, value):
+        self._value = value
+
+    def _read(self):
+        return self._value
+
+
+class ReplayPWMOutput(base_pwm.BasePWM):
+    """A PWM output that accepts and discards changes during replay."""
+
+    def __init__(self, pin):
+        super(ReplayPWMOutput, self).__init__(ReplayDigitalOutput(pin))
+
+    def _enable(self):
+        pass
+
+    def _disable(self):
+        pass
+
+    def _set_duty_cycle(self, duty_cycle):
+        pass
+
+    def _set_frequency_hz(self, frequency_hz):
+        pass
+
+
+class ReplayPlatform(base_platform.BasePlatform):
+    """A platform that plays back a log written by RecordingPlatform.
+
+    ReplayPlatform memory maps a traffic log and creates peripherals that serve
+    the recorded reads back to parts, so a misbehaving field unit can be
+    debugged locally with the real part drivers. Playback runs as fast as the
+    parts read, or paced to the original timing when realtime is set.
+
+    Attributes:
+      _reader: TrafficLogReader. The memory mapped log.
+      _realtime: Boolean. Whether to pace playback to the recorded timing.
+      _start_ns: Integer. Local time playback started at.
+      _inputs: List. Digital inputs that may receive played edges.
+    """
+
+    def __init__(self, path, realtime=False):
+        """Creates a ReplayPlatform.
+
+        Args:
+          path: String. Path of the traffic log to play back.
+          realtime: Boolean. Pace playback to the original timing.
+            (default=False)
+        """
+        super(ReplayPlatform, self).__init__()
+        self._reader = traffic_log.TrafficLogReader(path)
+        self._realtime = realtime
+        self._start_ns = None
+        self._inputs = []
+
+    @property
+    def reader(self):
+        """Gets the TrafficLogReader being played back."""
+        return self._reader
+
+    def wait_until(self, offset):
+        """Waits until a record's original time when playing in real time.
+
+        Args:
+          offset: Integer. Offset of the record being played.
+        """
+        if not self._realtime:
+            return
+        now = clock_lib.monotonic_ns()
+        if self._start_ns is None:
+            self._start_ns = now - self._reader.first_timestamp_ns
+        delay_ns = self._start_ns + self._reader.header(offset)[0] - now
+        if delay_ns > 0:
+            clock_lib.SYSTEM_CLOCK.sleep(delay_ns / 1e9)
+
+    def play_edges(self):
+        """Calls the interrupt callbacks of every recorded edge in log order.
+
+        Edges on pins that have not been created with get_digital_input are
+        skipped.
+        """
+        events = []
+        for pin in self._inputs:
+            for offset in pin.edge_offsets:
+                events.append((offset, pin))
+        heapq.heapify(events)
+        while events:
+            offset, pin = heapq.heappop(events)
+            self.wait_until(offset)
+            pin._fire()
+
+    def get_digital_input(self, pin):
+        """Creates a digital input that plays back a recorded pin.
+
+        Args:
+          pin: Integer. Pin number that was recorded.
+
+        Returns:
+          A ReplayDigitalInput object for the pin.
+        """
+        channel = _ReplayChannel(self, traffic_log.gpio_key(pin))
+        digital_input = ReplayDigitalInput(pin, channel)
+        self._inputs.append(digital_input)
+        return digital_input
+
+    def get_digital_output(self, pin):
+        """Creates a digital output that discards writes.
+
+        Args:
+          pin: Integer. Pin number to create the pin on.
+
+        Returns:
+          A ReplayDigitalOutput object for the pin.
+        """
+        return ReplayDigitalOutput(pin)
+
+    def get_pwm_output(self, pin):
+        """Creates a PWM output that discards changes.
+
+        Args:
+          pin: Integer. Pin number to create the pin on.
+
+        Returns:
+          A ReplayPWMOutput object for the pin.
+        """
+        return ReplayPWMOutput(pin)
+
+    def get_hardware_spi_bus(self, port, device):
+        """Creates an SPI bus that plays back a recorded bus.
+
+        Args:
+          port: Integer. The SPI port number that was recorded.
+          device: Integer. The SPI device number that was recorded.
+
+        Returns:
+          A ReplaySPIBus object for the port/device.
+        """
+        return ReplaySPIBus(
+            _ReplayChannel(self, traffic_log.spi_key(port, device)))
+
+    def get_software_spi_bus(self, sclk_pin, mosi_pin, miso_pin, ss_pin):
+        """Creates an SPI bus that plays back a recorded software SPI bus.
+
+        Returns:
+          A ReplaySPIBus object for the pins.
+        """
+        return ReplaySPIBus(_ReplayChannel(
+            self, traffic_log.software_spi_key(sclk_pin, mosi_pin, miso_pin,
+                                               ss_pin)))
+
+    def get_i2c_bus(self, bus):
+        """Not implemented."""
+        raise NotImplementedError
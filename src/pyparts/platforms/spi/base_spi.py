@@ -7,7 +7,7 @@ class BaseSPIBus(object):
     BaseSPIBus implements methods to interact with an SPI peripheral. Platforms
     are expected to subclass BaseSPIBus and provide platform specific
     implementations of _open, _close, _set_clock_frequency_hz, _set_mode,
-    _set_bit_order, write, and read.
+    _set_bit_order, write, and read, and may override readinto.
 
     Attributes:
       _is_open: Boolean. Whether or not the SPI bus is open.
@@ -181,7 +181,8 @@ class BaseSPIBus(object):
         This method should be implemented by the platform.
 
         Args:
-          data: Bytearray. Data to write over the SPI bus.
+          data: Bytes-like object, like a bytearray or memoryview. Data to write
+            over the SPI bus. The bus must not keep a reference to it.
         """
         raise NotImplementedError
 
@@ -196,6 +197,37 @@ class BaseSPIBus(object):
         """
         raise NotImplementedError
 
+    def readinto(self, buf):
+        """Reads from the SPI bus into an existing buffer.
+
+        Platforms that can read without allocating should override this. The
+        default implementation copies the result of read into buf.
+
+        Args:
+          buf: Writable bytes-like object, like a bytearray or memoryview.
+            Receives at most len(buf) bytes.
+
+        Returns:
+          Integer. The number of bytes read.
+        """
+        values = self.read(len(buf))
+        count = len(values)
+        buf[:count] = values
+        return count
+
+    def transfer(self, data):
+        """Writes data while reading the same number of bytes back.
+
+        Platforms with full duplex buses should override this.
+
+        Args:
+          data: Bytes-like object. Data to write over the SPI bus.
+
+        Returns:
+          A bytearray of the bytes clocked in while writing.
+        """
+        raise NotImplementedError
+
 
 class BaseHardwareSPIBus(BaseSPIBus):
     """A class for creating SPI buses using hardware peripherals.
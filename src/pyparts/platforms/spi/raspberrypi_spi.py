@@ -56,9 +56,10 @@ class RaspberryPiHardwareSPIBus(base_spi.BaseHardwareSPIBus):
         """Writes data to the SPI bus.
 
         Args:
-          data: Bytearray. Data to write over the SPI bus.
+          data: Bytes-like object. Data to write over the SPI bus.
         """
-        self._spi_device.writebytes(data)
+        # writebytes2 takes buffers directly instead of converting to a list.
+        self._spi_device.writebytes2(data)
 
     def read(self, length):
         """Reads at most length bytes from the SPI bus.
@@ -70,3 +71,31 @@ class RaspberryPiHardwareSPIBus(base_spi.BaseHardwareSPIBus):
           A bytearray of the bytes read from the bus.
         """
         return bytearray(self._spi_device.readbytes(length))
+
+    def readinto(self, buf):
+        """Reads from the SPI bus into an existing buffer.
+
+        spidev has no call that reads into a buffer, so the bytes still arrive
+        as a list from readbytes. They are copied into buf in one slice
+        assignment rather than byte by byte.
+
+        Args:
+          buf: Writable bytes-like object. Receives at most len(buf) bytes.
+
+        Returns:
+          Integer. The number of bytes read.
+        """
+        values = self._spi_device.readbytes(len(buf))
+        buf[:len(values)] = bytearray(values)
+        return len(values)
+
+    def transfer(self, data):
+        """Writes data while reading the same number of bytes back.
+
+        Args:
+          data: Bytes-like object. Data to write over the SPI bus.
+
+        Returns:
+          A bytearray of the bytes clocked in while writing.
+        """
+        return bytearray(self._spi_device.xfer2(list(data)))
@@ -0,0 +1,367 @@
+import collections
+import heapq
+import itertools
+import threading
+
+from pyparts.logic import clock as clock_lib
+from pyparts.platforms.spi import base_spi
+
+# Transaction priorities. Lower values run first.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+_PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+_NS_PER_S = 1e9
+
+# Time transactions of a priority waited before they started running.
+#   count: Number of transactions started.
+#   mean_s: Mean wait in seconds.
+#   max_s: Longest wait in seconds.
+LatencyStats = collections.namedtuple('LatencyStats',
+                                      ['count', 'mean_s', 'max_s'])
+
+
+class Transaction(object):
+    """A queued SPI operation and its eventual result.
+
+    Attributes:
+      _priority: Integer. The transaction's priority.
+      _func: Function. Runs the next piece of the transaction when called with
+        the transaction. Returns True once the transaction is done.
+      _submitted_ns: Integer. Monotonic time the transaction was queued.
+      _started: Boolean. Whether the transaction has started running.
+      _cancelled: Boolean. Set when a wait times out, so a transaction that
+        hasn't started is dropped instead of run late.
+      _result: The value returned by the operation.
+      _error: Exception. The error raised by the operation, if any.
+      _done: Event. Set when the transaction finishes.
+    """
+
+    def __init__(self, priority, func):
+        self._priority = priority
+        self._func = func
+        self._submitted_ns = clock_lib.monotonic_ns()
+        self._started = False
+        self._cancelled = False
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+
+    @property
+    def is_done(self):
+        """Checks if the transaction has finished."""
+        return self._done.is_set()
+
+    def wait(self, timeout_s=None):
+        """Waits for the transaction to finish.
+
+        Args:
+          timeout_s: Float. Maximum time to wait. (default=None, wait forever)
+
+        Returns:
+          The bytes read for reads, otherwise None.
+
+        Raises:
+          RuntimeError: Thrown if the transaction did not finish in time, or
+            the scheduler stopped before running it. A transaction that timed
+            out before it started is dropped.
+          Exception: Any error raised by the bus is re-raised here.
+        """
+        if not self._done.wait(timeout_s):
+            self._cancelled = True
+            raise RuntimeError('SPI transaction did not finish in time.')
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def _fail_stopped(transaction):
+    """Finishes a transaction the scheduler will never run."""
+    transaction._error = RuntimeError(
+        'SPI scheduler stopped before the transaction finished.')
+    transaction._done.set()
+
+
+class SPIScheduler(threading.Thread):
+    """Runs SPI transactions for several devices in priority order.
+
+    Every transaction on a physical bus goes through one scheduler thread.
+    The highest priority transaction runs first and transactions of the same
+    priority run in the order they were queued. Large writes are split into
+    chunks and requeued after each chunk, so a high priority read waits for at
+    most one chunk instead of a whole frame.
+
+    Attributes:
+      _max_chunk_size: Integer. Largest number of bytes written at once.
+      _queue: List. Heap of (priority, sequence, Transaction) entries.
+      _sequence: Iterator. Keeps transactions of a priority in order.
+      _condition: Condition. Protects the queue and wakes the thread.
+      _latency: Dict. Priority to [count, total_ns, max_ns].
+      _stopping: Boolean. Set to true to stop the thread.
+    """
+
+    def __init__(self, max_chunk_size=64):
+        """Creates an SPIScheduler.
+
+        Args:
+          max_chunk_size: Integer. Largest number of bytes written before
+            other transactions get a chance to run. (default=64)
+        """
+        super(SPIScheduler, self).__init__()
+        self.daemon = True
+        self._max_chunk_size = max_chunk_size
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._latency = dict((priority, [0, 0, 0]) for priority in _PRIORITIES)
+        self._stopping = False
+
+    def _submit(self, priority, func):
+        if priority not in _PRIORITIES:
+            raise ValueError('Unknown priority %s' % str(priority))
+        transaction = Transaction(priority, func)
+        with self._condition:
+            if self._stopping:
+                _fail_stopped(transaction)
+                return transaction
+            heapq.heappush(self._queue, (priority, next(self._sequence),
+                                         transaction))
+            self._condition.notify()
+        return transaction
+
+    def submit_write(self, spi_bus, data, priority=PRIORITY_NORMAL,
+                     boundary=1):
+        """Queues a write.
+
+        Args:
+          spi_bus: BaseSPIBus. The bus to write to.
+          data: Bytes-like object. The data to write. It is not copied, so it
+            must not be changed until the write is done.
+          priority: Integer. The transaction's priority.
+            (default=PRIORITY_NORMAL)
+          boundary: Integer. Chunks are a multiple of this many bytes, so a
+            write is only split where the device allows it. (default=1)
+
+        Returns:
+          Transaction. The queued write.
+        """
+        data = memoryview(data)
+        chunk_size = max(boundary,
+                         self._max_chunk_size // boundary * boundary)
+        offsets = iter(range(0, len(data), chunk_size))
+
+        def write_chunk(transaction):
+            offset = next(offsets, None)
+            if offset is None:
+                return True
+            spi_bus.write(data[offset:offset + chunk_size])
+            return offset + chunk_size >= len(data)
+        return self._submit(priority, write_chunk)
+
+    def submit_read(self, spi_bus, length, priority=PRIORITY_NORMAL):
+        """Queues a read.
+
+        Args:
+          spi_bus: BaseSPIBus. The bus to read from.
+          length: Integer. The maximum number of bytes to read.
+          priority: Integer. The transaction's priority.
+            (default=PRIORITY_NORMAL)
+
+        Returns:
+          Transaction. The queued read. Its result is the bytes read.
+        """
+        return self.submit_call(lambda: spi_bus.read(length), priority)
+
+    def submit_readinto(self, spi_bus, buf, priority=PRIORITY_NORMAL):
+        """Queues a read into an existing buffer.
+
+        Args:
+          spi_bus: BaseSPIBus. The bus to read from.
+          buf: Writable bytes-like object. Receives at most len(buf) bytes.
+          priority: Integer. The transaction's priority.
+            (default=PRIORITY_NORMAL)
+
+        Returns:
+          Transaction. The queued read. Its result is the number of bytes read.
+        """
+        return self.submit_call(lambda: spi_bus.readinto(buf), priority)
+
+    def submit_call(self, func, priority=PRIORITY_NORMAL):
+        """Queues any other bus operation, like changing the mode.
+
+        Args:
+          func: Function. Called with no arguments on the scheduler thread.
+          priority: Integer. The transaction's priority.
+            (default=PRIORITY_NORMAL)
+
+        Returns:
+          Transaction. The queued call. Its result is func's return value.
+        """
+        def call(transaction):
+            transaction._result = func()
+            return True
+        return self._submit(priority, call)
+
+    def latency(self, priority):
+        """Gets how long transactions of a priority waited to start.
+
+        Args:
+          priority: Integer. The priority class.
+
+        Returns:
+          LatencyStats. Queueing latency of the priority class.
+        """
+        with self._condition:
+            count, total_ns, max_ns = self._latency[priority]
+        mean_s = total_ns / _NS_PER_S / count if count else 0.0
+        return LatencyStats(count, mean_s, max_ns / _NS_PER_S)
+
+    def stop(self):
+        """Stops the scheduler thread once the current chunk is written.
+
+        Transactions still queued, including the rest of a partly written
+        write, fail with a RuntimeError instead of being left pending.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+
+    def run(self):
+        """Loop for running the highest priority transaction chunk."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    for _, _, transaction in self._queue:
+                        _fail_stopped(transaction)
+                    self._queue = []
+                    return
+                priority, sequence, transaction = heapq.heappop(self._queue)
+                if transaction._cancelled and not transaction._started:
+                    continue
+                if not transaction._started:
+                    transaction._started = True
+                    waited_ns = (clock_lib.monotonic_ns() -
+                                 transaction._submitted_ns)
+                    stats = self._latency[priority]
+                    stats[0] += 1
+                    stats[1] += waited_ns
+                    stats[2] = max(stats[2], waited_ns)
+            try:
+                done = transaction._func(transaction)
+            except Exception as e:
+                transaction._error = e
+                done = True
+            if done:
+                transaction._done.set()
+            else:
+                with self._condition:
+                    # Keep the original sequence so the write stays ahead of
+                    # later transactions of the same priority.
+                    heapq.heappush(self._queue,
+                                   (priority, sequence, transaction))
+
+
+class ScheduledSPIBus(base_spi.BaseSPIBus):
+    """An SPI bus whose operations go through an SPIScheduler.
+
+    ScheduledSPIBus wraps a platform SPI bus so parts like Nokia5110 and
+    MAX31855 can share a physical bus through one scheduler without any
+    changes. Each operation blocks until the scheduler has run it.
+
+    Attributes:
+      _scheduler: SPIScheduler. The scheduler running the operations.
+      _spi_bus: BaseSPIBus. The wrapped bus.
+      _priority: Integer. Priority of this bus's transactions.
+      _boundary: Integer. Writes are only split at multiples of this many
+        bytes.
+      _timeout_s: Float. Longest time an operation waits for the scheduler.
+    """
+
+    def __init__(self, scheduler, spi_bus, priority=PRIORITY_NORMAL,
+                 boundary=1, timeout_s=5.0):
+        """Creates a ScheduledSPIBus.
+
+        Args:
+          scheduler: SPIScheduler. The scheduler to run operations on.
+          spi_bus: BaseSPIBus. The bus to wrap.
+          priority: Integer. Priority of this bus's transactions.
+            (default=PRIORITY_NORMAL)
+          boundary: Integer. Writes are only split at multiples of this many
+            bytes. (default=1)
+          timeout_s: Float. Longest time an operation waits for the scheduler
+            before raising a RuntimeError. (default=5.0)
+        """
+        super(ScheduledSPIBus, self).__init__()
+        self._scheduler = scheduler
+        self._spi_bus = spi_bus
+        self._priority = priority
+        self._boundary = boundary
+        self._timeout_s = timeout_s
+
+    def _call(self, func):
+        return self._scheduler.submit_call(func, self._priority).wait(
+            self._timeout_s)
+
+    def _open(self):
+        self._call(self._spi_bus.open)
+
+    def _close(self):
+        self._call(self._spi_bus.close)
+
+    def _set_clock_frequency_hz(self, frequency_hz):
+        self._call(lambda: self._spi_bus.set_clock_frequency_hz(frequency_hz))
+
+    def _set_mode(self, mode):
+        self._call(lambda: self._spi_bus.set_mode(mode))
+
+    def _set_bit_order(self, order):
+        self._call(lambda: self._spi_bus.set_bit_order(order))
+
+    def write(self, data):
+        """Writes data to the SPI bus, possibly in several chunks.
+
+        Args:
+          data: Bytes-like object. Data to write over the SPI bus.
+        """
+        self._scheduler.submit_write(self._spi_bus, data, self._priority,
+                                     self._boundary).wait(self._timeout_s)
+
+    def read(self, length):
+        """Reads at most length bytes from the SPI bus.
+
+        Args:
+          length: Integer. The maximum number of bytes to read from the SPI bus.
+
+        Returns:
+          A bytearray of the bytes read from the bus.
+        """
+        return self._scheduler.submit_read(self._spi_bus, length,
+                                           self._priority).wait(self._timeout_s)
+
+    def readinto(self, buf):
+        """Reads from the SPI bus into an existing buffer.
+
+        Args:
+          buf: Writable bytes-like object. Receives at most len(buf) bytes.
+
+        Returns:
+          Integer. The number of bytes read.
+        """
+        return self._scheduler.submit_readinto(
+            self._spi_bus, buf, self._priority).wait(self._timeout_s)
+
+    def transfer(self, data):
+        """Writes data while reading the same number of bytes back.
+
+        Transfers are never split into chunks.
+
+        Args:
+          data: Bytes-like object. Data to write over the SPI bus.
+
+        Returns:
+          A bytearray of the bytes clocked in while writing.
+        """
+        return self._call(lambda: self._spi_bus.transfer(data))
@@ -0,0 +1,311 @@
+import array
+import mmap
+import struct
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+# File header: magic, version, reserved.
+_FILE_HEADER = struct.Struct('<4sHH')
+_MAGIC = b'PYTL'
+_VERSION = 1
+
+# Record header: timestamp_ns, channel, op, payload length.
+_RECORD_HEADER = struct.Struct('<QHBH')
+_MAX_PAYLOAD = 0xffff
+
+# Config payload: config kind, value.
+_CONFIG = struct.Struct('<Bd')
+
+# Record operations.
+OP_CHANNEL = 0
+OP_OPEN = 1
+OP_CLOSE = 2
+OP_CONFIG = 3
+OP_WRITE = 4
+OP_READ = 5
+OP_EDGE = 6
+OP_ENABLE = 7
+OP_DISABLE = 8
+_MAX_OP = OP_DISABLE
+
+# Config kinds stored in OP_CONFIG records.
+CONFIG_MODE = 0
+CONFIG_CLOCK_FREQUENCY_HZ = 1
+CONFIG_BIT_ORDER = 2
+CONFIG_DUTY_CYCLE = 3
+CONFIG_PWM_FREQUENCY_HZ = 4
+
+
+class TrafficLogError(Exception):
+    """Error type for malformed or exhausted traffic logs."""
+    pass
+
+
+def spi_key(port, device):
+    """Gets the channel key for a hardware SPI bus."""
+    return 'spi:%d.%d' % (port, device)
+
+
+def software_spi_key(sclk_pin, mosi_pin, miso_pin, ss_pin):
+    """Gets the channel key for a software SPI bus."""
+    return 'spi:%s,%s,%s,%s' % (sclk_pin, mosi_pin, miso_pin, ss_pin)
+
+
+def gpio_key(pin):
+    """Gets the channel key for a GPIO pin."""
+    return 'gpio:%s' % pin
+
+
+def pwm_key(pin):
+    """Gets the channel key for a PWM output."""
+    return 'pwm:%s' % pin
+
+
+class TrafficLogWriter(object):
+    """Appends timestamped peripheral operations to a compact binary log.
+
+    Records are packed into a preallocated buffer and written to the file when
+    the buffer fills up or the flush interval has passed, so appending a record
+    is only a struct pack and a copy.
+
+    Attributes:
+      _file: File. The log file being written.
+      _buffer: Bytearray. Preallocated buffer records are packed into.
+      _offset: Integer. Number of bytes of _buffer in use.
+      _flush_interval_ns: Integer. Maximum time records wait in the buffer.
+      _last_flush_ns: Integer. Time of the last flush.
+      _start_ns: Integer. Time the log was created. Timestamps are relative to
+        this.
+      _channels: Dict. Channel keys to channel ids.
+      _lock: Lock. Serializes appends from several threads.
+    """
+
+    def __init__(self, path, buffer_size=65536, flush_interval_s=1.0):
+        """Creates a TrafficLogWriter.
+
+        Args:
+          path: String. Path of the log file to create.
+          buffer_size: Integer. Size of the record buffer in bytes.
+            (default=65536)
+          flush_interval_s: Float. Maximum time between flushes. (default=1.0)
+        """
+        self._file = open(path, 'wb')
+        self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION, 0))
+        self._buffer = bytearray(buffer_size)
+        self._offset = 0
+        self._flush_interval_ns = int(flush_interval_s * 1e9)
+        self._start_ns = clock_lib.monotonic_ns()
+        self._last_flush_ns = self._start_ns
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def open_channel(self, key):
+        """Registers a peripheral with the log.
+
+        Args:
+          key: String. Unique key for the peripheral, like spi_key(0, 0).
+
+        Returns:
+          Integer. The channel id to use when appending records.
+        """
+        with self._lock:
+            if key in self._channels:
+                return self._channels[key]
+            channel = len(self._channels)
+            self._channels[key] = channel
+            # Written under the lock so no other thread can append to the
+            # channel before the log declares it.
+            self._append(channel, OP_CHANNEL, key.encode('utf-8'))
+        return channel
+
+    def append(self, channel, op, payload=b''):
+        """Appends a record to the log.
+
+        Args:
+          channel: Integer. Channel id from open_channel.
+          op: Integer. One of the OP_* operations.
+          payload: Buffer or list of byte values. Data for the record.
+            (default=b'')
+
+        Raises:
+          ValueError: Thrown if the payload is larger than 65535 bytes.
+        """
+        length = len(payload)
+        if length > _MAX_PAYLOAD:
+            raise ValueError('Payload must be at most %d bytes. Got %d'
+                             % (_MAX_PAYLOAD, length))
+        with self._lock:
+            self._append(channel, op, payload)
+
+    def _append(self, channel, op, payload):
+        """Appends a checked record. Caller must hold _lock."""
+        length = len(payload)
+        now = clock_lib.monotonic_ns()
+        size = _RECORD_HEADER.size + length
+        if self._offset + size > len(self._buffer):
+            self._flush()
+        if size > len(self._buffer):
+            self._file.write(_RECORD_HEADER.pack(
+                now - self._start_ns, channel, op, length))
+            self._file.write(bytearray(payload))
+            return
+        _RECORD_HEADER.pack_into(self._buffer, self._offset,
+                                 now - self._start_ns, channel, op, length)
+        start = self._offset + _RECORD_HEADER.size
+        self._buffer[start:start + length] = payload
+        self._offset = start + length
+        if now - self._last_flush_ns >= self._flush_interval_ns:
+            self._flush()
+
+    def append_config(self, channel, kind, value):
+        """Appends an OP_CONFIG record.
+
+        Args:
+          channel: Integer. Channel id from open_channel.
+          kind: Integer. One of the CONFIG_* kinds.
+          value: Float. The configured value.
+        """
+        self.append(channel, OP_CONFIG, _CONFIG.pack(kind, value))
+
+    def _flush(self):
+        """Writes buffered records to the file. Caller must hold _lock."""
+        if self._offset:
+            self._file.write(memoryview(self._buffer)[:self._offset])
+            self._offset = 0
+        self._file.flush()
+        self._last_flush_ns = clock_lib.monotonic_ns()
+
+    def flush(self):
+        """Writes all buffered records to the file."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flushes and closes the log."""
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+
+
+class TrafficLogReader(object):
+    """Memory maps a traffic log and indexes its records.
+
+    A record cut short at the end of the log, left by an unclean shutdown, is
+    ignored so the records before it can still be played back.
+
+    Attributes:
+      _map: mmap. The memory mapped log file.
+      _channels: Dict. Channel keys to channel ids.
+      _offsets: Dict. Channel id to array of record offsets, in log order.
+    """
+
+    def __init__(self, path):
+        """Creates a TrafficLogReader.
+
+        Args:
+          path: String. Path of the log file to read.
+
+        Raises:
+          TrafficLogError: Thrown if the file is not a traffic log or a record
+            is corrupt.
+        """
+        with open(path, 'rb') as f:
+            f.seek(0, 2)
+            if f.tell() < _FILE_HEADER.size:
+                raise TrafficLogError('%s is too short to be a traffic log.'
+                                      % path)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _ = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise TrafficLogError('%s is not a version %d traffic log.'
+                                  % (path, _VERSION))
+        self._channels = {}
+        self._offsets = {}
+        self._index()
+
+    def _index(self):
+        offset = _FILE_HEADER.size
+        end = len(self._map)
+        while offset + _RECORD_HEADER.size <= end:
+            _, channel, op, length = _RECORD_HEADER.unpack_from(
+                self._map, offset)
+            if offset + _RECORD_HEADER.size + length > end:
+                # Truncated final record from an unclean shutdown.
+                break
+            if op > _MAX_OP:
+                raise TrafficLogError('Corrupt record at offset %d: unknown '
+                                      'operation %d.' % (offset, op))
+            if op != OP_CHANNEL and channel not in self._offsets:
+                raise TrafficLogError('Corrupt record at offset %d: unknown '
+                                      'channel %d.' % (offset, channel))
+            if op == OP_CHANNEL:
+                key = self.payload(offset).tobytes().decode('utf-8')
+                self._channels[key] = channel
+            self._offsets.setdefault(channel, array.array('L')).append(offset)
+            offset += _RECORD_HEADER.size + length
+
+    def channel(self, key):
+        """Gets the channel id for a peripheral.
+
+        Args:
+          key: String. The peripheral key, like spi_key(0, 0).
+
+        Returns:
+          Integer. The channel id, or None if the peripheral was not recorded.
+        """
+        return self._channels.get(key)
+
+    def offsets(self, channel):
+        """Gets the offsets of every record on a channel.
+
+        Args:
+          channel: Integer. The channel id.
+
+        Returns:
+          Array of record offsets in log order.
+        """
+        return self._offsets.get(channel, array.array('L'))
+
+    def header(self, offset):
+        """Reads a record header.
+
+        Args:
+          offset: Integer. Offset of the record.
+
+        Returns:
+          Tuple of (timestamp_ns, channel, op, length).
+        """
+        return _RECORD_HEADER.unpack_from(self._map, offset)
+
+    def payload(self, offset):
+        """Gets a zero-copy view of a record's payload.
+
+        Args:
+          offset: Integer. Offset of the record.
+
+        Returns:
+          Memoryview of the payload bytes.
+        """
+        length = _RECORD_HEADER.unpack_from(self._map, offset)[3]
+        start = offset + _RECORD_HEADER.size
+        return memoryview(self._map)[start:start + length]
+
+    def config(self, offset):
+        """Decodes an OP_CONFIG record.
+
+        Args:
+          offset: Integer. Offset of the record.
+
+        Returns:
+          Tuple of (kind, value).
+        """
+        return _CONFIG.unpack_from(self._map, offset + _RECORD_HEADER.size)
+
+    @property
+    def first_timestamp_ns(self):
+        """Gets the timestamp of the first record in the log."""
+        if len(self._map) < _FILE_HEADER.size + _RECORD_HEADER.size:
+            return 0
+        return self.header(_FILE_HEADER.size)[0]
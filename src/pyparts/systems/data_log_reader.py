@@ -0,0 +1,70 @@
+import collections
+import mmap
+
+import numpy
+
+from pyparts.systems import data_logger
+
+_NS_PER_US = 1000
+
+# Records of a data log as one array per column.
+#   timestamps_ns: int64 array. Timestamps in nanoseconds.
+#   channels: uint16 array. The channel of each record.
+#   values: float64 array. The logged values.
+#   flags: uint8 array. The flags logged with each value.
+Records = collections.namedtuple(
+    'Records', ['timestamps_ns', 'channels', 'values', 'flags'])
+
+
+def read_segment(path):
+    """Reads the records of a segment without copying or parsing them.
+
+    The channel, value and flag arrays, and timestamps that aren't delta
+    encoded, are read only views of the mapped file. Segments that are still
+    being written can be read. Only records written before the call are
+    returned.
+
+    Args:
+      path: String. Path of a segment file written by a DataLogger.
+
+    Returns:
+      Records. The segment's records.
+
+    Raises:
+      DataLogError: Thrown if the file is not a data log segment.
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header = data_logger.read_header(mapped)
+    _, layout = data_logger.column_layout(header.capacity,
+                                          header.delta_encoded)
+    columns = {}
+    for name, typecode, offset in layout:
+        columns[name] = numpy.frombuffer(mapped, dtype=numpy.dtype(typecode),
+                                         count=header.count, offset=offset)
+    timestamps = columns['timestamps']
+    if header.delta_encoded:
+        timestamps = (header.base_ns + _NS_PER_US *
+                      numpy.cumsum(timestamps, dtype=numpy.int64))
+    return Records(timestamps, columns['channels'], columns['values'],
+                   columns['flags'])
+
+
+def read_log(directory, prefix='log'):
+    """Reads every segment of a log into one set of arrays.
+
+    Args:
+      directory: String. The directory holding the log.
+      prefix: String. The log's file name prefix. (default=log)
+
+    Returns:
+      Records. The log's records in the order they were written.
+    """
+    segments = [read_segment(path)
+                for path in data_logger.segment_paths(directory, prefix)]
+    if not segments:
+        return Records(numpy.zeros(0, numpy.int64), numpy.zeros(0, numpy.uint16),
+                       numpy.zeros(0, numpy.float64),
+                       numpy.zeros(0, numpy.uint8))
+    return Records(*[numpy.concatenate(column)
+                     for column in zip(*segments)])
@@ -0,0 +1,414 @@
+import collections
+import errno
+import mmap
+import os
+import re
+import struct
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+# Segment header: magic, version, flags, capacity, base timestamp in
+# nanoseconds, then the number of records written.
+_HEADER = struct.Struct('<4sHHIqQ')
+_MAGIC = b'PYDL'
+_VERSION = 1
+_BASE_OFFSET = 12
+_COUNT_OFFSET = 20
+
+# Header flag set when timestamps are stored as microsecond deltas.
+_DELTA_ENCODED = 0x1
+_MAX_DELTA_US = 0xffffffff
+
+_NS_PER_US = 1000
+_NS_PER_S = 1000000000
+
+# Columns of a segment as (name, typecode). Typecodes are shared by array,
+# memoryview.cast and numpy.dtype and use the native byte order.
+_VALUE_COLUMN = ('values', 'd')
+_TIMESTAMP_COLUMN = ('timestamps', 'q')
+_DELTA_COLUMN = ('timestamps', 'I')
+_CHANNEL_COLUMN = ('channels', 'H')
+_FLAGS_COLUMN = ('flags', 'B')
+
+_SEGMENT_NAME = '%s-%06d.seg'
+
+# Header of a segment file.
+#   delta_encoded: Boolean. Whether timestamps are microsecond deltas.
+#   capacity: Integer. Number of records the segment can hold.
+#   base_ns: Integer. Timestamp of the first record in nanoseconds.
+#   count: Integer. Number of records written.
+SegmentHeader = collections.namedtuple(
+    'SegmentHeader', ['delta_encoded', 'capacity', 'base_ns', 'count'])
+
+
+class DataLogError(Exception):
+    """Error type for malformed data log segments."""
+    pass
+
+
+def column_layout(capacity, delta_encoded):
+    """Gets where each column of a segment is stored.
+
+    Args:
+      capacity: Integer. Number of records the segment can hold.
+      delta_encoded: Boolean. Whether timestamps are microsecond deltas.
+
+    Returns:
+      Tuple of the segment size in bytes and a list of (name, typecode,
+      offset) for each column.
+    """
+    timestamps = _DELTA_COLUMN if delta_encoded else _TIMESTAMP_COLUMN
+    columns = []
+    offset = _HEADER.size
+    for name, typecode in (_VALUE_COLUMN, timestamps, _CHANNEL_COLUMN,
+                           _FLAGS_COLUMN):
+        # Keep every column 8 byte aligned.
+        offset = (offset + 7) & ~7
+        columns.append((name, typecode, offset))
+        offset += capacity * struct.calcsize(typecode)
+    return offset, columns
+
+
+def read_header(buffer):
+    """Reads the header of a segment.
+
+    Args:
+      buffer: Buffer. The contents of a segment file.
+
+    Returns:
+      SegmentHeader. The segment's header.
+
+    Raises:
+      DataLogError: Thrown if the buffer is not a data log segment.
+    """
+    if len(buffer) < _HEADER.size:
+        raise DataLogError('Segment is too short.')
+    magic, version, flags, capacity, base_ns, count = \
+        _HEADER.unpack_from(buffer, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise DataLogError('Not a version %d data log segment.' % _VERSION)
+    return SegmentHeader(bool(flags & _DELTA_ENCODED), capacity, base_ns,
+                         count)
+
+
+def segment_paths(directory, prefix='log'):
+    """Gets the segment files of a log in the order they were written.
+
+    Args:
+      directory: String. The directory holding the log.
+      prefix: String. The log's file name prefix. (default=log)
+
+    Returns:
+      List of segment file paths.
+    """
+    pattern = re.compile(r'%s-(\d+)\.seg$' % re.escape(prefix))
+    numbered = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            numbered.append((int(match.group(1)), name))
+    return [os.path.join(directory, name) for _, name in sorted(numbered)]
+
+
+def _allocate(f, size):
+    """Sizes a new file, reserving its blocks up front where possible.
+
+    A truncated file is sparse, so its blocks would be allocated by page
+    faults while records are logged, or fail then if the disk is full.
+    posix_fallocate allocates them now instead. Filesystems without it fall
+    back to a sparse file.
+
+    Args:
+      f: File. The empty file to size.
+      size: Integer. The file's size in bytes.
+    """
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+    f.truncate(size)
+
+
+class _Segment(object):
+    """A preallocated, memory mapped segment file being written.
+
+    Attributes:
+      path: String. Path of the segment file.
+      count: Integer. Number of records written.
+      _capacity: Integer. Number of records the segment can hold.
+      _duration_ns: Integer. Longest time span of the segment, or None.
+      _delta_encoded: Boolean. Whether timestamps are microsecond deltas.
+      _base_ns: Integer. Timestamp of the first record, or None.
+      _last_us: Integer. Timestamp of the last record in microseconds.
+      _file: File. The segment file.
+      _map: mmap. The shared mapping.
+      _views: List of memoryview. The header fields and columns being
+        written.
+    """
+
+    def __init__(self, path, capacity, duration_ns, delta_encoded):
+        size, columns = column_layout(capacity, delta_encoded)
+        self.path = path
+        self.count = 0
+        self._capacity = capacity
+        self._duration_ns = duration_ns
+        self._delta_encoded = delta_encoded
+        self._base_ns = None
+        self._last_us = 0
+        self._file = open(path, 'w+b')
+        try:
+            _allocate(self._file, size)
+        except Exception:
+            self._file.close()
+            os.remove(path)
+            raise
+        self._map = mmap.mmap(self._file.fileno(), size)
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION,
+                          _DELTA_ENCODED if delta_encoded else 0, capacity, 0,
+                          0)
+        whole = memoryview(self._map)
+        self._base = whole[_BASE_OFFSET:_BASE_OFFSET + 8].cast('q')
+        self._count = whole[_COUNT_OFFSET:_COUNT_OFFSET + 8].cast('Q')
+        columns = dict((name, whole[offset:offset + capacity *
+                                    struct.calcsize(typecode)].cast(typecode))
+                       for name, typecode, offset in columns)
+        self._values = columns['values']
+        self._timestamps = columns['timestamps']
+        self._channels = columns['channels']
+        self._flags = columns['flags']
+        self._views = [whole, self._base, self._count, self._values,
+                       self._timestamps, self._channels, self._flags]
+
+    def accepts(self, timestamp_ns):
+        """Checks if a record with the timestamp fits in the segment."""
+        if self.count >= self._capacity:
+            return False
+        if self._base_ns is None:
+            return True
+        if (self._duration_ns is not None and
+                timestamp_ns - self._base_ns >= self._duration_ns):
+            return False
+        if self._delta_encoded:
+            delta = timestamp_ns // _NS_PER_US - self._last_us
+            return 0 <= delta <= _MAX_DELTA_US
+        return True
+
+    def append(self, timestamp_ns, channel, value, flags):
+        """Writes a record. The record count is updated last."""
+        index = self.count
+        if self._base_ns is None:
+            if self._delta_encoded:
+                timestamp_ns -= timestamp_ns % _NS_PER_US
+                self._last_us = timestamp_ns // _NS_PER_US
+            self._base_ns = timestamp_ns
+            self._base[0] = timestamp_ns
+        self._values[index] = value
+        if self._delta_encoded:
+            timestamp_us = timestamp_ns // _NS_PER_US
+            self._timestamps[index] = timestamp_us - self._last_us
+            self._last_us = timestamp_us
+        else:
+            self._timestamps[index] = timestamp_ns
+        self._channels[index] = channel
+        self._flags[index] = flags
+        self.count = index + 1
+        self._count[0] = self.count
+
+    def flush(self):
+        """Writes the segment to disk and waits for it to finish."""
+        self._map.flush()
+
+    def close(self):
+        """Unmaps and closes the segment file."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+
+class DataLogger(object):
+    """Appends fixed width records to memory mapped, columnar segment files.
+
+    Each record is a timestamp, an integer channel, a float value and 8 bits
+    of flags. A segment stores each field in its own column, so a reader can
+    map a whole column as an array without parsing. Logging a record only
+    writes into the current segment's mapping, so it can be called from a
+    control loop. Segments are rotated when full or when they span
+    segment_duration_s, and a background thread creates the next segment
+    ahead of time and closes finished ones.
+
+    With delta_encoding, timestamps are stored as 32 bit microsecond deltas
+    from the previous record instead of 64 bit nanoseconds, and a segment is
+    also rotated when a delta would not fit.
+
+    Attributes:
+      _directory: String. The directory holding the segments.
+      _prefix: String. File name prefix of the segments.
+      _segment_records: Integer. Number of records per segment.
+      _duration_ns: Integer. Longest time span of a segment, or None.
+      _delta_encoding: Boolean. Whether timestamps are delta encoded.
+      _clock: Clock. Timestamps records logged without a timestamp.
+      _next_index: Integer. Number of the next segment file.
+      _segment: _Segment. The segment being written.
+      _spare: _Segment. The next segment, once created.
+      _finished: List of _Segment. Rotated segments waiting to be closed.
+      _lock: Lock. Serializes logging.
+      _condition: Condition. Wakes the background thread.
+      _worker: Thread. Creates and closes segments.
+      _stopping: Boolean. Set to true to stop the background thread.
+      _error: Exception. Why the background thread stopped, or None.
+    """
+
+    def __init__(self, directory, prefix='log', segment_records=65536,
+                 segment_duration_s=None, delta_encoding=False, clock=None):
+        """Creates a DataLogger.
+
+        Logging continues after the segments already in the directory.
+
+        Args:
+          directory: String. The directory to write segments to.
+          prefix: String. File name prefix of the segments. (default=log)
+          segment_records: Integer. Number of records per segment.
+            (default=65536)
+          segment_duration_s: Float. Longest time span of a segment.
+            (default=None, no limit)
+          delta_encoding: Boolean. Store timestamps as microsecond deltas.
+            (default=False)
+          clock: Clock. Timestamps records logged without a timestamp.
+            (default=SYSTEM_CLOCK)
+
+        Raises:
+          ValueError: Thrown if segment_records is not positive.
+        """
+        if segment_records <= 0:
+            raise ValueError('Segments must hold at least one record. Got %d'
+                             % segment_records)
+        self._directory = directory
+        self._prefix = prefix
+        self._segment_records = segment_records
+        self._duration_ns = None
+        if segment_duration_s is not None:
+            self._duration_ns = int(segment_duration_s * _NS_PER_S)
+        self._delta_encoding = delta_encoding
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        existing = segment_paths(directory, prefix)
+        self._next_index = 0
+        if existing:
+            name = os.path.basename(existing[-1])
+            self._next_index = int(name[len(prefix) + 1:-len('.seg')]) + 1
+        self._segment = self._create()
+        self._spare = None
+        self._finished = []
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._error = None
+        self._worker = threading.Thread(target=self._run)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def _create(self):
+        """Creates the next segment file."""
+        path = os.path.join(self._directory,
+                            _SEGMENT_NAME % (self._prefix, self._next_index))
+        self._next_index += 1
+        return _Segment(path, self._segment_records, self._duration_ns,
+                        self._delta_encoding)
+
+    def _run(self):
+        """Runs the background thread, recording the error that stops it."""
+        try:
+            self._work()
+        except Exception as e:
+            with self._condition:
+                self._error = e
+                self._condition.notify_all()
+
+    def _work(self):
+        """Loop for creating the spare segment and closing finished ones."""
+        while True:
+            with self._condition:
+                while (not self._stopping and not self._finished and
+                       self._spare is not None):
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                finished = self._finished
+                self._finished = []
+                need_spare = self._spare is None
+            if need_spare:
+                spare = self._create()
+                with self._condition:
+                    self._spare = spare
+                    self._condition.notify_all()
+            for segment in finished:
+                segment.close()
+
+    def _rotate(self):
+        """Switches to the spare segment. Caller must hold _lock.
+
+        Raises:
+          Exception: The error that stopped the background thread, like an
+            OSError for a full disk, if it stopped before creating the spare.
+        """
+        with self._condition:
+            # Only blocks if records arrive faster than segments are created.
+            while self._spare is None and self._error is None:
+                self._condition.wait()
+            if self._spare is None:
+                raise self._error
+            spare = self._spare
+            self._spare = None
+            self._finished.append(self._segment)
+            self._condition.notify_all()
+        self._segment = spare
+        return spare
+
+    def log(self, channel, value, flags=0, timestamp=None):
+        """Appends a record.
+
+        Args:
+          channel: Integer from 0 to 65535. The channel the value belongs to.
+          value: Float. The value.
+          flags: Integer from 0 to 255. Flags stored with the value, like
+            sensor fault bits. (default=0)
+          timestamp: Float. Time of the value in seconds.
+            (default=None, the clock's time)
+
+        Raises:
+          Exception: The error that stopped the background thread, if the
+            segment is full and no spare segment could be created.
+        """
+        if timestamp is None:
+            timestamp = self._clock.time()
+        timestamp_ns = int(timestamp * _NS_PER_S)
+        with self._lock:
+            segment = self._segment
+            if not segment.accepts(timestamp_ns):
+                segment = self._rotate()
+            segment.append(timestamp_ns, channel, value, flags)
+
+    def flush(self):
+        """Writes the current segment to disk and waits for it to finish."""
+        with self._lock:
+            self._segment.flush()
+
+    def close(self):
+        """Closes every segment and removes the unused spare segment."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._worker.join()
+        with self._lock:
+            for segment in self._finished + [self._segment]:
+                segment.close()
+            self._finished = []
+            if self._spare is not None:
+                self._spare.close()
+                os.remove(self._spare.path)
+                self._spare = None
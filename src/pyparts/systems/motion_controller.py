@@ -0,0 +1,199 @@
+import collections
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+
+class MotionController(threading.Thread):
+    """Runs coordinated moves on several StepperMotors from one thread.
+
+    Moves are queued as target positions for every axis. Each move is
+    interpolated with a Bresenham style DDA: the axis with the most steps
+    steps on every tick and the other axes step whenever their accumulated
+    error crosses zero, so all axes start and finish together on a straight
+    line. Every step is emitted from a single loop that sleeps until an
+    absolute deadline, and queued moves run back to back without the loop
+    going idle in between.
+
+    Positions are in phases of each motor's drive mode, like
+    StepperMotor.position.
+
+    Attributes:
+      _axes: List of StepperMotor. The motors being driven.
+      _clock: Clock. Provides the time and sleeps between steps.
+      _moves: Deque. Queued (targets, rate_hz) moves.
+      _planned: List. Position of each axis once every queued move is done.
+      _condition: Condition. Protects the queue and wakes the thread.
+      _busy: Boolean. Whether a move is being run.
+      _active: List. Targets of the move being run, or None.
+      _late_steps: Integer. Number of ticks that missed their deadline.
+      _stopping: Boolean. Set to true to stop the thread.
+    """
+
+    def __init__(self, axes, clock=None):
+        """Creates a MotionController.
+
+        Args:
+          axes: List of StepperMotor. The motors to drive.
+          clock: Clock. Provides the time and sleeps between steps.
+            (default=SYSTEM_CLOCK)
+        """
+        super(MotionController, self).__init__()
+        self.daemon = True
+        self._axes = list(axes)
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        self._moves = collections.deque()
+        self._planned = [axis.position for axis in self._axes]
+        self._condition = threading.Condition()
+        self._busy = False
+        self._active = None
+        self._late_steps = 0
+        self._stopping = False
+
+    @property
+    def position(self):
+        """Gets the current position of every axis.
+
+        Returns:
+          Tuple of integers, one per axis.
+        """
+        return tuple(axis.position for axis in self._axes)
+
+    @property
+    def late_steps(self):
+        """Gets the number of ticks that were run after their deadline."""
+        return self._late_steps
+
+    @property
+    def is_idle(self):
+        """Checks if every queued move has finished."""
+        with self._condition:
+            return not self._moves and not self._busy
+
+    def move_to(self, targets, rate_hz):
+        """Queues a move to absolute positions.
+
+        Args:
+          targets: List of integers. The target position of each axis, or None
+            to keep an axis where it is.
+          rate_hz: Float. Steps per second of the axis moving the furthest.
+
+        Raises:
+          ValueError: Thrown if the number of targets does not match the number
+            of axes or the rate is not positive.
+        """
+        if len(targets) != len(self._axes):
+            raise ValueError('Expected %d targets. Got %d'
+                             % (len(self._axes), len(targets)))
+        if rate_hz <= 0:
+            raise ValueError('Rate must be greater than 0. Got %s'
+                             % str(rate_hz))
+        with self._condition:
+            targets = [planned if target is None else int(target)
+                       for planned, target in zip(self._planned, targets)]
+            self._planned = targets
+            self._moves.append((targets, float(rate_hz)))
+            self._condition.notify_all()
+
+    def move_by(self, deltas, rate_hz):
+        """Queues a move relative to the end of the previously queued move.
+
+        Args:
+          deltas: List of integers. Steps to move each axis.
+          rate_hz: Float. Steps per second of the axis moving the furthest.
+        """
+        with self._condition:
+            targets = [planned + delta
+                       for planned, delta in zip(self._planned, deltas)]
+            self.move_to(targets, rate_hz)
+
+    def clear(self):
+        """Drops every queued move that has not started yet."""
+        with self._condition:
+            self._moves.clear()
+            if self._active is not None:
+                self._planned = list(self._active)
+            else:
+                self._planned = [axis.position for axis in self._axes]
+            self._condition.notify_all()
+
+    def wait(self, timeout_s=None):
+        """Blocks until every queued move has finished.
+
+        Args:
+          timeout_s: Float. Maximum time to wait. (default=None, wait forever)
+
+        Returns:
+          True if the controller is idle.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._moves and not self._busy, timeout_s)
+
+    def stop(self):
+        """Stops the thread after the current tick."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+    def _next_move(self):
+        """Waits for a queued move. Returns None when stopping."""
+        with self._condition:
+            finished = self._busy
+            self._busy = False
+            self._active = None
+            if finished and not self._moves:
+                for axis in self._axes:
+                    axis.hold()
+                self._condition.notify_all()
+            while not self._moves and not self._stopping:
+                self._condition.wait()
+            if self._stopping:
+                return None
+            self._busy = True
+            move = self._moves.popleft()
+            self._active = move[0]
+            return move
+
+    def run(self):
+        """Loop for interpolating queued moves and stepping the axes."""
+        clock = self._clock
+        deadline = None
+        while True:
+            move = self._next_move()
+            if move is None:
+                return
+            targets, rate_hz = move
+            period = 1.0 / rate_hz
+            deltas = [target - axis.position
+                      for axis, target in zip(self._axes, targets)]
+            counts = [abs(delta) for delta in deltas]
+            major = max(counts) if counts else 0
+            if not major:
+                continue
+            steppers = [(axis, 1 if delta > 0 else -1, count)
+                        for axis, delta, count in zip(self._axes, deltas,
+                                                      counts) if count]
+            errors = [major // 2] * len(steppers)
+            if deadline is None:
+                deadline = clock.time()
+            for _ in range(major):
+                if self._stopping:
+                    return
+                deadline += period
+                delay = deadline - clock.time()
+                if delay > 0:
+                    clock.sleep(delay)
+                elif delay < 0:
+                    self._late_steps += 1
+                    if delay < -period:
+                        # Too late to catch up without a burst of steps.
+                        deadline = clock.time()
+                for i, (axis, direction, count) in enumerate(steppers):
+                    errors[i] -= count
+                    if errors[i] < 0:
+                        errors[i] += major
+                        axis.step(direction)
+            with self._condition:
+                if not self._moves:
+                    deadline = None
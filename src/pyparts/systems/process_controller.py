@@ -0,0 +1,234 @@
+import collections
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+from pyparts.logic import clock as clock_lib
+from pyparts.logic import shared_struct
+
+# Written by the parent: set point, enabled, stop.
+_CONTROL_FORMAT = '<d??'
+# Written by the child: heartbeat_ns, input, output, iterations.
+_TELEMETRY_FORMAT = '<QddQ'
+
+_NS_PER_S = 1e9
+
+# Latest telemetry published by a controller process.
+#   heartbeat_ns: Monotonic time the child last went through its loop.
+#   input: Value read by the most recent control iteration.
+#   output: Output of the most recent control iteration.
+#   iterations: Number of control iterations run.
+Telemetry = collections.namedtuple(
+    'Telemetry', ['heartbeat_ns', 'input', 'output', 'iterations'])
+
+
+def _layout(buffer, lock):
+    """Gets the control and telemetry structs in a shared buffer.
+
+    The structs take a lock shared by both processes because the Raspberry Pi
+    is weakly ordered, where the seqlock alone can let a torn copy through.
+    """
+    control = shared_struct.SeqlockStruct(buffer, 0, _CONTROL_FORMAT, lock)
+    telemetry = shared_struct.SeqlockStruct(buffer, control.size,
+                                            _TELEMETRY_FORMAT, lock)
+    return control, telemetry
+
+
+def _run_controller(name, lock, factory, period_s):
+    """Control loop run in the child process."""
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        control, telemetry = _layout(memory.buf, lock)
+        controller = factory()
+        clock = clock_lib.SYSTEM_CLOCK
+        iterations = 0
+        current = output = float('nan')
+        next_time = clock.time()
+        while True:
+            set_point, enabled, stop = control.read()
+            if stop:
+                break
+            if enabled:
+                controller.set_desired_value(set_point)
+                output = controller.step()
+                current = controller.current_value
+                iterations += 1
+            telemetry.write(clock_lib.monotonic_ns(), current, output,
+                            iterations)
+            next_time += period_s
+            delay = next_time - clock.time()
+            if delay > 0:
+                clock.sleep(delay)
+            else:
+                next_time = clock.time()
+    finally:
+        control = telemetry = None
+        memory.close()
+
+
+class ProcessController(object):
+    """Runs a controller loop in a dedicated child process.
+
+    The controller is built in the child by a factory so its hardware is only
+    opened there. Set points and the enable flag are sent to the child, and
+    telemetry is read back, through a multiprocessing shared memory block
+    protected by seqlocks and a shared lock instead of pickled queues.
+
+    The factory must be picklable and return an object with a step() method,
+    a set_desired_value(value) method and a current_value property, like
+    PIDController.Worker or TemperatureController.
+
+    Attributes:
+      _factory: Function. Builds the controller in the child process.
+      _period_s: Float. Minimum time between control iterations.
+      _heartbeat_timeout_s: Float. Heartbeat age after which the child is
+        considered hung.
+      _memory: SharedMemory. The block shared with the child.
+      _control: SeqlockStruct. Set point and flags written by the parent.
+      _telemetry: SeqlockStruct. Telemetry written by the child.
+      _process: Process. The child process.
+      _set_point: Float. The current set point.
+      _enabled: Boolean. Whether the child is running its control loop.
+      _stopping: Boolean. Whether stop has been requested.
+      _lock: Lock. Serializes control writes from parent threads.
+    """
+
+    def __init__(self, factory, period_s=0.1, heartbeat_timeout_s=5.0):
+        """Creates a ProcessController.
+
+        Args:
+          factory: Function. Picklable function returning the controller.
+          period_s: Float. Minimum time between control iterations.
+            (default=0.1)
+          heartbeat_timeout_s: Float. Heartbeat age after which has_crashed
+            reports a hung child. (default=5.0)
+        """
+        self._factory = factory
+        self._period_s = period_s
+        self._heartbeat_timeout_s = heartbeat_timeout_s
+        self._memory = None
+        self._control = None
+        self._telemetry = None
+        self._process = None
+        self._set_point = 0.0
+        self._enabled = False
+        self._stopping = False
+        self._lock = threading.Lock()
+
+    def _write_control(self):
+        with self._lock:
+            self._control.write(self._set_point, self._enabled,
+                                self._stopping)
+
+    def start(self):
+        """Starts the controller process.
+
+        Raises:
+          RuntimeError: Thrown if the process has already been started.
+        """
+        if self._process is not None:
+            raise RuntimeError('Controller process has already been started.')
+        size = (shared_struct.SeqlockStruct.calcsize(_CONTROL_FORMAT) +
+                shared_struct.SeqlockStruct.calcsize(_TELEMETRY_FORMAT))
+        self._memory = shared_memory.SharedMemory(create=True, size=size)
+        lock = multiprocessing.Lock()
+        self._control, self._telemetry = _layout(self._memory.buf, lock)
+        self._telemetry.write(clock_lib.monotonic_ns(), float('nan'),
+                              float('nan'), 0)
+        self._stopping = False
+        self._write_control()
+        self._process = multiprocessing.Process(
+            target=_run_controller,
+            args=(self._memory.name, lock, self._factory, self._period_s))
+        self._process.daemon = True
+        self._process.start()
+
+    def stop(self, timeout_s=5.0):
+        """Stops the controller process and frees the shared memory.
+
+        The child is asked to exit and is terminated if it hasn't after
+        timeout_s.
+
+        Args:
+          timeout_s: Float. Time to wait for the child to exit. (default=5.0)
+        """
+        if self._process is None:
+            return
+        self._stopping = True
+        self._write_control()
+        self._process.join(timeout_s)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._control = self._telemetry = None
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+        self._process = None
+
+    def enable(self):
+        """Starts running the control loop in the child.
+
+        Before start, the control loop runs as soon as the child starts.
+        """
+        self._enabled = True
+        if self._process is not None:
+            self._write_control()
+
+    def disable(self):
+        """Pauses the control loop in the child. Outputs keep their values."""
+        self._enabled = False
+        if self._process is not None:
+            self._write_control()
+
+    @property
+    def is_enabled(self):
+        """Checks whether the control loop is enabled."""
+        return self._enabled
+
+    def set_desired_value(self, value):
+        """Sets the value the controller tries to achieve.
+
+        Args:
+          value: Float. The new set point.
+        """
+        self._set_point = value
+        if self._process is not None:
+            self._write_control()
+
+    @property
+    def desired_value(self):
+        """Gets the current set point."""
+        return self._set_point
+
+    @property
+    def telemetry(self):
+        """Gets the latest telemetry from the child.
+
+        Returns:
+          Telemetry. The latest telemetry, or None if not started.
+        """
+        if self._telemetry is None:
+            return None
+        return Telemetry(*self._telemetry.read())
+
+    @property
+    def is_alive(self):
+        """Checks whether the child process is running."""
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def has_crashed(self):
+        """Checks whether the child died or stopped responding.
+
+        Returns:
+          True if the child exited without being stopped, or its heartbeat is
+          older than the heartbeat timeout.
+        """
+        if self._process is None or self._stopping:
+            return False
+        if not self._process.is_alive():
+            return True
+        age_s = (clock_lib.monotonic_ns() - self.telemetry.heartbeat_ns) / \
+            _NS_PER_S
+        return age_s > self._heartbeat_timeout_s
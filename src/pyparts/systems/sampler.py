@@ -0,0 +1,196 @@
+import collections
+import heapq
+import itertools
+import threading
+
+from pyparts.logic import clock as clock_lib
+
+# The latest reading of a sampled source.
+#   value: The value returned by the source, or None before the first read.
+#   timestamp: Time the value was read, or None before the first read.
+#   errors: Number of reads of the source that raised an exception.
+Sample = collections.namedtuple('Sample', ['value', 'timestamp', 'errors'])
+
+_EMPTY_SAMPLE = Sample(None, None, 0)
+
+
+class StaleReadingError(Exception):
+    """Error type for readings older than their maximum age."""
+    pass
+
+
+class _Source(object):
+    """A registered source and its latest sample."""
+
+    def __init__(self, name, read_func, period_s, max_age_s):
+        self.name = name
+        self.read_func = read_func
+        self.period_s = period_s
+        self.max_age_s = max_age_s
+        self.sample = _EMPTY_SAMPLE
+        self.removed = False
+
+
+class Sampler(threading.Thread):
+    """Polls many sources at their own rates from a single thread.
+
+    Sources are kept in a heap ordered by their next deadline. The thread
+    sleeps until the earliest deadline, reads that source and reschedules it
+    one period later. The latest value of each source is stored as an
+    immutable Sample, so readers get it in O(1) without locks and without
+    waiting on the source's bus.
+
+    Attributes:
+      _clock: Clock. Provides the time and sleeps between reads.
+      _sources: Dict. Source name to _Source.
+      _heap: List. (deadline, sequence, _Source) entries.
+      _sequence: Iterator. Breaks ties between equal deadlines.
+      _condition: Condition. Protects the heap and wakes the thread.
+      _stopping: Boolean. Set to true to stop sampling.
+    """
+
+    def __init__(self, clock=None):
+        """Creates a Sampler.
+
+        Args:
+          clock: Clock. Provides the time and sleeps between reads.
+            (default=SYSTEM_CLOCK)
+        """
+        super(Sampler, self).__init__()
+        self.daemon = True
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        self._sources = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopping = False
+
+    def register(self, name, read_func, period_s, max_age_s=None):
+        """Starts sampling a source.
+
+        Args:
+          name: String. Name used to look up the source's readings.
+          read_func: Function. Returns a new reading, like
+            lambda: sensor.temp_c.
+          period_s: Float. Time between reads.
+          max_age_s: Float. Age after which a reading is stale.
+            (default=None, three periods)
+
+        Raises:
+          ValueError: Thrown if the name is already registered or the period is
+            not positive.
+        """
+        if period_s <= 0:
+            raise ValueError('Period must be greater than 0. Got %s'
+                             % str(period_s))
+        if max_age_s is None:
+            max_age_s = 3 * period_s
+        with self._condition:
+            if name in self._sources:
+                raise ValueError('Source %s is already registered.' % name)
+            source = _Source(name, read_func, period_s, max_age_s)
+            self._sources[name] = source
+            heapq.heappush(self._heap, (self._clock.time(),
+                                        next(self._sequence), source))
+            self._condition.notify()
+
+    def unregister(self, name):
+        """Stops sampling a source.
+
+        Args:
+          name: String. The source's name.
+        """
+        with self._condition:
+            self._sources.pop(name).removed = True
+
+    def latest(self, name):
+        """Gets the latest sample of a source.
+
+        Args:
+          name: String. The source's name.
+
+        Returns:
+          Sample. The latest value, its timestamp and the error count.
+        """
+        return self._sources[name].sample
+
+    def is_stale(self, name):
+        """Checks if a source's latest reading is older than its maximum age.
+
+        Args:
+          name: String. The source's name.
+
+        Returns:
+          True if the source has no reading or it is too old.
+        """
+        source = self._sources[name]
+        timestamp = source.sample.timestamp
+        return (timestamp is None or
+                self._clock.time() - timestamp > source.max_age_s)
+
+    def value(self, name):
+        """Gets the latest value of a source, checking it is fresh.
+
+        Args:
+          name: String. The source's name.
+
+        Returns:
+          The latest value.
+
+        Raises:
+          StaleReadingError: Thrown if the reading is missing or too old.
+        """
+        source = self._sources[name]
+        sample = source.sample
+        if sample.timestamp is None:
+            raise StaleReadingError('%s has not been read yet.' % name)
+        age_s = self._clock.time() - sample.timestamp
+        if age_s > source.max_age_s:
+            raise StaleReadingError('%s reading is %.3f s old.' % (name, age_s))
+        return sample.value
+
+    def stop(self):
+        """Stops sampling."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+
+    def _read(self, source):
+        sample = source.sample
+        try:
+            value = source.read_func()
+        except Exception:
+            source.sample = Sample(sample.value, sample.timestamp,
+                                   sample.errors + 1)
+        else:
+            source.sample = Sample(value, self._clock.time(), sample.errors)
+
+    def run(self):
+        """Loop for reading each source when its deadline arrives."""
+        clock = self._clock
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                deadline, _, source = self._heap[0]
+                if source.removed:
+                    heapq.heappop(self._heap)
+                    continue
+                delay = deadline - clock.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            self._read(source)
+            deadline += source.period_s
+            now = clock.time()
+            if deadline < now:
+                # Skip missed reads instead of reading back to back.
+                deadline = now
+            with self._condition:
+                if not source.removed:
+                    heapq.heappush(self._heap, (deadline,
+                                                next(self._sequence), source))
@@ -0,0 +1,307 @@
+import mmap
+import os
+import struct
+import threading
+
+from pyparts.logic import clock as clock_lib
+from pyparts.logic import shared_struct
+
+# File header: magic, version, number of channels, history, max width.
+_HEADER = struct.Struct('<4sHHII')
+_MAGIC = b'PYTB'
+_VERSION = 2
+
+# Channel table entry: name, width.
+_CHANNEL = struct.Struct('<32sH6x')
+# Number of records published on a channel, stored after its table entry.
+_HEAD = struct.Struct('<Q')
+
+_MAX_NAME_LENGTH = 32
+
+
+def _slot_format(max_width):
+    """Gets the struct format of a record.
+
+    A record holds its record number on the channel, the timestamp, then the
+    values. Readers use the record number to spot slots that were overwritten
+    while they read.
+    """
+    return '<Qd%dd' % max_width
+
+
+class TelemetryBusError(Exception):
+    """Error type for malformed telemetry bus files."""
+    pass
+
+
+class TelemetryPublisher(object):
+    """Publishes part readings into a memory mapped ring buffer.
+
+    Each channel has a fixed number of history slots. A record is a timestamp
+    followed by up to max_width values and is written with seqlock versioning,
+    so any number of reader processes can take consistent snapshots without
+    locks, syscalls, or touching the hardware.
+
+    The file is built under a temporary name and moved into place, so a
+    restarted publisher never truncates a file that readers still have
+    mapped. Those readers keep the old file until they reopen the path.
+
+    Attributes:
+      _file: File. The memory mapped file.
+      _map: mmap. The shared mapping.
+      _history: Integer. Number of records kept per channel.
+      _max_width: Integer. Maximum number of values in a record.
+      _indexes: Dict. Channel name to channel index.
+      _widths: List. Number of values published on each channel.
+      _heads: List. Number of records published on each channel.
+      _head_offsets: List. Offset of each channel's head counter.
+      _slots: List of lists of SeqlockStruct. Each channel's history slots.
+      _padding: Tuple. Zeros used to pad records to max_width values.
+    """
+
+    def __init__(self, path, channels, history=256):
+        """Creates a TelemetryPublisher.
+
+        Args:
+          path: String. Path of the file to create, ideally on a tmpfs like
+            /dev/shm.
+          channels: List of (name, width) tuples. The channels to publish and
+            how many values each record holds.
+          history: Integer. Number of records kept per channel. (default=256)
+
+        Raises:
+          ValueError: Thrown if a channel name is too long or repeated.
+        """
+        self._history = history
+        self._max_width = max([width for _, width in channels] or [1])
+        self._indexes = {}
+        self._widths = []
+        for name, width in channels:
+            if len(name.encode('utf-8')) > _MAX_NAME_LENGTH:
+                raise ValueError('Channel names must be at most %d bytes. '
+                                 'Got %s' % (_MAX_NAME_LENGTH, name))
+            if name in self._indexes:
+                raise ValueError('Channel %s is repeated.' % name)
+            self._indexes[name] = len(self._widths)
+            self._widths.append(width)
+        slot_format = _slot_format(self._max_width)
+        slot_size = shared_struct.SeqlockStruct.calcsize(slot_format)
+        table_size = len(channels) * (_CHANNEL.size + _HEAD.size)
+        size = _HEADER.size + table_size + len(channels) * history * slot_size
+
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+        self._file = open(temp_path, 'w+b')
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, len(channels),
+                          history, self._max_width)
+        self._heads = [0] * len(channels)
+        self._head_offsets = []
+        self._slots = []
+        offset = _HEADER.size
+        for name, width in channels:
+            _CHANNEL.pack_into(self._map, offset, name.encode('utf-8'), width)
+            self._head_offsets.append(offset + _CHANNEL.size)
+            offset += _CHANNEL.size + _HEAD.size
+        for _ in channels:
+            slots = []
+            for _ in range(history):
+                slots.append(shared_struct.SeqlockStruct(self._map, offset,
+                                                         slot_format))
+                offset += slot_size
+            self._slots.append(slots)
+        self._padding = (0.0,) * self._max_width
+        os.replace(temp_path, path)
+
+    def publish(self, name, *values):
+        """Publishes a record.
+
+        Args:
+          name: String. The channel to publish on.
+          *values: Floats. The values to publish. Missing values are zero.
+
+        Raises:
+          ValueError: Thrown if there are more values than the channel's
+            width.
+        """
+        index = self._indexes[name]
+        if len(values) > self._widths[index]:
+            raise ValueError('Channel %s holds %d values. Got %d'
+                             % (name, self._widths[index], len(values)))
+        head = self._heads[index]
+        values = (values + self._padding)[:self._max_width]
+        self._slots[index][head % self._history].write(
+            head, clock_lib.SYSTEM_CLOCK.time(), *values)
+        head += 1
+        self._heads[index] = head
+        _HEAD.pack_into(self._map, self._head_offsets[index], head)
+
+    def close(self):
+        """Unmaps and closes the file."""
+        self._slots = []
+        self._map.close()
+        self._file.close()
+
+    class Worker(threading.Thread):
+        """Polls parts and publishes their readings at a fixed rate.
+
+        Attributes:
+          _publisher: TelemetryPublisher. The publisher to publish with.
+          _sources: Dict. Channel name to a function returning a value or a
+            tuple of values, like lambda: sensor.temp_c or lambda: led.rgb.
+          _period_s: Float. Time between polls.
+          _stopping: Boolean. Set to true to stop polling.
+        """
+
+        def __init__(self, publisher, sources, period_s=0.1):
+            """Creates a TelemetryPublisher.Worker.
+
+            Args:
+              publisher: TelemetryPublisher. The publisher to publish with.
+              sources: Dict. Channel name to a function returning the reading.
+              period_s: Float. Time between polls. (default=0.1)
+            """
+            super(TelemetryPublisher.Worker, self).__init__()
+            self.daemon = True
+            self._publisher = publisher
+            self._sources = sources
+            self._period_s = period_s
+            self._stopping = False
+
+        def stop(self):
+            """Stops polling."""
+            self._stopping = True
+
+        def run(self):
+            """Loop for polling the sources and publishing their readings."""
+            clock = clock_lib.SYSTEM_CLOCK
+            next_time = clock.time()
+            while not self._stopping:
+                for name, source in self._sources.items():
+                    value = source()
+                    if isinstance(value, tuple):
+                        self._publisher.publish(name, *value)
+                    else:
+                        self._publisher.publish(name, value)
+                next_time += self._period_s
+                delay = next_time - clock.time()
+                if delay > 0:
+                    clock.sleep(delay)
+                else:
+                    next_time = clock.time()
+
+
+class TelemetryReader(object):
+    """Reads consistent snapshots from a TelemetryPublisher's file.
+
+    Attributes:
+      _file: File. The memory mapped file.
+      _map: mmap. The read only shared mapping.
+      _history: Integer. Number of records kept per channel.
+      _indexes: Dict. Channel name to channel index.
+      _widths: List. Number of values published on each channel.
+      _head_offsets: List. Offset of each channel's head counter.
+      _slots: List of lists of SeqlockStruct. Each channel's history slots.
+    """
+
+    def __init__(self, path):
+        """Creates a TelemetryReader.
+
+        Args:
+          path: String. Path of a file created by a TelemetryPublisher.
+
+        Raises:
+          TelemetryBusError: Thrown if the file is not a telemetry bus.
+        """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_channels, history, max_width = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise TelemetryBusError('%s is not a version %d telemetry bus.'
+                                    % (path, _VERSION))
+        self._history = history
+        self._indexes = {}
+        self._widths = []
+        self._head_offsets = []
+        offset = _HEADER.size
+        for index in range(num_channels):
+            name, width = _CHANNEL.unpack_from(self._map, offset)
+            self._indexes[name.rstrip(b'\0').decode('utf-8')] = index
+            self._widths.append(width)
+            self._head_offsets.append(offset + _CHANNEL.size)
+            offset += _CHANNEL.size + _HEAD.size
+        slot_format = _slot_format(max_width)
+        slot_size = shared_struct.SeqlockStruct.calcsize(slot_format)
+        self._slots = []
+        for _ in range(num_channels):
+            self._slots.append([
+                shared_struct.SeqlockStruct(self._map, offset + i * slot_size,
+                                            slot_format)
+                for i in range(history)])
+            offset += history * slot_size
+
+    @property
+    def channels(self):
+        """Gets the names of the published channels."""
+        return sorted(self._indexes, key=self._indexes.get)
+
+    def _head(self, index):
+        return _HEAD.unpack_from(self._map, self._head_offsets[index])[0]
+
+    def _record(self, index, number):
+        """Reads a record, or None if its slot now holds a different record."""
+        values = self._slots[index][number % self._history].read()
+        if values[0] != number:
+            return None
+        return values[1], values[2:2 + self._widths[index]]
+
+    def latest(self, name):
+        """Gets the most recent record on a channel.
+
+        Args:
+          name: String. The channel name.
+
+        Returns:
+          Tuple of (timestamp, values), or None if nothing has been published.
+        """
+        index = self._indexes[name]
+        while True:
+            head = self._head(index)
+            if not head:
+                return None
+            record = self._record(index, head - 1)
+            if record is not None:
+                return record
+
+    def history(self, name, count=None):
+        """Gets the most recent records on a channel, oldest first.
+
+        Records the publisher overwrites while they are being read are left
+        out, so the result never mixes records from different laps of the
+        ring.
+
+        Args:
+          name: String. The channel name.
+          count: Integer. Maximum number of records. (default=all kept)
+
+        Returns:
+          List of (timestamp, values) tuples.
+        """
+        index = self._indexes[name]
+        head = self._head(index)
+        available = min(head, self._history)
+        if count is not None:
+            available = min(available, count)
+        records = []
+        for number in range(head - available, head):
+            record = self._record(index, number)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def close(self):
+        """Unmaps and closes the file."""
+        self._slots = []
+        self._map.close()
+        self._file.close()
@@ -1,5 +1,4 @@
-import time
-
+from pyparts.logic import clock as clock_lib
 from pyparts.logic import pid_controller
 
 
@@ -18,12 +17,13 @@ class TemperatureController(object):
       _heater_pin: PwmOutput. A PWM output that controls a heating element.
       _pid_worker: PIDController.Worker. Worker thread for maintaining a
         temperature.
+      _clock: Clock. The clock used for timing the control loop.
     """
 
     # Error value at which PWM output will be set to 100%
     MAX_ERROR_DEGREES_C = 10.0
 
-    def __init__(self, temp_sensor, heater_pin, kp, ki, kd):
+    def __init__(self, temp_sensor, heater_pin, kp, ki, kd, clock=None):
         """Creates a TemperatureController.
 
         Args:
@@ -32,11 +32,17 @@ class TemperatureController(object):
           kp: Integer. PID controller constant term.
           ki: Integer. PID controller integrator term.
           kd: Integer. PID controller differentiator term.
+          clock: Clock. Clock used for timing the control loop. Inject a
+            VirtualClock to run the controller in simulation.
+            (default=SYSTEM_CLOCK)
         """
         self._temp_sensor = temp_sensor
         self._heater_pin = heater_pin
+        self._clock = clock or clock_lib.SYSTEM_CLOCK
+        # Worker takes its gains in (kp, kd, ki) order, so pass them by name.
         self._pid_worker = pid_controller.PIDController.Worker(
-            kp, ki, kd, self._pid_input_func, self._pid_output_func)
+            kp=kp, ki=ki, kd=kd, input_func=self._pid_input_func,
+            output_func=self._pid_output_func, clock=self._clock)
         self._is_enabled = False
 
     def _pid_input_func(self):
@@ -58,7 +64,7 @@ class TemperatureController(object):
             return
         self._heater_pin.set_duty_cycle(
             (float(val) / self.MAX_ERROR_DEGREES_C) * 100)
-        time.sleep(1)
+        self._clock.sleep(1)
 
     def set_temp_c(self, temp_c):
         """Set the desired temerature value.
@@ -66,13 +72,40 @@ class TemperatureController(object):
         Args:
           temp_c: Integer. The temperature to target with the controller.
         """
-        self._pid_worker.desired_value = temp_c
+        self._pid_worker.set_desired_value(temp_c)
+
+    def set_desired_value(self, value):
+        """Set the desired temperature value.
+
+        Same as set_temp_c, so the controller can be driven like a
+        PIDController.Worker.
+
+        Args:
+          value: Integer. The temperature to target with the controller.
+        """
+        self.set_temp_c(value)
 
     @property
     def temp_setting(self):
         """Get the current temperature set point."""
         return self._pid_worker.desired_value
 
+    @property
+    def current_value(self):
+        """Get the temperature read by the most recent control iteration."""
+        return self._pid_worker.current_value
+
+    def step(self):
+        """Runs a single control iteration in the calling thread.
+
+        Useful for driving the controller from a simulation instead of the
+        background worker.
+
+        Returns:
+          Float. The output of the PID controller.
+        """
+        return self._pid_worker.step()
+
     def enable(self):
         """Enable the temperature sensor and begin controlling the temperature."""
         if not self._is_enabled:
@@ -0,0 +1,337 @@
+import array
+import collections
+import math
+import multiprocessing
+import random
+
+from pyparts.logic import clock as clock_lib
+from pyparts.parts.sensor.temperature import base_temperature_sensor
+from pyparts.platforms.pwm import base_pwm
+from pyparts.systems import temperature_controller
+
+# Result of a single simulation run.
+#   kp, ki, kd: The gains that were simulated.
+#   iae: Integral of the absolute error in degree seconds.
+#   max_overshoot_c: Largest temperature above the set point.
+#   final_error_c: Set point minus the temperature at the end of the run.
+#   times, temps_c, duty_cycles: Per control iteration traces.
+SimulationResult = collections.namedtuple(
+    'SimulationResult', ['kp', 'ki', 'kd', 'iae', 'max_overshoot_c',
+                         'final_error_c', 'times', 'temps_c', 'duty_cycles'])
+
+
+class ThermalPlant(object):
+    """A first-order-plus-dead-time model of a heater and thermocouple.
+
+    The plant temperature T responds to the heater power u (0.0 to 1.0) as:
+
+      tau * dT/dt = ambient + gain * u(t - dead_time) - T
+
+    The model is integrated lazily and exactly between input changes, so it
+    costs nothing while the controller sleeps.
+
+    Attributes:
+      _gain_c: Float. Steady state temperature rise at full heater power.
+      _time_constant_s: Float. The first order time constant.
+      _dead_time_s: Float. Delay between heater changes and their effect.
+      _ambient_c: Float. Temperature the plant cools to with no power.
+      _temp_c: Float. Current plant temperature.
+      _time: Float. Time the plant temperature was last computed for.
+      _power: Float. Heater power currently affecting the plant.
+      _pending: Deque. (time, power) heater changes still in the dead time.
+    """
+
+    def __init__(self, gain_c=200.0, time_constant_s=300.0, dead_time_s=10.0,
+                 ambient_c=20.0, initial_c=None, start_time=0.0):
+        """Creates a ThermalPlant.
+
+        Args:
+          gain_c: Float. Steady state rise in C at 100% power. (default=200.0)
+          time_constant_s: Float. First order time constant. (default=300.0)
+          dead_time_s: Float. Transport delay in seconds. (default=10.0)
+          ambient_c: Float. Ambient temperature in C. (default=20.0)
+          initial_c: Float. Starting temperature. (default=ambient_c)
+          start_time: Float. Clock time the plant starts at. (default=0.0)
+
+        Raises:
+          ValueError: Thrown if the time constant is not positive or the dead
+            time is negative.
+        """
+        if time_constant_s <= 0:
+            raise ValueError('Time constant must be greater than 0. Got %g'
+                             % time_constant_s)
+        if dead_time_s < 0:
+            raise ValueError('Dead time must not be negative. Got %g'
+                             % dead_time_s)
+        self._gain_c = gain_c
+        self._time_constant_s = time_constant_s
+        self._dead_time_s = dead_time_s
+        self._ambient_c = ambient_c
+        self._temp_c = ambient_c if initial_c is None else initial_c
+        self._time = start_time
+        self._power = 0.0
+        self._pending = collections.deque()
+
+    def _integrate(self, until):
+        """Moves the plant temperature forward with constant power."""
+        dt = until - self._time
+        if dt <= 0:
+            return
+        steady_state = self._ambient_c + self._gain_c * self._power
+        decay = math.exp(-dt / self._time_constant_s)
+        self._temp_c = steady_state + (self._temp_c - steady_state) * decay
+        self._time = until
+
+    def advance(self, now):
+        """Computes the plant state up to a point in time.
+
+        Args:
+          now: Float. The time to advance the plant to.
+        """
+        while self._pending and self._pending[0][0] + self._dead_time_s <= now:
+            change_time, power = self._pending.popleft()
+            self._integrate(change_time + self._dead_time_s)
+            self._power = power
+        self._integrate(now)
+
+    def set_power(self, now, power):
+        """Changes the heater power.
+
+        Args:
+          now: Float. The time the change happens at.
+          power: Float from 0.0 to 1.0. The new heater power.
+        """
+        self.advance(now)
+        self._pending.append((now, power))
+
+    def temp_c(self, now):
+        """Gets the plant temperature.
+
+        Args:
+          now: Float. The time to get the temperature at.
+
+        Returns:
+          Float. The plant temperature in C.
+        """
+        self.advance(now)
+        return self._temp_c
+
+
+class SimulatedHeater(base_pwm.BasePWM):
+    """A PWM output that drives the heater of a ThermalPlant.
+
+    Attributes:
+      _plant: ThermalPlant. The plant being heated.
+      _clock: Clock. The clock used to timestamp duty cycle changes.
+    """
+
+    def __init__(self, plant, clock):
+        """Creates a SimulatedHeater.
+
+        Args:
+          plant: ThermalPlant. The plant to heat.
+          clock: Clock. The clock shared with the controller.
+        """
+        super(SimulatedHeater, self).__init__(None)
+        self._plant = plant
+        self._clock = clock
+
+    def _update_plant(self, duty_cycle, enabled):
+        power = duty_cycle / 100.0 if enabled else 0.0
+        self._plant.set_power(self._clock.time(), power)
+
+    def _enable(self):
+        """Turns the heater on at the current duty cycle."""
+        self._update_plant(self._duty_cycle, True)
+
+    def _disable(self):
+        """Turns the heater off."""
+        self._update_plant(self._duty_cycle, False)
+
+    def _set_duty_cycle(self, duty_cycle):
+        """Changes the heater power.
+
+        Args:
+          duty_cycle: Float from 0.0 to 100.0. The heater duty cycle.
+        """
+        self._update_plant(duty_cycle, self._enabled)
+
+    def _set_frequency_hz(self, frequency_hz):
+        """Frequency has no effect on the thermal model."""
+        pass
+
+    @property
+    def pin_number(self):
+        """Simulated heaters are not attached to a pin.
+
+        Returns:
+          None.
+        """
+        return None
+
+
+class SimulatedTemperatureSensor(
+        base_temperature_sensor.BaseTemperatureSensor):
+    """A thermocouple reading the temperature of a ThermalPlant.
+
+    Attributes:
+      _plant: ThermalPlant. The plant being measured.
+      _clock: Clock. The clock used to sample the plant.
+      _resolution_c: Float. Reading quantization step.
+      _noise_c: Float. Standard deviation of gaussian noise added to readings.
+      _random: Random. Seeded noise source so runs are reproducible.
+    """
+
+    def __init__(self, plant, clock, resolution_c=0.25, noise_c=0.0, seed=0):
+        """Creates a SimulatedTemperatureSensor.
+
+        Args:
+          plant: ThermalPlant. The plant to measure.
+          clock: Clock. The clock shared with the controller.
+          resolution_c: Float. Quantization step. The MAX31855 uses 0.25C.
+            Use 0 to disable quantization. (default=0.25)
+          noise_c: Float. Gaussian noise standard deviation. (default=0.0)
+          seed: Integer. Seed for the noise source. (default=0)
+        """
+        super(SimulatedTemperatureSensor, self).__init__()
+        self._plant = plant
+        self._clock = clock
+        self._resolution_c = resolution_c
+        self._noise_c = noise_c
+        self._random = random.Random(seed)
+
+    def _get_temp_c(self):
+        temp = self._plant.temp_c(self._clock.time())
+        if self._noise_c:
+            temp += self._random.gauss(0.0, self._noise_c)
+        if self._resolution_c:
+            temp = round(temp / self._resolution_c) * self._resolution_c
+        return temp
+
+
+class ThermalSimulation(object):
+    """Runs a TemperatureController against a simulated oven.
+
+    ThermalSimulation wires a TemperatureController to a ThermalPlant through a
+    simulated heater and thermocouple that share a VirtualClock. The control
+    loop is stepped from the calling thread so hours of controller time run in
+    seconds.
+
+    Attributes:
+      _clock: VirtualClock. Clock shared by every simulated component.
+      _plant: ThermalPlant. The simulated oven.
+      _heater: SimulatedHeater. Heater driven by the controller.
+      _sensor: SimulatedTemperatureSensor. Sensor read by the controller.
+      _controller: TemperatureController. The controller under test.
+      _period_s: Float. Minimum time between control iterations.
+    """
+
+    def __init__(self, kp, ki, kd, set_point_c, plant=None, period_s=1.0,
+                 resolution_c=0.25, noise_c=0.0, seed=0):
+        """Creates a ThermalSimulation.
+
+        Args:
+          kp: Float. PID controller constant term.
+          ki: Float. PID controller integrator term.
+          kd: Float. PID controller differentiator term.
+          set_point_c: Float. The temperature to control to.
+          plant: ThermalPlant. The plant to control. (default=ThermalPlant())
+          period_s: Float. Minimum time between control iterations. Matches the
+            controller's own one second sleep by default. (default=1.0)
+          resolution_c: Float. Sensor quantization step. (default=0.25)
+          noise_c: Float. Sensor noise standard deviation. (default=0.0)
+          seed: Integer. Seed for the sensor noise. (default=0)
+        """
+        self._clock = clock_lib.VirtualClock()
+        self._plant = plant or ThermalPlant()
+        self._heater = SimulatedHeater(self._plant, self._clock)
+        self._sensor = SimulatedTemperatureSensor(
+            self._plant, self._clock, resolution_c, noise_c, seed)
+        self._controller = temperature_controller.TemperatureController(
+            self._sensor, self._heater, kp, ki, kd, clock=self._clock)
+        self._controller.set_temp_c(set_point_c)
+        self._heater.enable()
+        self._period_s = period_s
+        self._gains = (kp, ki, kd)
+
+    @property
+    def clock(self):
+        """Gets the virtual clock used by the simulation."""
+        return self._clock
+
+    @property
+    def controller(self):
+        """Gets the TemperatureController under test."""
+        return self._controller
+
+    def run(self, duration_s):
+        """Runs the control loop for a span of simulated time.
+
+        Args:
+          duration_s: Float. Simulated seconds to run for.
+
+        Returns:
+          SimulationResult. Performance metrics and traces for the run.
+        """
+        set_point = self._controller.temp_setting
+        end_time = self._clock.time() + duration_s
+        times = array.array('d')
+        temps = array.array('d')
+        duty_cycles = array.array('d')
+        iae = 0.0
+        max_overshoot = 0.0
+        temp = self._sensor.temp_c
+        while self._clock.time() < end_time:
+            start = self._clock.time()
+            self._controller.step()
+            elapsed = self._clock.time() - start
+            if elapsed < self._period_s:
+                self._clock.advance(self._period_s - elapsed)
+            now = self._clock.time()
+            temp = self._plant.temp_c(now)
+            iae += abs(set_point - temp) * (now - start)
+            max_overshoot = max(max_overshoot, temp - set_point)
+            times.append(now)
+            temps.append(temp)
+            duty_cycles.append(self._heater.duty_cycle)
+        kp, ki, kd = self._gains
+        return SimulationResult(kp, ki, kd, iae, max_overshoot,
+                                set_point - temp, times, temps, duty_cycles)
+
+
+def _simulate_gain_set(args):
+    """Process pool entry point for sweep_gains."""
+    gains, set_point_c, duration_s, plant_params, period_s = args
+    kp, ki, kd = gains
+    simulation = ThermalSimulation(kp, ki, kd, set_point_c,
+                                   plant=ThermalPlant(**plant_params),
+                                   period_s=period_s)
+    return simulation.run(duration_s)
+
+
+def sweep_gains(gain_sets, set_point_c, duration_s, plant_params=None,
+                period_s=1.0, processes=None):
+    """Simulates many sets of PID gains in parallel.
+
+    Args:
+      gain_sets: List of (kp, ki, kd) tuples to simulate.
+      set_point_c: Float. The temperature to control to.
+      duration_s: Float. Simulated seconds to run each gain set for.
+      plant_params: Dict. Keyword arguments for ThermalPlant. (default=None)
+      period_s: Float. Minimum time between control iterations. (default=1.0)
+      processes: Integer. Number of worker processes. Use 1 to run in the
+        calling process. (default=number of CPUs)
+
+    Returns:
+      List of SimulationResult in the same order as gain_sets.
+    """
+    jobs = [(tuple(gains), set_point_c, duration_s, plant_params or {},
+             period_s) for gains in gain_sets]
+    if processes == 1:
+        return [_simulate_gain_set(job) for job in jobs]
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_simulate_gain_set, jobs)
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from pyparts.logic import timer_wheel
+from pyparts.parts.switch import button
+from pyparts.platforms.gpio import base_gpio
+
+
+class FakeDigitalInput(base_gpio.BaseDigitalInput):
+    INTERRUPT_FALLING = 0
+    INTERRUPT_RISING = 1
+    INTERRUPT_BOTH = 2
+
+    def __init__(self):
+        super(FakeDigitalInput, self).__init__(1, self.INPUT, self.PUD_UP)
+        self.value = base_gpio.HIGH
+        self.callback = None
+
+    def _write(self, value):
+        pass
+
+    def _read(self):
+        return self.value
+
+    def add_interrupt(self, type, callback=None, debounce_time_ms=0):
+        self.callback = callback
+
+    def wait_for_edge(self, type):
+        pass
+
+    def remove_interrupt(self):
+        self.callback = None
+
+    def press(self, down_time):
+        self.value = base_gpio.LOW
+        self.callback(self._pin)
+        time.sleep(down_time)
+        self.value = base_gpio.HIGH
+        self.callback(self._pin)
+
+
+class TestTimerWheel:
+    def test_fires_and_cancels(self):
+        wheel = timer_wheel.TimerWheel(tick_s=0.001, num_slots=8)
+        wheel.start()
+        fired = threading.Event()
+        cancelled = []
+        wheel.schedule(0.02, fired.set)
+        timer = wheel.schedule(0.01, lambda: cancelled.append(True))
+        timer.cancel()
+        assert fired.wait(1)
+        assert not cancelled
+        assert not timer.is_armed
+        wheel.stop()
+        wheel.join(1)
+        assert not wheel.is_alive()
+
+
+class TestButton:
+    def setup_method(self):
+        self.wheel = timer_wheel.TimerWheel(tick_s=0.002)
+        self.wheel.start()
+        self.pin = FakeDigitalInput()
+        self.button = button.Button(self.pin, self.wheel)
+        self.events = []
+
+    def teardown_method(self):
+        self.wheel.stop()
+
+    def test_hold(self):
+        self.button.set_on_hold(lambda: self.events.append('hold'), 0.02)
+        self.button.set_on_press(lambda: self.events.append('press'), 0.01)
+        self.pin.press(0.06)
+        assert self.events == ['hold']
+
+    def test_press_then_double_press(self):
+        self.button.set_on_press(lambda: self.events.append('press'), 0.05)
+        self.button.set_on_double_press(
+            lambda: self.events.append('double'), 0.05, 0.05)
+        self.pin.press(0.005)
+        time.sleep(0.1)
+        assert self.events == ['press']
+        self.pin.press(0.005)
+        time.sleep(0.01)
+        self.pin.press(0.005)
+        time.sleep(0.1)
+        assert self.events == ['press', 'double']
@@ -0,0 +1,50 @@
+from pyparts.logic import checkpoint as checkpoint_lib
+from pyparts.logic import clock as clock_lib
+from pyparts.logic import pid_controller
+
+
+class TestCheckpoint(object):
+
+    def test_state_is_restored_after_restart(self, tmpdir):
+        path = str(tmpdir.join('pid.ckpt'))
+        clock = clock_lib.VirtualClock()
+        checkpoint = checkpoint_lib.Checkpoint(path, max_age_s=5.0,
+                                               clock=clock)
+        pid = pid_controller.PIDController(1, 1, 0, clock=clock,
+                                           checkpoint=checkpoint)
+        clock.advance(2.0)
+        pid.get_output(3.0)
+        checkpoint.close()
+
+        restarted = checkpoint_lib.Checkpoint(path, max_age_s=5.0,
+                                              clock=clock)
+        pid = pid_controller.PIDController(1, 1, 0, clock=clock,
+                                           checkpoint=restarted)
+        assert (pid._ci, pid._prev_error) == (6.0, 3.0)
+        restarted.close()
+
+    def test_stale_and_mismatched_state_is_ignored(self, tmpdir):
+        path = str(tmpdir.join('state.ckpt'))
+        clock = clock_lib.VirtualClock()
+        checkpoint = checkpoint_lib.Checkpoint(path, max_age_s=5.0,
+                                               clock=clock)
+        assert checkpoint.attach('<dd') is None
+        checkpoint.save(1.0, 2.0)
+        assert checkpoint.attach('<dd') == (1.0, 2.0)
+        clock.advance(6.0)
+        assert checkpoint.attach('<dd') is None
+        assert checkpoint.attach('<q') is None
+        checkpoint.close()
+
+    def test_saves_are_rate_limited(self, tmpdir):
+        clock = clock_lib.VirtualClock()
+        checkpoint = checkpoint_lib.Checkpoint(str(tmpdir.join('a.ckpt')),
+                                               period_s=0.5, clock=clock)
+        checkpoint.attach('<q')
+        assert checkpoint.save(1)
+        clock.advance(0.1)
+        assert not checkpoint.save(2)
+        clock.advance(0.4)
+        assert checkpoint.save(3)
+        assert checkpoint.attach('<q') == (3,)
+        checkpoint.close()
@@ -0,0 +1,92 @@
+import errno
+import os
+
+import pytest
+
+from pyparts.logic import clock as clock_lib
+from pyparts.systems import data_logger
+
+numpy = pytest.importorskip('numpy')
+
+from pyparts.systems import data_log_reader  # noqa: E402
+
+
+class TestDataLogger(object):
+
+    def test_records_rotate_and_read_back(self, tmpdir):
+        logger = data_logger.DataLogger(str(tmpdir), segment_records=4)
+        for i in range(10):
+            logger.log(i % 3, i * 0.5, flags=i & 1, timestamp=100.0 + i)
+        logger.close()
+
+        paths = data_logger.segment_paths(str(tmpdir))
+        assert len(paths) == 3
+        first = data_log_reader.read_segment(paths[0])
+        assert list(first.values) == [0.0, 0.5, 1.0, 1.5]
+        records = data_log_reader.read_log(str(tmpdir))
+        assert list(records.channels) == [i % 3 for i in range(10)]
+        assert list(records.flags) == [i & 1 for i in range(10)]
+        assert list(records.timestamps_ns) == [(100 + i) * 10 ** 9
+                                               for i in range(10)]
+
+    def test_delta_encoding_and_time_rotation(self, tmpdir):
+        clock = clock_lib.VirtualClock(1000.0)
+        logger = data_logger.DataLogger(str(tmpdir), segment_duration_s=1.0,
+                                        delta_encoding=True, clock=clock)
+        for _ in range(6):
+            logger.log(7, 25.0)
+            clock.advance(0.25)
+        logger.close()
+
+        paths = data_logger.segment_paths(str(tmpdir))
+        assert len(paths) == 2
+        records = data_log_reader.read_log(str(tmpdir))
+        expected = [int((1000.0 + i * 0.25) * 1e6) * 1000 for i in range(6)]
+        assert list(records.timestamps_ns) == expected
+        assert list(records.channels) == [7] * 6
+
+    def test_logging_continues_after_existing_segments(self, tmpdir):
+        logger = data_logger.DataLogger(str(tmpdir))
+        logger.log(0, 1.0)
+        logger.close()
+        logger = data_logger.DataLogger(str(tmpdir))
+        logger.log(0, 2.0)
+        logger.close()
+        assert list(data_log_reader.read_log(str(tmpdir)).values) == [1.0, 2.0]
+
+    def test_segments_are_preallocated(self, tmpdir, monkeypatch):
+        sizes = []
+
+        def posix_fallocate(fd, offset, length):
+            sizes.append(length)
+            raise OSError(errno.EOPNOTSUPP, 'Operation not supported')
+
+        monkeypatch.setattr(os, 'posix_fallocate', posix_fallocate,
+                            raising=False)
+        logger = data_logger.DataLogger(str(tmpdir), segment_records=4)
+        logger.log(0, 1.0)
+        logger.close()
+        assert sizes
+        assert list(data_log_reader.read_log(str(tmpdir)).values) == [1.0]
+
+    def test_full_disk_fails_logging_instead_of_hanging(self, tmpdir,
+                                                         monkeypatch):
+        calls = []
+
+        def posix_fallocate(fd, offset, length):
+            calls.append(length)
+            if len(calls) > 1:
+                raise OSError(errno.ENOSPC, 'No space left on device')
+            os.ftruncate(fd, length)
+
+        monkeypatch.setattr(os, 'posix_fallocate', posix_fallocate,
+                            raising=False)
+        logger = data_logger.DataLogger(str(tmpdir), segment_records=2)
+        logger.log(0, 1.0)
+        logger.log(0, 2.0)
+        with pytest.raises(OSError) as error:
+            logger.log(0, 3.0)
+        assert error.value.errno == errno.ENOSPC
+        logger.close()
+        assert len(data_logger.segment_paths(str(tmpdir))) == 1
+        assert list(data_log_reader.read_log(str(tmpdir)).values) == [1.0, 2.0]
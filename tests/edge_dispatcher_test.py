@@ -0,0 +1,148 @@
+import pytest
+
+from tests import fake_rpi
+
+from pyparts.platforms import raspberrypi_platform
+from pyparts.platforms.gpio import base_gpio
+from pyparts.platforms.gpio import edge_dispatcher
+from pyparts.platforms.gpio import raspberrypi_gpio
+
+
+class TestEdgeDispatcher(object):
+
+    def test_callbacks_see_a_pins_edges_in_order(self):
+        dispatcher = edge_dispatcher.EdgeDispatcher(num_workers=2)
+        edges = []
+        dispatcher.register(3, lambda *edge: edges.append(edge))
+        dispatcher.start()
+        for i in range(100):
+            dispatcher.record(3, i % 2, timestamp_ns=i)
+        dispatcher.stop()
+        assert edges == [(3, i % 2 == 1, i) for i in range(100)]
+
+    def test_full_queue_drops_and_counts_edges(self):
+        dispatcher = edge_dispatcher.EdgeDispatcher(num_workers=1,
+                                                    queue_size=2)
+        edges = []
+        dispatcher.register(5, lambda pin, level, timestamp_ns:
+                            edges.append(timestamp_ns))
+        for i in range(4):
+            dispatcher.record(5, True, timestamp_ns=i)
+        assert dispatcher.dropped_count == 2
+        assert dispatcher.overflow_count == 1
+        assert dispatcher.max_depth == 2
+        dispatcher.start()
+        dispatcher.stop()
+        assert edges == [0, 1]
+
+    def test_failing_callbacks_are_counted(self):
+        dispatcher = edge_dispatcher.EdgeDispatcher(num_workers=1)
+        edges = []
+
+        def fail(pin, level, timestamp_ns):
+            raise ValueError('callback failed')
+
+        dispatcher.register(1, fail)
+        dispatcher.register(1, lambda pin, level, timestamp_ns:
+                            edges.append(pin))
+        dispatcher.start()
+        dispatcher.record(1, True)
+        dispatcher.record(1, False)
+        dispatcher.stop()
+        assert dispatcher.error_count == 2
+        assert edges == [1, 1]
+
+
+class TestRaspberryPiDigitalInput(object):
+
+    def setup_method(self, method):
+        fake_rpi.gpio.reset()
+
+    def test_interrupts_and_listeners_share_one_detection(self):
+        pin = raspberrypi_gpio.RaspberryPiDigitalInput(7)
+        interrupts = []
+        edges = []
+        pin.add_interrupt(pin.INTERRUPT_BOTH, interrupts.append)
+        pin.add_edge_listener(pin.INTERRUPT_BOTH,
+                              lambda pin, level, timestamp_ns:
+                              edges.append(level))
+        fake_rpi.gpio.fire(7, True)
+        fake_rpi.gpio.fire(7, False)
+        assert interrupts == [7, 7]
+        assert edges == [True, False]
+        detections = [call for call in fake_rpi.gpio.calls
+                      if call[0] == 'add_event_detect']
+        assert detections == [('add_event_detect', (7, fake_rpi.BOTH))]
+
+    def test_dispatched_interrupts_keep_the_callback_contract(self):
+        dispatcher = edge_dispatcher.EdgeDispatcher(num_workers=1)
+        pin = raspberrypi_gpio.RaspberryPiDigitalInput(7, dispatcher)
+        interrupts = []
+        edges = []
+        pin.add_interrupt(pin.INTERRUPT_BOTH, interrupts.append)
+        pin.add_edge_listener(pin.INTERRUPT_BOTH,
+                              lambda pin, level, timestamp_ns:
+                              edges.append(level))
+        fake_rpi.gpio.fire(7, True)
+        fake_rpi.gpio.fire(7, False)
+        dispatcher.start()
+        dispatcher.stop()
+        assert dispatcher.error_count == 0
+        assert interrupts == [7, 7]
+        assert edges == [True, False]
+
+    def test_removing_a_listener_keeps_interrupts(self):
+        pin = raspberrypi_gpio.RaspberryPiDigitalInput(7)
+        interrupts = []
+
+        def listener(pin, level, timestamp_ns):
+            pass
+
+        pin.add_interrupt(pin.INTERRUPT_BOTH, interrupts.append)
+        pin.add_edge_listener(pin.INTERRUPT_BOTH, listener)
+        pin.remove_edge_listener(listener)
+        fake_rpi.gpio.fire(7, True)
+        assert interrupts == [7]
+        pin.remove_interrupt()
+        assert 7 not in fake_rpi.gpio.edge_callbacks
+
+    def test_mixed_edge_types_widen_the_detection(self):
+        pin = raspberrypi_gpio.RaspberryPiDigitalInput(7)
+        rising = []
+        falling = []
+
+        def listener(pin, level, timestamp_ns):
+            falling.append(level)
+
+        pin.add_interrupt(pin.INTERRUPT_RISING, rising.append)
+        pin.add_edge_listener(pin.INTERRUPT_FALLING, listener)
+        assert fake_rpi.gpio.calls[-1] == ('add_event_detect',
+                                           (7, fake_rpi.BOTH))
+        fake_rpi.gpio.fire(7, True)
+        fake_rpi.gpio.fire(7, False)
+        assert rising == [7]
+        assert falling == [False]
+        pin.remove_edge_listener(listener)
+        assert fake_rpi.gpio.calls[-1] == ('add_event_detect',
+                                           (7, fake_rpi.RISING))
+        fake_rpi.gpio.fire(7, True)
+        assert rising == [7, 7]
+
+    def test_mismatched_debounce_time_is_rejected(self):
+        pin = raspberrypi_gpio.RaspberryPiDigitalInput(7)
+        pin.add_interrupt(pin.INTERRUPT_BOTH, lambda pin: None,
+                          debounce_time_ms=5)
+        with pytest.raises(base_gpio.GPIOError):
+            pin.add_interrupt(pin.INTERRUPT_BOTH, lambda pin: None)
+        pin.remove_interrupt()
+        pin.add_interrupt(pin.INTERRUPT_BOTH, lambda pin: None)
+
+    def test_platform_starts_its_dispatcher(self):
+        dispatcher = edge_dispatcher.EdgeDispatcher(num_workers=1)
+        raspberrypi_platform.RaspberryPiPlatform(edge_dispatcher=dispatcher)
+        pin = raspberrypi_gpio.RaspberryPiDigitalInput(7, dispatcher)
+        interrupts = []
+        pin.add_interrupt(pin.INTERRUPT_RISING, interrupts.append)
+        fake_rpi.gpio.fire(7, True)
+        dispatcher.stop()
+        assert interrupts == [7]
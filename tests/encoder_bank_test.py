@@ -0,0 +1,65 @@
+import time
+
+from pyparts.parts.encoder import encoder_bank
+
+# Pin readings (a, b) for one turn forward through the quadrature states.
+_FORWARD = [(0, 0), (1, 0), (1, 1), (0, 1)]
+
+
+class FakePlatform(object):
+    """Serves pin readings for every encoder from a script of scans."""
+
+    def __init__(self, scans):
+        self._scans = list(scans)
+        self.read_count = 0
+
+    def read_digital_inputs(self, inputs):
+        self.read_count += 1
+        values = self._scans[0]
+        if len(self._scans) > 1:
+            self._scans.pop(0)
+        assert len(values) == len(inputs)
+        return values
+
+
+def scans(*encoders):
+    """Interleaves per-encoder (a, b) readings into whole bank scans."""
+    return [[value for reading in readings for value in reading]
+            for readings in zip(*encoders)]
+
+
+class TestEncoderBank(object):
+
+    def test_scan_reads_every_pin_at_once(self):
+        forward = _FORWARD + _FORWARD[:1]
+        backward = list(reversed(forward))
+        platform = FakePlatform(scans(forward, backward))
+        bank = encoder_bank.EncoderBank([(0, 1), (2, 3)], platform=platform)
+        for _ in range(4):
+            bank.scan()
+        assert platform.read_count == 5
+        assert bank.position(0) == 4
+        assert bank.position(1) == -4
+        assert bank.get_delta(0) == 4
+        assert bank.get_delta(0) == 0
+
+    def test_skipped_state_keeps_the_last_direction(self):
+        readings = [_FORWARD[0], _FORWARD[1], _FORWARD[3]]
+        platform = FakePlatform(scans(readings))
+        bank = encoder_bank.EncoderBank([(0, 1)], platform=platform)
+        bank.scan()
+        bank.scan()
+        assert bank.position(0) == 3
+
+    def test_run_updates_velocity(self):
+        readings = [_FORWARD[i % 4] for i in range(10000)]
+        platform = FakePlatform(scans(readings))
+        bank = encoder_bank.EncoderBank([(0, 1)], platform=platform,
+                                        poll_interval_s=0.0005,
+                                        velocity_interval_s=0.01)
+        bank.start()
+        time.sleep(0.1)
+        bank.stop()
+        bank.join()
+        assert bank.position(0) > 0
+        assert bank.velocity(0) > 0
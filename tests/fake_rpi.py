@@ -0,0 +1,128 @@
+"""Fake RPi.GPIO and spidev modules for testing the Raspberry Pi platform.
+
+Importing this module installs the fakes in sys.modules, so it must be
+imported before any of the Raspberry Pi platform modules.
+"""
+import sys
+import types
+
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+PUD_DOWN = 21
+PUD_UP = 22
+FALLING = 32
+RISING = 31
+BOTH = 33
+
+
+class FakeGPIO(types.ModuleType):
+    """Records RPi.GPIO calls and serves pin levels.
+
+    Attributes:
+      calls: List of (function name, args) tuples, in call order.
+      levels: Dict. Pin number to the level input() returns.
+      edge_callbacks: Dict. Pin number to the add_event_detect callback.
+    """
+
+    BCM = BCM
+    BOARD = BOARD
+    OUT = OUT
+    IN = IN
+    PUD_DOWN = PUD_DOWN
+    PUD_UP = PUD_UP
+    FALLING = FALLING
+    RISING = RISING
+    BOTH = BOTH
+
+    def __init__(self):
+        super(FakeGPIO, self).__init__('RPi.GPIO')
+        self.PWM = FakePWM
+        self.reset()
+
+    def reset(self):
+        """Forgets all calls, levels and edge detections."""
+        self.calls = []
+        self.levels = {}
+        self.edge_callbacks = {}
+
+    def setmode(self, mode):
+        self.calls.append(('setmode', (mode,)))
+
+    def setup(self, pin, direction, pull_up_down=PUD_UP):
+        self.calls.append(('setup', (pin, direction)))
+
+    def output(self, pin, value):
+        self.calls.append(('output', (pin, value)))
+
+    def input(self, pin):
+        return self.levels.get(pin, False)
+
+    def cleanup(self, pin=None):
+        self.calls.append(('cleanup', (pin,)))
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=0):
+        if pin in self.edge_callbacks:
+            raise RuntimeError('Conflicting edge detection already enabled '
+                               'for this GPIO channel')
+        self.calls.append(('add_event_detect', (pin, edge)))
+        self.edge_callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        self.calls.append(('remove_event_detect', (pin,)))
+        self.edge_callbacks.pop(pin, None)
+
+    def wait_for_edge(self, pin, edge):
+        pass
+
+    def fire(self, pin, level):
+        """Sets a pin's level and calls its edge detection callback."""
+        self.levels[pin] = level
+        self.edge_callbacks[pin](pin)
+
+
+class FakePWM(object):
+
+    def __init__(self, pin, frequency_hz):
+        gpio.calls.append(('PWM', (pin, frequency_hz)))
+
+    def start(self, duty_cycle):
+        pass
+
+    def stop(self):
+        pass
+
+    def ChangeDutyCycle(self, duty_cycle):
+        pass
+
+    def ChangeFrequency(self, frequency_hz):
+        pass
+
+
+class FakeSpiDev(object):
+
+    def open(self, port, device):
+        gpio.calls.append(('spi_open', (port, device)))
+
+    def close(self):
+        gpio.calls.append(('spi_close', ()))
+
+    def writebytes2(self, data):
+        pass
+
+    def readbytes(self, length):
+        return [i & 0xff for i in range(length)]
+
+    def xfer2(self, data):
+        return [0] * len(data)
+
+
+gpio = FakeGPIO()
+_rpi = types.ModuleType('RPi')
+_rpi.GPIO = gpio
+_spidev = types.ModuleType('spidev')
+_spidev.SpiDev = FakeSpiDev
+sys.modules['RPi'] = _rpi
+sys.modules['RPi.GPIO'] = gpio
+sys.modules['spidev'] = _spidev
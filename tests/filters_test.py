@@ -0,0 +1,84 @@
+import math
+import threading
+
+from pyparts.logic import filters
+from pyparts.parts.sensor.temperature import base_temperature_sensor
+from pyparts.parts.sensor.temperature import filtered_temperature_sensor
+
+
+class FakeSensor(base_temperature_sensor.BaseTemperatureSensor):
+
+    def __init__(self, readings):
+        super(FakeSensor, self).__init__()
+        self._readings = list(readings)
+
+    def _get_temp_c(self):
+        return self._readings.pop(0)
+
+
+class TestPipeline(object):
+
+    def test_median_removes_spikes(self):
+        pipeline = filters.Pipeline(filters.moving_median(3))
+        filtered = pipeline.process_batch([20, 20, 90, 21, 21])
+        assert list(filtered) == [20, 20, 20, 21, 21]
+
+    def test_median_skips_nan_samples(self):
+        pipeline = filters.Pipeline(filters.moving_median(3))
+        nan = float('nan')
+        filtered = pipeline.process_batch([nan, 20, nan, 22, 90, nan, 21])
+        assert math.isnan(filtered[0])
+        assert list(filtered[1:]) == [20, 20, 21, 22, 22, 22]
+
+    def test_ema_and_rate_limit_skip_nan_samples(self):
+        nan = float('nan')
+        samples = [nan, 20, nan, 22]
+        ema = filters.Pipeline(filters.ema(0.5)).process_batch(samples)
+        assert math.isnan(ema[0])
+        assert list(ema[1:]) == [20, 20, 21]
+        limited = filters.Pipeline(filters.rate_limit(1)).process_batch(
+            samples + [nan, nan])
+        assert math.isnan(limited[0])
+        assert list(limited[1:]) == [20, 20, 21, 21, 21]
+
+    def test_kalman_skips_nan_samples(self):
+        nan = float('nan')
+        filtered = filters.Pipeline(filters.kalman(0.01, 1)).process_batch(
+            [nan, 20, 20, nan, 20])
+        assert math.isnan(filtered[0])
+        assert list(filtered[1:]) == [20, 20, 20, 20]
+
+    def test_pipeline_is_shared_between_threads(self):
+        pipeline = filters.Pipeline(filters.ema(0.5), filters.kalman(1, 1))
+        errors = []
+
+        def run():
+            try:
+                for _ in range(2000):
+                    pipeline.process(1.0)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+    def test_stages_are_chained(self):
+        pipeline = filters.Pipeline(filters.reject_outliers(5, 1),
+                                    filters.rate_limit(2))
+        filtered = pipeline.process_batch([0, 50, 10, 10, 10])
+        assert list(filtered) == [0, 0, 2, 4, 6]
+
+    def test_kalman_converges(self):
+        pipeline = filters.Pipeline(filters.kalman(1e-4, 1.0))
+        filtered = pipeline.process_batch([0] + [10, 12, 8, 11, 9] * 40)
+        assert abs(filtered[-1] - 10) < 1
+
+    def test_filtered_temperature_sensor(self):
+        sensor = filtered_temperature_sensor.FilteredTemperatureSensor(
+            FakeSensor([10, 20]), filters.Pipeline(filters.ema(0.5)))
+        assert sensor.temp_c == 10
+        assert sensor.temp_c == 15
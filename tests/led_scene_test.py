@@ -0,0 +1,36 @@
+from pyparts.parts.led import led_scene
+from pyparts.parts.led import rgb_led
+
+
+class FakePWM(object):
+
+    def __init__(self):
+        self.updates = []
+
+    def set_duty_cycle(self, duty_cycle):
+        self.updates.append(duty_cycle)
+
+
+class TestLedScene(object):
+
+    def test_render_sends_only_changed_channels(self):
+        leds = [rgb_led.RGBLed(FakePWM(), FakePWM(), FakePWM())
+                for _ in range(4)]
+        scene = led_scene.LedScene(leds, gamma=1.0)
+        assert scene.render() == 12
+        assert scene.render() == 0
+        scene.set_rgb(2, 255, 0, 0)
+        assert scene.render() == 1
+        red, green, blue = leds[2].channels
+        assert red.updates == [0.0, 100.0]
+        assert green.updates == [0.0]
+
+    def test_set_hsv(self):
+        leds = [rgb_led.RGBLed(FakePWM(), FakePWM(), FakePWM())]
+        scene = led_scene.LedScene(leds)
+        scene.set_hsv(0, 120, 1.0, 1.0)
+        assert scene.rgb(0) == (0, 255, 0)
+        scene.set_hsv(0, 240, 0.0, 1.0)
+        assert scene.rgb(0) == (255, 255, 255)
+        scene.set_hsv(0, 60, 1.0, 0.0)
+        assert scene.rgb(0) == (0, 0, 0)
@@ -0,0 +1,104 @@
+import ctypes
+import threading
+import time
+
+import pytest
+
+from pyparts.platforms.i2c import linux_i2c
+
+
+class FakeRegisterDevice(object):
+    """Stands in for the kernel, serving I2C_RDWR from a register file."""
+
+    def __init__(self, address):
+        self.address = address
+        self.registers = bytearray(256)
+        self.calls = 0
+
+    def ioctl(self, fd, request, rdwr):
+        assert request == linux_i2c.I2C_RDWR
+        self.calls += 1
+        pointer = 0
+        for i in range(rdwr.nmsgs):
+            message = rdwr.msgs[i]
+            assert message.addr == self.address
+            data = ctypes.cast(message.buf,
+                               ctypes.POINTER(ctypes.c_uint8 * message.len))
+            if message.flags & linux_i2c.I2C_M_RD:
+                for j in range(message.len):
+                    data.contents[j] = self.registers[(pointer + j) % 256]
+            else:
+                pointer = data.contents[0]
+                for j in range(1, message.len):
+                    self.registers[(pointer + j - 1) % 256] = data.contents[j]
+
+
+class FakeSharedBus(object):
+    """Serves several devices on one bus, yielding mid transaction."""
+
+    def __init__(self, *devices):
+        self.devices = dict((device.address, device) for device in devices)
+
+    def ioctl(self, fd, request, rdwr):
+        address = rdwr.msgs[0].addr
+        time.sleep(0.0001)
+        self.devices[address].ioctl(fd, request, rdwr)
+
+
+@pytest.fixture
+def device_path(tmpdir):
+    path = tmpdir.join('i2c-1')
+    path.write('')
+    return str(path)
+
+
+class TestLinuxI2CBus(object):
+
+    def test_register_read_is_one_ioctl(self, device_path):
+        device = FakeRegisterDevice(0x48)
+        bus = linux_i2c.LinuxI2CBus(1, path=device_path, ioctl=device.ioctl)
+        bus.open()
+        bus.write_registers(0x48, 0x10, [1, 2, 3])
+        device.calls = 0
+        assert bus.read_register(0x48, 0x11) == 2
+        assert device.calls == 1
+        assert bus.read_registers(0x48, 0x10, 3) == bytearray([1, 2, 3])
+        bus.close()
+
+    def test_rejects_oversized_transfers(self, device_path):
+        device = FakeRegisterDevice(0x48)
+        bus = linux_i2c.LinuxI2CBus(1, max_transfer_size=4, path=device_path,
+                                    ioctl=device.ioctl)
+        bus.open()
+        with pytest.raises(ValueError):
+            bus.read(0x48, 5)
+        bus.close()
+
+    def test_requires_open_bus(self):
+        bus = linux_i2c.LinuxI2CBus(1, ioctl=FakeRegisterDevice(0x48).ioctl)
+        with pytest.raises(RuntimeError):
+            bus.read_register(0x48, 0)
+
+    def test_threads_share_a_bus(self, device_path):
+        first = FakeRegisterDevice(0x48)
+        first.registers[0] = 1
+        second = FakeRegisterDevice(0x49)
+        second.registers[0] = 2
+        fake_bus = FakeSharedBus(first, second)
+        bus = linux_i2c.LinuxI2CBus(1, path=device_path, ioctl=fake_bus.ioctl)
+        bus.open()
+        results = {0x48: [], 0x49: []}
+
+        def poll(address):
+            for _ in range(200):
+                results[address].append(bus.read_register(address, 0))
+
+        threads = [threading.Thread(target=poll, args=(address,))
+                   for address in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        bus.close()
+        assert results[0x48] == [1] * 200
+        assert results[0x49] == [2] * 200
@@ -0,0 +1,62 @@
+import struct
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from pyparts.parts.sensor.temperature import max31855_bank  # noqa: E402
+
+
+def frame(thermocouple_c, internal_c, fault=0):
+    thermocouple = int(thermocouple_c / 0.25) & 0x3fff
+    internal = int(internal_c / 0.0625) & 0xfff
+    value = thermocouple << 18 | internal << 4 | fault
+    if fault:
+        value |= 0x10000
+    return list(bytearray(struct.pack('>I', value)))
+
+
+class FakeSPIBus(object):
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def set_mode(self, mode):
+        pass
+
+    def readinto(self, buf):
+        frame = self.frames.pop(0)
+        buf[:len(frame)] = bytearray(frame)
+        return len(frame)
+
+
+class TestMAX31855Bank(object):
+
+    def test_decodes_negative_temperatures(self):
+        buses = [FakeSPIBus([frame(100.25, 25.5)]),
+                 FakeSPIBus([frame(-12.5, -3.0625)])]
+        readings = max31855_bank.MAX31855Bank(buses).sweep().readings
+        assert list(readings['thermocouple_c']) == [100.25, -12.5]
+        assert list(readings['internal_c']) == [25.5, -3.0625]
+        assert list(readings['fault']) == [0, 0]
+
+    def test_median_ignores_faulted_samples(self):
+        bus = FakeSPIBus([frame(20, 20), frame(500, 20), frame(0, 20, 1),
+                          frame(21, 20), frame(22, 20)])
+        bank = max31855_bank.MAX31855Bank([bus], oversample=5)
+        reading = bank.sweep().readings[0]
+        assert reading['thermocouple_c'] == 21.5
+        assert reading['fault'] == max31855_bank.FAULT_OPEN_CIRCUIT
+
+    def test_fault_flag_without_detail_bits(self):
+        value = list(bytearray(struct.pack('>I', 80 << 20 | 0x10000)))
+        bus = FakeSPIBus([value])
+        reading = max31855_bank.MAX31855Bank([bus]).sweep().readings[0]
+        assert numpy.isnan(reading['thermocouple_c'])
+        assert reading['fault'] == max31855_bank.FAULT_UNSPECIFIED
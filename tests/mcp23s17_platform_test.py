@@ -0,0 +1,51 @@
+from pyparts.platforms import mcp23s17_platform
+
+
+class FakeMCP23S17Bus(object):
+    """Emulates the MCP23S17 register file behind an SPI bus."""
+
+    def __init__(self):
+        self.registers = bytearray(0x16)
+        self.writes = []
+
+    def open(self):
+        pass
+
+    def set_mode(self, mode):
+        pass
+
+    def write(self, data):
+        data = bytearray(data)
+        self.writes.append(data)
+        for i, value in enumerate(data[2:]):
+            self.registers[data[1] + i] = value
+
+    def transfer(self, data):
+        register = data[1]
+        return bytearray(2) + self.registers[register:register + len(data) - 2]
+
+
+class TestMCP23S17Platform(object):
+
+    def test_pin_writes_use_shadow_registers(self):
+        bus = FakeMCP23S17Bus()
+        platform = mcp23s17_platform.MCP23S17Platform(bus)
+        led = platform.get_digital_output(9)
+        assert bus.registers[0x01] == 0xfd
+        del bus.writes[:]
+        led.set_high()
+        led.set_high()
+        assert bus.writes == [bytearray([0x40, 0x15, 0x02])]
+        assert led.is_high
+
+    def test_group_writes_and_reads(self):
+        bus = FakeMCP23S17Bus()
+        platform = mcp23s17_platform.MCP23S17Platform(bus)
+        outputs = [platform.get_digital_output(pin) for pin in (0, 3, 12)]
+        del bus.writes[:]
+        platform.write_digital_outputs(outputs, [True, True, True])
+        assert bus.writes == [bytearray([0x40, 0x14, 0x09, 0x10])]
+        inputs = [platform.get_digital_input(pin) for pin in (1, 8)]
+        bus.registers[0x12] = 0x02
+        bus.registers[0x13] = 0x00
+        assert platform.read_digital_inputs(inputs) == [True, False]
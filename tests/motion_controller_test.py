@@ -0,0 +1,34 @@
+from pyparts.logic import clock as clock_lib
+from pyparts.systems import motion_controller
+
+
+class FakeAxis(object):
+
+    def __init__(self):
+        self.position = 0
+        self.steps = []
+
+    def step(self, direction=1):
+        self.position += direction
+        self.steps.append(direction)
+
+    def hold(self):
+        pass
+
+
+class TestMotionController(object):
+
+    def test_moves_are_interpolated_and_queued(self):
+        clock = clock_lib.VirtualClock()
+        x, y = FakeAxis(), FakeAxis()
+        controller = motion_controller.MotionController([x, y], clock=clock)
+        controller.move_to([8, -4], 100.0)
+        controller.move_by([0, 4], 100.0)
+        controller.start()
+        assert controller.wait(5)
+        controller.stop()
+        controller.join(1)
+        assert controller.position == (8, 0)
+        assert y.steps == [-1] * 4 + [1] * 4
+        assert abs(clock.time() - 0.12) < 1e-6
+        assert controller.late_steps == 0
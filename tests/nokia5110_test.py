@@ -0,0 +1,76 @@
+from pyparts.parts.display.screen import nokia5110
+from pyparts.platforms.spi import base_spi
+
+
+class RecordingSPIBus(base_spi.BaseSPIBus):
+
+    def __init__(self, events):
+        super(RecordingSPIBus, self).__init__()
+        self._events = events
+
+    def _open(self):
+        pass
+
+    def _close(self):
+        pass
+
+    def _set_clock_frequency_hz(self, frequency_hz):
+        pass
+
+    def _set_mode(self, mode):
+        pass
+
+    def _set_bit_order(self, order):
+        pass
+
+    def write(self, data):
+        self._events.append(('spi', bytes(data)))
+
+    def read(self, length):
+        return bytearray(length)
+
+
+class RecordingOutput(object):
+
+    def __init__(self, name, events):
+        self._name = name
+        self._events = events
+
+    def set_high(self):
+        self._events.append((self._name, 1))
+
+    def set_low(self):
+        self._events.append((self._name, 0))
+
+
+class TestNokia5110(object):
+
+    def _display(self):
+        events = []
+        display = nokia5110.Nokia5110(RecordingSPIBus(events),
+                                      RecordingOutput('dc', events),
+                                      RecordingOutput('rst', []), None)
+        return display, events
+
+    def test_enable_sends_one_command_batch(self, monkeypatch):
+        monkeypatch.setattr(nokia5110.time, 'sleep', lambda seconds: None)
+        display, events = self._display()
+        display.enable(contrast=50, bias=4)
+        assert events == [('dc', 0),
+                          ('spi', bytes([0x21, 0x14, 0x80 | 50, 0x20, 0x0c]))]
+
+    def test_commands_share_dc_transitions(self):
+        display, events = self._display()
+        with display.commands():
+            display.set_contrast(60)
+            display.set_cursor(3, 2)
+        display.send_data(b'\xff')
+        display.set_cursor(0, 1)
+        display.set_cursor(5, 1)
+        assert events == [
+            ('dc', 0), ('spi', bytes([0x21, 0x80 | 60, 0x20, 0x0c, 0x83,
+                                      0x42])),
+            ('dc', 1), ('spi', b'\xff'),
+            ('dc', 0), ('spi', bytes([0x80, 0x41])),
+            ('spi', bytes([0x85, 0x41])),
+        ]
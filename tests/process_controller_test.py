@@ -0,0 +1,60 @@
+import time
+
+from pyparts.logic import pid_controller
+from pyparts.systems import process_controller
+
+
+def _build_worker():
+    return pid_controller.PIDController.Worker(1, 0, 0, lambda: 2.0,
+                                               lambda output: None)
+
+
+def _build_broken_worker():
+    raise RuntimeError('No hardware.')
+
+
+def _wait_for(condition, timeout_s=5.0):
+    end = time.time() + timeout_s
+    while not condition() and time.time() < end:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestProcessController:
+    def test_runs_controller_in_child(self):
+        controller = process_controller.ProcessController(
+            _build_worker, period_s=0.001)
+        controller.start()
+        try:
+            controller.set_desired_value(5.0)
+            controller.enable()
+            assert _wait_for(lambda: controller.telemetry.iterations > 10)
+            telemetry = controller.telemetry
+            assert telemetry.input == 2.0
+            assert telemetry.output == 3.0
+            assert not controller.has_crashed
+        finally:
+            controller.stop()
+        assert not controller.is_alive
+
+    def test_detects_crash(self):
+        controller = process_controller.ProcessController(
+            _build_broken_worker)
+        controller.start()
+        try:
+            assert _wait_for(lambda: controller.has_crashed)
+        finally:
+            controller.stop()
+
+    def test_enable_before_start_and_after_stop(self):
+        controller = process_controller.ProcessController(
+            _build_worker, period_s=0.001)
+        controller.enable()
+        controller.set_desired_value(5.0)
+        controller.start()
+        try:
+            assert _wait_for(lambda: controller.telemetry.iterations > 10)
+        finally:
+            controller.stop()
+        controller.disable()
+        assert not controller.is_enabled
@@ -0,0 +1,85 @@
+from pyparts.platforms.gpio import pulse_meter
+
+
+class FakePin(object):
+    INTERRUPT_BOTH = 2
+    is_high = False
+    pin_number = 1
+
+    def __init__(self):
+        self.interrupts = []
+        self.listeners = []
+
+    def add_interrupt(self, type, callback=None, debounce_time_ms=0):
+        self.interrupts.append(callback)
+
+    def remove_interrupt(self):
+        self.interrupts = []
+
+    def add_edge_listener(self, type, listener, debounce_time_ms=0):
+        self.listeners.append(listener)
+
+    def remove_edge_listener(self, listener):
+        self.listeners.remove(listener)
+
+
+class InterruptOnlyPin(FakePin):
+
+    def add_edge_listener(self, type, listener, debounce_time_ms=0):
+        raise NotImplementedError
+
+
+class TestPulseMeter:
+    def test_square_wave(self):
+        meter = pulse_meter.PulseMeter(FakePin(), window_s=1.0, buffer_size=64)
+        # 1 kHz with a 25% duty cycle, more edges than the buffer holds.
+        period_ns = 1000000
+        for i in range(100):
+            start = i * period_ns
+            meter.record_edge(1, True, start)
+            meter.record_edge(1, False, start + period_ns // 4)
+        stats = meter.stats(now_ns=100 * period_ns)
+        assert meter.edge_count == 200
+        assert stats.count == 32
+        assert abs(stats.frequency_hz - 1000) < 1e-6
+        assert abs(stats.duty_cycle - 25) < 1e-6
+
+    def test_window_excludes_old_edges(self):
+        meter = pulse_meter.PulseMeter(FakePin())
+        meter.record_edge(1, True, 0)
+        meter.record_edge(1, False, 10)
+        stats = meter.stats(window_s=1.0, now_ns=int(5e9))
+        assert stats.count == 0
+        assert stats.period_s is None
+
+    def test_window_matches_a_linear_scan_after_wrapping(self):
+        meter = pulse_meter.PulseMeter(FakePin(), buffer_size=8)
+        for i in range(13):
+            meter.record_edge(1, i % 2 == 0, i * 10)
+        for start_ns in range(-5, 140, 5):
+            timestamps, _ = meter._window(start_ns)
+            expected = [i * 10 for i in range(5, 13) if i * 10 >= start_ns]
+            assert list(timestamps) == expected
+
+    def test_interrupt_callbacks_sample_the_level(self):
+        pin = InterruptOnlyPin()
+        meter = pulse_meter.PulseMeter(pin)
+        meter.start()
+        callback = pin.interrupts[0]
+        # The falling edge between these two rising edges was missed.
+        pin.is_high = True
+        callback(1)
+        callback(1)
+        pin.is_high = False
+        callback(1)
+        assert list(meter._levels[:3]) == [1, 1, 0]
+
+    def test_stop_leaves_other_interrupts(self):
+        pin = FakePin()
+        pin.add_interrupt(pin.INTERRUPT_BOTH, lambda pin: None)
+        meter = pulse_meter.PulseMeter(pin)
+        meter.start()
+        assert len(pin.listeners) == 1
+        meter.stop()
+        assert pin.listeners == []
+        assert len(pin.interrupts) == 1
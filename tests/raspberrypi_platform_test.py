@@ -0,0 +1,109 @@
+import pytest
+
+from tests import fake_rpi
+
+from pyparts.platforms import raspberrypi_platform
+
+
+def make_platform(tmpdir, **kwargs):
+    fake_rpi.gpio.reset()
+    return raspberrypi_platform.RaspberryPiPlatform(
+        raspberrypi_platform.BCM, pwm_root=str(tmpdir), **kwargs)
+
+
+def make_pwm_chip(root):
+    chip = root.mkdir('pwmchip0')
+    chip.join('npwm').write('2\n')
+    for channel in (0, 1):
+        pwm = chip.mkdir('pwm%d' % channel)
+        for name in ('period', 'duty_cycle', 'enable'):
+            pwm.join(name).write('0\n')
+    return chip
+
+
+def calls(name):
+    return [args for call, args in fake_rpi.gpio.calls if call == name]
+
+
+class TestRaspberryPiPlatform(object):
+
+    def test_pooled_pins_are_cleaned_up_on_the_last_release(self, tmpdir):
+        platform = make_platform(tmpdir)
+        pin = platform.get_digital_input(7)
+        assert platform.get_digital_input(7) is pin
+        platform.release(pin)
+        assert calls('cleanup') == []
+        platform.release(pin)
+        assert calls('cleanup') == [(7,)]
+        with pytest.raises(ValueError):
+            platform.release(pin)
+        assert platform.get_digital_input(7) is not pin
+
+    def test_releasing_an_input_removes_its_interrupts(self, tmpdir):
+        platform = make_platform(tmpdir)
+        pin = platform.get_digital_input(7)
+        pin.add_interrupt(pin.INTERRUPT_BOTH, lambda pin: None)
+        platform.release(pin)
+        assert calls('remove_event_detect') == [(7,)]
+        assert 7 not in fake_rpi.gpio.edge_callbacks
+
+    def test_a_pin_is_either_an_input_or_an_output(self, tmpdir):
+        platform = make_platform(tmpdir)
+        pin = platform.get_digital_input(7)
+        with pytest.raises(ValueError):
+            platform.get_digital_output(7)
+        platform.release(pin)
+        output = platform.get_digital_output(7)
+        with pytest.raises(ValueError):
+            platform.get_digital_input(7)
+        platform.release(output)
+
+    def test_pwm_release_stops_before_freeing_the_pin(self, tmpdir):
+        platform = make_platform(tmpdir)
+        pwm = platform.get_pwm_output(5)
+        assert calls('PWM') == [(5, 2000)]
+        with pytest.raises(ValueError):
+            platform.get_digital_input(5)
+        platform.release(pwm)
+        assert calls('cleanup') == [(5,)]
+        platform.get_digital_input(5)
+
+    def test_spi_bus_is_closed_on_the_last_release(self, tmpdir):
+        platform = make_platform(tmpdir)
+        bus = platform.get_hardware_spi_bus(0, 1)
+        assert platform.get_hardware_spi_bus(0, 1) is bus
+        bus.open()
+        platform.release(bus)
+        assert calls('spi_close') == []
+        platform.release(bus)
+        assert calls('spi_close') == [()]
+
+    def test_reads_inputs_in_bulk(self, tmpdir):
+        platform = make_platform(tmpdir)
+        pins = [platform.get_digital_input(pin) for pin in (4, 5, 6)]
+        fake_rpi.gpio.levels.update({4: 1, 6: 1})
+        assert platform.read_digital_inputs(pins) == [True, False, True]
+
+    def test_spi_readinto_fills_part_of_a_buffer(self, tmpdir):
+        platform = make_platform(tmpdir)
+        bus = platform.get_hardware_spi_bus(0, 0)
+        bus.open()
+        buf = bytearray(b'\xff' * 6)
+        assert bus.readinto(memoryview(buf)[1:5]) == 4
+        assert buf == bytearray(b'\xff\x00\x01\x02\x03\xff')
+
+    def test_hardware_pwm_is_pooled_by_pin(self, tmpdir):
+        make_pwm_chip(tmpdir)
+        platform = make_platform(tmpdir)
+        pwm = platform.get_pwm_output(18)
+        assert pwm.pin_number == 18
+        assert platform.get_pwm_output(18) is pwm
+        # BCM 12 shares channel 0 with BCM 18.
+        with pytest.raises(ValueError):
+            platform.get_pwm_output(12)
+        with pytest.raises(ValueError):
+            platform.get_digital_output(18)
+        assert platform.get_pwm_output(13).pin_number == 13
+        platform.release(pwm)
+        platform.release(pwm)
+        assert platform.get_pwm_output(12).pin_number == 12
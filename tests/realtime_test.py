@@ -0,0 +1,48 @@
+import gc
+import os
+import time
+
+from pyparts.logic import realtime
+from pyparts.parts.encoder import rotary_encoder
+
+
+class GCRecordingPin(object):
+    """An input that records whether the collector was on when read."""
+
+    def __init__(self):
+        self.gc_enabled = []
+
+    @property
+    def is_high(self):
+        self.gc_enabled.append(gc.isenabled())
+        return False
+
+
+class TestRuntimeConfig(object):
+
+    def test_unsupported_settings_are_skipped(self):
+        cpus = os.sched_getaffinity(0)
+        status = realtime.RuntimeConfig(cpus=[4096]).apply()
+        assert status.affinity is False
+        assert status.scheduling is None
+        assert os.sched_getaffinity(0) == cpus
+
+    def test_hot_loop_pauses_gc(self):
+        config = realtime.RuntimeConfig(pause_gc=True)
+        with config.hot_loop():
+            assert not gc.isenabled()
+        assert gc.isenabled()
+
+    def test_encoder_worker_reads_in_a_hot_loop(self):
+        a_pin = GCRecordingPin()
+        worker = rotary_encoder.RotaryEncoder.Worker(
+            a_pin, GCRecordingPin(),
+            runtime_config=realtime.RuntimeConfig(pause_gc=True))
+        del a_pin.gc_enabled[:]
+        worker.start()
+        time.sleep(0.02)
+        worker.stop()
+        worker.join(1)
+        assert a_pin.gc_enabled
+        assert not any(a_pin.gc_enabled)
+        assert gc.isenabled()
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from pyparts.logic import pid_controller
+from pyparts.parts.sensor.temperature import base_temperature_sensor
+from pyparts.parts.sensor.temperature import prefetched_temperature_sensor
+from pyparts.systems import sampler as sampler_lib
+
+
+class FakeSensor(base_temperature_sensor.BaseTemperatureSensor):
+
+    def __init__(self, temp_c):
+        super(FakeSensor, self).__init__()
+        self.reading = temp_c
+
+    def _get_temp_c(self):
+        return self.reading
+
+
+class TestSampler(object):
+
+    def test_sources_are_read_at_their_own_rates(self):
+        counts = {'fast': 0, 'slow': 0}
+
+        def reader(name):
+            def read():
+                counts[name] += 1
+                return counts[name]
+            return read
+
+        sampler = sampler_lib.Sampler()
+        sampler.register('fast', reader('fast'), 0.01)
+        sampler.register('slow', reader('slow'), 0.1)
+        sampler.start()
+        time.sleep(0.25)
+        sampler.stop()
+        sampler.join(1)
+        assert counts['fast'] > 3 * counts['slow']
+        assert sampler.latest('fast').value == counts['fast']
+        assert not sampler.is_stale('slow')
+
+    def test_stale_reading(self):
+        sampler = sampler_lib.Sampler()
+        sampler.register('sensor', lambda: 1.0, 0.01)
+        with pytest.raises(sampler_lib.StaleReadingError):
+            sampler.value('sensor')
+        sampler.start()
+        time.sleep(0.05)
+        assert sampler.value('sensor') == 1.0
+        sampler.stop()
+        sampler.join(1)
+        time.sleep(0.05)
+        assert sampler.is_stale('sensor')
+
+
+class TestPrefetchedTemperatureSensor(object):
+
+    def test_stale_sensor_without_fallback_raises(self):
+        sampler = sampler_lib.Sampler()
+        sensor = prefetched_temperature_sensor.PrefetchedTemperatureSensor(
+            sampler, FakeSensor(21.0), 0.01)
+        with pytest.raises(sampler_lib.StaleReadingError):
+            sensor.temp_c
+        sampler.start()
+        time.sleep(0.05)
+        assert sensor.temp_c == 21.0
+        sampler.stop()
+        sampler.join(1)
+        time.sleep(0.05)
+        assert sensor.is_stale
+        with pytest.raises(sampler_lib.StaleReadingError):
+            sensor.temp_c
+
+    def test_running_worker_survives_stale_readings(self):
+        sampler = sampler_lib.Sampler()
+        raw = FakeSensor(21.0)
+        sensor = prefetched_temperature_sensor.PrefetchedTemperatureSensor(
+            sampler, raw, 0.01, fallback_c=1000.0)
+        outputs = []
+
+        def output(value):
+            outputs.append(value)
+            time.sleep(0.001)
+
+        worker = pid_controller.PIDController.Worker(
+            kp=1, ki=0, kd=0, input_func=lambda: sensor.temp_c,
+            output_func=output)
+        worker.set_desired_value(25)
+        worker.start()
+        time.sleep(0.02)
+        assert worker.current_value == 1000.0
+        sampler.start()
+        time.sleep(0.05)
+        assert worker.current_value == 21.0
+        sampler.stop()
+        sampler.join(1)
+        time.sleep(0.05)
+        assert worker.is_alive()
+        assert worker.current_value == 1000.0
+        worker.stop()
+        worker.join(1)
@@ -0,0 +1,57 @@
+import struct
+import threading
+import time
+
+import pytest
+
+from pyparts.logic import shared_struct
+
+
+def make_struct(lock=None):
+    buffer = bytearray(shared_struct.SeqlockStruct.calcsize('<dd'))
+    return shared_struct.SeqlockStruct(buffer, 0, '<dd', lock), buffer
+
+
+class TestSeqlockStruct(object):
+
+    def test_read_returns_the_last_write(self):
+        seqlock, _ = make_struct()
+        seqlock.write(1.5, 2.5)
+        assert seqlock.read() == (1.5, 2.5)
+        assert seqlock.sequence == 2
+
+    def test_read_waits_for_a_write_to_finish(self):
+        seqlock, buffer = make_struct()
+        seqlock.write(1.0, 2.0)
+        # Leave a write half done, then finish it from another thread.
+        struct.pack_into('<Q', buffer, 0, 3)
+
+        def finish():
+            time.sleep(0.01)
+            struct.pack_into('<dd', buffer, 8, 3.0, 4.0)
+            struct.pack_into('<Q', buffer, 0, 4)
+
+        writer = threading.Thread(target=finish)
+        writer.start()
+        assert seqlock.read() == (3.0, 4.0)
+        writer.join()
+
+    def test_read_gives_up_on_a_stalled_write(self):
+        seqlock, buffer = make_struct()
+        struct.pack_into('<Q', buffer, 0, 1)
+        start = time.time()
+        with pytest.raises(shared_struct.SeqlockError):
+            seqlock.read(timeout_s=0.05)
+        assert time.time() - start < 1
+
+    def test_locked_reads_and_writes(self):
+        seqlock, _ = make_struct(threading.Lock())
+        seqlock.write(5.0, 6.0)
+        assert seqlock.read() == (5.0, 6.0)
+
+    def test_locked_read_gives_up_on_a_held_lock(self):
+        lock = threading.Lock()
+        seqlock, _ = make_struct(lock)
+        with lock:
+            with pytest.raises(shared_struct.SeqlockError):
+                seqlock.read(timeout_s=0.01)
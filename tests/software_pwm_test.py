@@ -0,0 +1,89 @@
+from pyparts.logic import clock as clock_lib
+from pyparts.platforms.pwm import software_pwm
+
+
+class FakePin(object):
+
+    def __init__(self, name):
+        self.name = name
+
+
+class FakePlatform(object):
+    """Records bulk writes and stops the engine after a number of them."""
+
+    def __init__(self, clock, max_writes):
+        self.clock = clock
+        self.max_writes = max_writes
+        self.engine = None
+        self.writes = []
+        self.on_write = None
+
+    def write_digital_outputs(self, outputs, values):
+        self.writes.append((round(self.clock.time(), 6),
+                            [pin.name for pin in outputs], list(values)))
+        if self.on_write is not None:
+            self.on_write(self.writes[-1])
+        if len(self.writes) >= self.max_writes:
+            self.engine.stop()
+
+
+class TestSoftwarePWMEngine(object):
+
+    def _engine(self, max_writes):
+        clock = clock_lib.VirtualClock()
+        platform = FakePlatform(clock, max_writes)
+        engine = software_pwm.SoftwarePWMEngine(platform, frequency_hz=100,
+                                                clock=clock)
+        platform.engine = engine
+        return engine, platform
+
+    def test_edges_are_merged_into_bulk_writes(self):
+        engine, platform = self._engine(7)
+        a, b, c, d = [engine.add_output(FakePin(name)) for name in 'abcd']
+        a.set_duty_cycle(25)
+        b.set_duty_cycle(25.001)
+        c.set_duty_cycle(50)
+        d.set_duty_cycle(100)
+        for channel in (a, b, c, d):
+            channel.enable()
+        engine.start()
+        engine.join(5)
+        assert platform.writes == [
+            (0.0, ['d'], [True]),
+            (0.0, ['a', 'b', 'c'], [True] * 3),
+            (0.0025, ['a', 'b'], [False] * 2),
+            (0.005, ['c'], [False]),
+            (0.01, ['a', 'b', 'c'], [True] * 3),
+            (0.0125, ['a', 'b'], [False] * 2),
+            (0.015, ['c'], [False]),
+        ]
+        stats = engine.stats()
+        assert stats.periods == 2
+        assert stats.writes == 7
+        assert stats.max_jitter_s == 0
+
+    def test_changes_apply_at_the_next_period(self):
+        engine, platform = self._engine(4)
+        a = engine.add_output(FakePin('a'))
+        a.set_duty_cycle(50)
+        a.enable()
+
+        def change(write):
+            if write[2] == [True]:
+                a.set_duty_cycle(20)
+                platform.on_write = None
+        platform.on_write = change
+        engine.start()
+        engine.join(5)
+        assert platform.writes == [
+            (0.0, ['a'], [True]),
+            (0.005, ['a'], [False]),
+            (0.01, ['a'], [True]),
+            (0.012, ['a'], [False]),
+        ]
+
+    def test_remove_output_drives_pin_low(self):
+        engine, platform = self._engine(10)
+        a = engine.add_output(FakePin('a'))
+        engine.remove_output(a)
+        assert platform.writes == [(0.0, ['a'], [False])]
@@ -0,0 +1,91 @@
+import tracemalloc
+
+from pyparts.parts.display.screen import nokia5110
+from pyparts.parts.sensor.temperature import max31855
+from pyparts.platforms.spi import base_spi
+
+# Largest growth of traced memory allowed while running a transaction. A
+# freshly allocated 4 byte list or bytearray is already bigger than this.
+_MAX_PEAK_BYTES = 64
+
+
+class FakeSPIBus(base_spi.BaseSPIBus):
+
+    def __init__(self, frame=b''):
+        super(FakeSPIBus, self).__init__()
+        self._frame = frame
+        self.written = 0
+
+    def _open(self):
+        pass
+
+    def _close(self):
+        pass
+
+    def _set_clock_frequency_hz(self, frequency_hz):
+        pass
+
+    def _set_mode(self, mode):
+        pass
+
+    def _set_bit_order(self, order):
+        pass
+
+    def write(self, data):
+        self.written += len(data)
+
+    def read(self, length):
+        return bytearray(self._frame[:length])
+
+    def readinto(self, buf):
+        count = len(self._frame)
+        buf[:count] = self._frame
+        return count
+
+
+class FakeOutput(object):
+
+    def set_high(self):
+        pass
+
+    def set_low(self):
+        pass
+
+
+def _traced_peak(func, iterations):
+    func()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(iterations):
+            func()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def peak_bytes(func, iterations=100):
+    """Gets the peak growth of traced memory while calling func.
+
+    The overhead of the measuring loop itself is subtracted.
+    """
+    return (_traced_peak(func, iterations) -
+            _traced_peak(lambda: None, iterations))
+
+
+class TestSPIAllocation(object):
+
+    def test_max31855_read_reuses_buffer(self):
+        sensor = max31855.MAX31855(FakeSPIBus(b'\x06\x40\x19\x00'))
+        assert sensor.temp_c == 100
+        assert peak_bytes(sensor._read) < _MAX_PEAK_BYTES
+
+    def test_nokia5110_transfers_reuse_buffers(self):
+        spi = FakeSPIBus()
+        display = nokia5110.Nokia5110(spi, FakeOutput(), FakeOutput(), None)
+        assert peak_bytes(lambda: display.send_command(0x20)) < \
+            _MAX_PEAK_BYTES
+        assert peak_bytes(display.clear) < _MAX_PEAK_BYTES
+        spi.written = 0
+        display.clear()
+        assert spi.written == 2 + 504
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from pyparts.platforms.spi import spi_scheduler
+
+
+class FakeSPIBus(object):
+
+    def __init__(self, name, log, gate=None):
+        self.name = name
+        self.log = log
+        self.gate = gate
+        self.writing = threading.Event()
+
+    def write(self, data):
+        self.writing.set()
+        if self.gate is not None:
+            self.gate.wait()
+        self.log.append((self.name, len(data)))
+
+    def read(self, length):
+        self.log.append((self.name, 'read'))
+        return bytearray(length)
+
+
+class TestSPIScheduler(object):
+
+    def test_high_priority_read_runs_between_chunks(self):
+        log = []
+        gate = threading.Event()
+        display = FakeSPIBus('display', log, gate)
+        sensor = FakeSPIBus('sensor', log)
+        scheduler = spi_scheduler.SPIScheduler(max_chunk_size=100)
+        scheduler.start()
+        write = scheduler.submit_write(display, bytearray(504),
+                                       spi_scheduler.PRIORITY_LOW, boundary=84)
+        display.writing.wait(1)
+        read = scheduler.submit_read(sensor, 4, spi_scheduler.PRIORITY_HIGH)
+        gate.set()
+        assert read.wait(1) == bytearray(4)
+        write.wait(1)
+        scheduler.stop()
+        scheduler.join(1)
+        assert log[1] == ('sensor', 'read')
+        assert [entry for entry in log if entry[0] == 'display'] == \
+            [('display', 84)] * 6
+        assert scheduler.latency(spi_scheduler.PRIORITY_HIGH).count == 1
+
+    def test_stop_fails_pending_transactions(self):
+        scheduler = spi_scheduler.SPIScheduler()
+        read = scheduler.submit_read(FakeSPIBus('sensor', []), 4)
+        scheduler.stop()
+        scheduler.start()
+        scheduler.join(1)
+        with pytest.raises(RuntimeError):
+            read.wait(1)
+        late = scheduler.submit_read(FakeSPIBus('sensor', []), 4)
+        with pytest.raises(RuntimeError):
+            late.wait(1)
+
+    def test_scheduled_bus_times_out(self):
+        scheduler = spi_scheduler.SPIScheduler()
+        log = []
+        bus = spi_scheduler.ScheduledSPIBus(
+            scheduler, FakeSPIBus('sensor', log), timeout_s=0.01)
+        with pytest.raises(RuntimeError):
+            bus.read(4)
+        # The timed out read is dropped rather than run late.
+        scheduler.start()
+        scheduler.submit_call(lambda: None).wait(1)
+        scheduler.stop()
+        scheduler.join(1)
+        assert log == []
@@ -0,0 +1,98 @@
+import pytest
+
+from pyparts.parts.motor import stepper
+
+
+class FakeOutput(object):
+
+    def __init__(self, log):
+        self.log = log
+        self.is_high = False
+
+    def set_high(self):
+        self.log.append((self, True))
+        self.is_high = True
+
+    def set_low(self):
+        self.log.append((self, False))
+        self.is_high = False
+
+
+class FakePWM(object):
+
+    def __init__(self, log):
+        self.log = log
+        self.duty_cycle = 0
+
+    def set_duty_cycle(self, duty_cycle):
+        self.log.append((self, duty_cycle))
+        self.duty_cycle = duty_cycle
+
+
+class FakePlatform(object):
+
+    def __init__(self):
+        self.writes = []
+
+    def write_digital_outputs(self, outputs, values):
+        self.writes.append(list(values))
+        for output, value in zip(outputs, values):
+            output.is_high = value
+
+
+class TestStepperMotor(object):
+
+    def test_half_step_writes_only_changed_coils(self):
+        log = []
+        coils = [FakeOutput(log) for _ in range(4)]
+        motor = stepper.StepperMotor(*coils, enable=FakeOutput([]),
+                                     drive_mode=stepper.HALF_STEP)
+        motor.step()
+        del log[:]
+        motor.step()
+        assert log == [(coils[0], False)]
+        motor.step(-1)
+        assert motor.position == 1
+        assert [coil.is_high for coil in coils] == [True, False, True, False]
+
+    def test_microstep_requires_pwm(self):
+        coils = [FakeOutput([]) for _ in range(4)]
+        with pytest.raises(ValueError):
+            stepper.StepperMotor(*coils, enable=FakeOutput([]),
+                                 drive_mode=stepper.MICROSTEP)
+
+    def test_microstep_holds_at_reduced_current(self):
+        coils = [FakePWM([]) for _ in range(4)]
+        motor = stepper.StepperMotor(*coils, enable=FakeOutput([]),
+                                     drive_mode=stepper.MICROSTEP,
+                                     microsteps=4, hold_duty_cycle=50)
+        motor.forward(0, 1)
+        assert motor.position == 16
+        assert [coil.duty_cycle for coil in coils] == [50, 0, 0, 0]
+        motor.step()
+        assert coils[0].duty_cycle == pytest.approx(92.387953)
+        assert coils[2].duty_cycle == pytest.approx(38.268343)
+
+    def test_platform_writes_each_step_at_once(self):
+        platform = FakePlatform()
+        coils = [FakeOutput([]) for _ in range(4)]
+        motor = stepper.StepperMotor(*coils, enable=FakeOutput([]),
+                                     platform=platform)
+        motor.step()
+        motor.step()
+        assert platform.writes == [[False, True, True, False], [False, True]]
+        assert [coil.is_high for coil in coils] == [False, True, False, True]
+
+    def test_drive_mode_change_keeps_the_electrical_angle(self):
+        log = []
+        coils = [FakeOutput(log) for _ in range(4)]
+        motor = stepper.StepperMotor(*coils, enable=FakeOutput([]))
+        motor.step()
+        for drive_mode in (stepper.HALF_STEP, stepper.FULL_STEP,
+                           stepper.HALF_STEP):
+            motor.set_drive_mode(drive_mode)
+            del log[:]
+            motor.hold()
+            assert log == []
+        motor.step()
+        assert [coil.is_high for coil in coils] == [False, True, False, False]
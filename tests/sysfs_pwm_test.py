@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from pyparts.platforms.pwm import sysfs_pwm
+
+
+def make_chip(root, npwm=2, exported=(0,)):
+    chip = root.mkdir('pwmchip0')
+    chip.join('npwm').write('%d\n' % npwm)
+    chip.join('export').write('')
+    for channel in exported:
+        pwm = chip.mkdir('pwm%d' % channel)
+        for name in ('period', 'duty_cycle', 'enable'):
+            pwm.join(name).write('0\n')
+    return chip
+
+
+def value(chip, channel, name):
+    return int(chip.join('pwm%d' % channel, name).read().split('\n')[0])
+
+
+class TestSysfsPWMOutput(object):
+
+    def test_writes_period_duty_cycle_and_enable(self, tmpdir):
+        chip = make_chip(tmpdir)
+        pwm = sysfs_pwm.SysfsPWMOutput(0, 0, pin=18, frequency_hz=1000,
+                                       root=str(tmpdir))
+        pwm.set_duty_cycle(25)
+        pwm.enable()
+        assert value(chip, 0, 'period') == 1000000
+        assert value(chip, 0, 'duty_cycle') == 250000
+        assert value(chip, 0, 'enable') == 1
+        assert pwm.pin_number == 18
+
+        pwm.set_frequency_hz(2000)
+        assert value(chip, 0, 'period') == 500000
+        assert value(chip, 0, 'duty_cycle') == 125000
+        pwm.close()
+
+    def test_skips_unchanged_values(self, tmpdir, monkeypatch):
+        make_chip(tmpdir)
+        pwm = sysfs_pwm.SysfsPWMOutput(0, 0, root=str(tmpdir))
+        writes = []
+        real_pwrite = os.pwrite
+
+        def pwrite(fd, data, offset):
+            writes.append(data)
+            return real_pwrite(fd, data, offset)
+
+        monkeypatch.setattr(os, 'pwrite', pwrite)
+        pwm.set_duty_cycle(50)
+        pwm.set_duty_cycle(50)
+        pwm.set_frequency_hz(2000)
+        assert len(writes) == 1
+        pwm.close()
+
+    def test_shrinks_a_leftover_duty_cycle_before_the_period(self, tmpdir,
+                                                             monkeypatch):
+        chip = make_chip(tmpdir)
+        chip.join('pwm0', 'period').write('1000000\n')
+        chip.join('pwm0', 'duty_cycle').write('900000\n')
+        writes = []
+        real_pwrite = os.pwrite
+
+        def pwrite(fd, data, offset):
+            writes.append(data)
+            return real_pwrite(fd, data, offset)
+
+        monkeypatch.setattr(os, 'pwrite', pwrite)
+        pwm = sysfs_pwm.SysfsPWMOutput(0, 0, frequency_hz=2000,
+                                       root=str(tmpdir))
+        assert writes == [b'0\n', b'500000\n']
+        assert value(chip, 0, 'period') == 500000
+        pwm.close()
+
+    def test_exports_missing_channel(self, tmpdir, monkeypatch):
+        chip = make_chip(tmpdir, exported=())
+        monkeypatch.setattr(sysfs_pwm, '_EXPORT_TIMEOUT_S', 0)
+        with pytest.raises(OSError):
+            sysfs_pwm.SysfsPWMOutput(0, 1, root=str(tmpdir))
+        assert chip.join('export').read() == '1'
+
+    def test_num_channels(self, tmpdir):
+        make_chip(tmpdir, npwm=2)
+        assert sysfs_pwm.num_channels(0, str(tmpdir)) == 2
+        assert sysfs_pwm.num_channels(1, str(tmpdir)) == 0
@@ -0,0 +1,67 @@
+import pytest
+
+from pyparts.systems import telemetry_bus
+
+
+def open_bus(tmpdir, history=4):
+    path = str(tmpdir.join('telemetry'))
+    publisher = telemetry_bus.TelemetryPublisher(
+        path, [('temp', 1), ('rgb', 3)], history=history)
+    return publisher, telemetry_bus.TelemetryReader(path)
+
+
+class TestTelemetryBus(object):
+
+    def test_latest_and_history(self, tmpdir):
+        publisher, reader = open_bus(tmpdir)
+        assert reader.channels == ['temp', 'rgb']
+        assert reader.latest('temp') is None
+        publisher.publish('temp', 21.5)
+        publisher.publish('rgb', 1, 2)
+        assert reader.latest('temp')[1] == (21.5,)
+        assert reader.latest('rgb')[1] == (1.0, 2.0, 0.0)
+        assert [values for _, values in reader.history('temp')] == [(21.5,)]
+        reader.close()
+        publisher.close()
+
+    def test_history_wraps_in_order(self, tmpdir):
+        publisher, reader = open_bus(tmpdir)
+        for i in range(10):
+            publisher.publish('temp', i)
+        assert [values[0] for _, values in reader.history('temp')] == [
+            6, 7, 8, 9]
+        assert [values[0] for _, values in reader.history('temp', 2)] == [
+            8, 9]
+        reader.close()
+        publisher.close()
+
+    def test_history_drops_records_lapped_during_the_read(self, tmpdir):
+        publisher, reader = open_bus(tmpdir)
+        for i in range(10):
+            publisher.publish('temp', i)
+        # Records 10 and 11 overwrite the slots of 6 and 7 before the head
+        # counter moves, as when the publisher laps a reader mid read.
+        for number in (10, 11):
+            publisher._slots[0][number % 4].write(number, 0.0, number, 0, 0)
+        assert [values[0] for _, values in reader.history('temp')] == [8, 9]
+        reader.close()
+        publisher.close()
+
+    def test_publish_rejects_values_wider_than_the_channel(self, tmpdir):
+        publisher, reader = open_bus(tmpdir)
+        with pytest.raises(ValueError):
+            publisher.publish('temp', 1, 2)
+        reader.close()
+        publisher.close()
+
+    def test_restarted_publisher_leaves_mapped_readers_intact(self, tmpdir):
+        publisher, reader = open_bus(tmpdir)
+        publisher.publish('temp', 21.5)
+        publisher.close()
+        restarted, new_reader = open_bus(tmpdir)
+        assert reader.latest('temp')[1] == (21.5,)
+        assert new_reader.latest('temp') is None
+        assert tmpdir.listdir() == [tmpdir.join('telemetry')]
+        new_reader.close()
+        reader.close()
+        restarted.close()
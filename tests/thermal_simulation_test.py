@@ -0,0 +1,31 @@
+import time
+
+from pyparts.systems import thermal_simulation
+
+
+class TestThermalSimulation:
+    def test_runs_faster_than_real_time(self):
+        simulation = thermal_simulation.ThermalSimulation(2, 0.01, 0, 150)
+        start = time.time()
+        result = simulation.run(2 * 3600)
+        assert time.time() - start < 10
+        assert simulation.clock.time() >= 2 * 3600
+        assert abs(result.final_error_c) < 10
+
+    def test_plant_reaches_steady_state(self):
+        plant = thermal_simulation.ThermalPlant(
+            gain_c=100, time_constant_s=10, dead_time_s=5, ambient_c=20)
+        plant.set_power(0, 1.0)
+        assert plant.temp_c(5) == 20
+        assert abs(plant.temp_c(1000) - 120) < 1e-6
+
+    def test_sweep_gains_preserves_order(self):
+        gain_sets = [(1, 0, 0), (4, 0.02, 0)]
+        results = thermal_simulation.sweep_gains(gain_sets, 100, 600,
+                                                 processes=1)
+        assert [(r.kp, r.ki, r.kd) for r in results] == gain_sets
+
+    def test_controller_uses_the_simulated_gains(self):
+        simulation = thermal_simulation.ThermalSimulation(1, 2, 3, 150)
+        pid = simulation.controller._pid_worker._controller
+        assert (pid._kp, pid._ki, pid._kd) == (1, 2, 3)
@@ -0,0 +1,222 @@
+import threading
+
+import pytest
+
+from pyparts.logic import clock as clock_lib
+from pyparts.platforms import base_platform
+from pyparts.platforms import recording_platform
+from pyparts.platforms import replay_platform
+from pyparts.platforms import traffic_log
+from pyparts.platforms.gpio import base_gpio
+from pyparts.platforms.spi import base_spi
+
+
+class FakeSPIBus(base_spi.BaseSPIBus):
+    """Serves scripted reads."""
+
+    def __init__(self, reads):
+        super(FakeSPIBus, self).__init__()
+        self._reads = list(reads)
+        self.written = []
+
+    def _open(self):
+        pass
+
+    def _close(self):
+        pass
+
+    def _set_clock_frequency_hz(self, frequency_hz):
+        pass
+
+    def _set_mode(self, mode):
+        pass
+
+    def _set_bit_order(self, order):
+        pass
+
+    def write(self, data):
+        self.written.append(bytes(data))
+
+    def read(self, length):
+        return bytearray(self._reads.pop(0)[:length])
+
+    def transfer(self, data):
+        self.write(data)
+        return self.read(len(data))
+
+
+class FakeDigitalInput(base_gpio.BaseDigitalInput):
+    """Serves scripted levels and fires edges on demand."""
+
+    INTERRUPT_FALLING = 0
+    INTERRUPT_RISING = 1
+    INTERRUPT_BOTH = 2
+
+    def __init__(self, pin, levels):
+        super(FakeDigitalInput, self).__init__(pin, self.INPUT, self.PUD_UP)
+        self._levels = list(levels)
+        self._callback = None
+
+    def _write(self, value):
+        raise NotImplementedError
+
+    def _read(self):
+        return self._levels.pop(0)
+
+    def add_interrupt(self, type, callback=None, debounce_time_ms=0):
+        self._callback = callback
+
+    def wait_for_edge(self, type):
+        pass
+
+    def remove_interrupt(self):
+        self._callback = None
+
+    def fire(self):
+        self._callback(self._pin)
+
+
+class FakePlatform(base_platform.BasePlatform):
+
+    def __init__(self, spi_reads, levels):
+        self.spi = FakeSPIBus(spi_reads)
+        self.input = FakeDigitalInput(7, levels)
+
+    def get_digital_input(self, pin):
+        return self.input
+
+    def get_digital_output(self, pin):
+        raise NotImplementedError
+
+    def get_pwm_output(self, pin):
+        raise NotImplementedError
+
+    def get_hardware_spi_bus(self, port, device):
+        return self.spi
+
+    def get_software_spi_bus(self, sclk_pin, mosi_pin, miso_pin, ss_pin):
+        raise NotImplementedError
+
+    def get_i2c_bus(self, bus):
+        raise NotImplementedError
+
+
+def record_session(path):
+    """Records a session and returns what the parts saw."""
+    fake = FakePlatform([b'\x01\x02', b'\x03\x04\x05', b'\x06'],
+                        [True, False])
+    platform = recording_platform.RecordingPlatform(fake, path)
+    spi = platform.get_hardware_spi_bus(0, 1)
+    pin = platform.get_digital_input(7)
+    edges = []
+    pin.add_interrupt(pin.INTERRUPT_BOTH, edges.append)
+    spi.open()
+    spi.write(b'\xaa')
+    seen = [bytes(spi.read(2))]
+    buf = bytearray(3)
+    spi.readinto(buf)
+    seen.append(bytes(buf))
+    seen.append(bytes(spi.transfer(b'\xbb')))
+    seen.append(pin.is_high)
+    fake.input.fire()
+    fake.input.fire()
+    seen.append(pin.is_high)
+    platform.close()
+    return seen, edges
+
+
+class TestTrafficLog(object):
+
+    def test_replay_serves_recorded_reads_and_edges(self, tmpdir):
+        path = str(tmpdir.join('session.log'))
+        recorded, recorded_edges = record_session(path)
+        assert recorded_edges == [7, 7]
+
+        platform = replay_platform.ReplayPlatform(path)
+        spi = platform.get_hardware_spi_bus(0, 1)
+        pin = platform.get_digital_input(7)
+        edges = []
+        pin.add_interrupt(pin.INTERRUPT_BOTH, edges.append)
+        spi.open()
+        spi.write(b'\xaa')
+        replayed = [bytes(spi.read(2))]
+        buf = bytearray(3)
+        spi.readinto(buf)
+        replayed.append(bytes(buf))
+        replayed.append(bytes(spi.transfer(b'\xbb')))
+        replayed.append(pin.is_high)
+        replayed.append(pin.is_high)
+        platform.play_edges()
+        assert replayed == recorded
+        assert edges == recorded_edges
+        with pytest.raises(traffic_log.TrafficLogError):
+            spi.read(1)
+
+    def test_truncated_log_stops_at_the_last_whole_record(self, tmpdir):
+        path = str(tmpdir.join('session.log'))
+        record_session(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:-1])
+        platform = replay_platform.ReplayPlatform(path)
+        pin = platform.get_digital_input(7)
+        assert pin.is_high
+        with pytest.raises(traffic_log.TrafficLogError):
+            pin.is_high
+
+    def test_corrupt_logs_raise(self, tmpdir):
+        path = str(tmpdir.join('session.log'))
+        record_session(path)
+        with open(path, 'rb') as f:
+            data = bytearray(f.read())
+
+        with open(path, 'wb') as f:
+            f.write(data[:4])
+        with pytest.raises(traffic_log.TrafficLogError):
+            traffic_log.TrafficLogReader(path)
+
+        bad_magic = bytearray(data)
+        bad_magic[0:4] = b'XXXX'
+        with open(path, 'wb') as f:
+            f.write(bad_magic)
+        with pytest.raises(traffic_log.TrafficLogError):
+            traffic_log.TrafficLogReader(path)
+
+        # The op byte of the first record follows its timestamp and channel.
+        bad_op = bytearray(data)
+        bad_op[8 + 8 + 2] = 0xff
+        with open(path, 'wb') as f:
+            f.write(bad_op)
+        with pytest.raises(traffic_log.TrafficLogError):
+            traffic_log.TrafficLogReader(path)
+
+    def test_channel_is_declared_before_other_threads_use_it(
+            self, tmpdir, monkeypatch):
+        path = str(tmpdir.join('session.log'))
+        writer = traffic_log.TrafficLogWriter(path)
+        key = traffic_log.gpio_key(7)
+        monotonic_ns = clock_lib.monotonic_ns
+        others = []
+
+        def use_channel():
+            writer.append(writer.open_channel(key), traffic_log.OP_READ, b'1')
+
+        def interleaving_monotonic_ns():
+            # Lets a second thread use the channel while the first is still
+            # declaring it.
+            if not others:
+                others.append(threading.Thread(target=use_channel))
+                others[0].start()
+                others[0].join(0.1)
+            return monotonic_ns()
+
+        monkeypatch.setattr(clock_lib, 'monotonic_ns',
+                            interleaving_monotonic_ns)
+        writer.open_channel(key)
+        others[0].join()
+        writer.close()
+        reader = traffic_log.TrafficLogReader(path)
+        ops = [reader.header(offset)[2]
+               for offset in reader.offsets(reader.channel(key))]
+        assert ops == [traffic_log.OP_CHANNEL, traffic_log.OP_READ]